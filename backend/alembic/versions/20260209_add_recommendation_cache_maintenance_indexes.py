@@ -0,0 +1,46 @@
+"""Add recommendation_cache indexes for expiry sweeps and fuzzy lookups.
+
+Revision ID: 20260209_001
+Revises: 20260208_002
+Create Date: 2026-02-09
+"""
+
+from sqlalchemy import inspect
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20260209_001"
+down_revision = "20260208_002"
+branch_labels = None
+depends_on = None
+
+
+def index_exists(table_name: str, index_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return index_name in [idx["name"] for idx in inspector.get_indexes(table_name)]
+
+
+def upgrade() -> None:
+    if not index_exists("recommendation_cache", "ix_recommendation_cache_created_at"):
+        op.create_index(
+            "ix_recommendation_cache_created_at",
+            "recommendation_cache",
+            ["created_at"],
+            unique=False,
+        )
+    if not index_exists("recommendation_cache", "ix_recommendation_cache_user_type_hash"):
+        op.create_index(
+            "ix_recommendation_cache_user_type_hash",
+            "recommendation_cache",
+            ["user_id", "query_type", "wine_collection_hash"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    if index_exists("recommendation_cache", "ix_recommendation_cache_user_type_hash"):
+        op.drop_index("ix_recommendation_cache_user_type_hash", table_name="recommendation_cache")
+    if index_exists("recommendation_cache", "ix_recommendation_cache_created_at"):
+        op.drop_index("ix_recommendation_cache_created_at", table_name="recommendation_cache")
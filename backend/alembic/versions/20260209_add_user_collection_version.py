@@ -0,0 +1,37 @@
+"""Add collection_version to users table.
+
+Revision ID: 20260209_002
+Revises: 20260209_001
+Create Date: 2026-02-09
+"""
+
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20260209_002"
+down_revision = "20260209_001"
+branch_labels = None
+depends_on = None
+
+
+def column_exists(table_name: str, column_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    columns = [col["name"] for col in inspector.get_columns(table_name)]
+    return column_name in columns
+
+
+def upgrade() -> None:
+    if not column_exists("users", "collection_version"):
+        op.add_column(
+            "users",
+            sa.Column("collection_version", sa.Integer(), nullable=False, server_default="0"),
+        )
+
+
+def downgrade() -> None:
+    if column_exists("users", "collection_version"):
+        op.drop_column("users", "collection_version")
@@ -0,0 +1,106 @@
+"""Add recommendation history summary columns and (user_id, created_at) index.
+
+The index also carries ``id`` as the keyset pagination tiebreaker.
+
+Revision ID: 20260210_001
+Revises: 20260209_002
+Create Date: 2026-02-10
+"""
+
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20260210_001"
+down_revision = "20260209_002"
+branch_labels = None
+depends_on = None
+
+
+def column_exists(table_name: str, column_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    columns = [col["name"] for col in inspector.get_columns(table_name)]
+    return column_name in columns
+
+
+def index_exists(table_name: str, index_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return index_name in [idx["name"] for idx in inspector.get_indexes(table_name)]
+
+
+def upgrade() -> None:
+    # Backfill only when this run adds the columns; start.sh reruns every
+    # migration on boot and a rescan of the whole table each time is costly.
+    # item_count is added last, so an interrupted run still backfills.
+    backfill = not column_exists("recommendations", "item_count")
+    if not column_exists("recommendations", "top_wine_name"):
+        op.add_column("recommendations", sa.Column("top_wine_name", sa.String(500), nullable=True))
+    if not column_exists("recommendations", "top_match_score"):
+        op.add_column("recommendations", sa.Column("top_match_score", sa.Numeric(4, 3), nullable=True))
+    if backfill:
+        op.add_column(
+            "recommendations",
+            sa.Column("item_count", sa.Integer(), nullable=False, server_default="0"),
+        )
+
+        # Backfill from the stored result JSON. AI results carry no wine name,
+        # so fall back to the first recommended bottle's wine. Scores follow
+        # app.services.recommendation_service.normalize_match_score: percent
+        # becomes a fraction, clamped to [0, 1]; unparseable scores become 0.
+        op.execute(
+            """
+            UPDATE recommendations AS r
+            SET
+                top_wine_name = COALESCE(
+                    r.result -> 'recommendations' -> 0 ->> 'wine_name',
+                    (
+                        SELECT w.name
+                        FROM user_wines uw
+                        JOIN wines w ON w.id = uw.wine_id
+                        WHERE uw.id = r.recommended_wine_ids[1]
+                    )
+                ),
+                top_match_score = CASE
+                    WHEN r.result -> 'recommendations' -> 0 IS NULL THEN NULL
+                    WHEN r.result #>> '{recommendations,0,match_score}'
+                        ~ '^[-+]?([0-9]+\\.?[0-9]*|\\.[0-9]+)([eE][-+]?[0-9]+)?$'
+                    THEN ROUND(LEAST(GREATEST(
+                        CASE
+                            WHEN (r.result #>> '{recommendations,0,match_score}')::numeric > 1
+                            THEN (r.result #>> '{recommendations,0,match_score}')::numeric / 100
+                            ELSE (r.result #>> '{recommendations,0,match_score}')::numeric
+                        END,
+                        0
+                    ), 1), 3)
+                    ELSE 0
+                END,
+                item_count = COALESCE(
+                    array_length(r.recommended_wine_ids, 1),
+                    CASE
+                        WHEN jsonb_typeof(r.result -> 'recommendations') = 'array'
+                        THEN jsonb_array_length(r.result -> 'recommendations')
+                    END,
+                    0
+                )
+            """
+        )
+
+    if not index_exists("recommendations", "ix_recommendations_user_created"):
+        op.create_index(
+            "ix_recommendations_user_created",
+            "recommendations",
+            ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    if index_exists("recommendations", "ix_recommendations_user_created"):
+        op.drop_index("ix_recommendations_user_created", table_name="recommendations")
+    for column in ("item_count", "top_match_score", "top_wine_name"):
+        if column_exists("recommendations", column):
+            op.drop_column("recommendations", column)
@@ -0,0 +1,141 @@
+"""Partition recommendations by month on created_at.
+
+The existing table is renamed aside, a range-partitioned ``recommendations``
+is created with a ``recommendations_default`` catch-all and one partition
+per month from the oldest row through three months ahead, rows are copied
+over and the old table is dropped. Partitions after that are managed by
+``app.services.history_partition_service``.
+
+Partitioning requires ``created_at`` in the primary key, so the key
+becomes ``(id, created_at)``.
+
+Revision ID: 20260210_002
+Revises: 20260210_001
+Create Date: 2026-02-10
+"""
+
+from datetime import UTC, date, datetime
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20260210_002"
+down_revision = "20260210_001"
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = (
+    "id, user_id, query_type, query_text, result, recommended_wine_ids, "
+    "top_wine_name, top_match_score, item_count, ai_model, ai_tokens_used, created_at"
+)
+
+COLUMN_DDL = """
+    id UUID NOT NULL,
+    user_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    query_type VARCHAR(20) NOT NULL,
+    query_text TEXT NOT NULL,
+    result JSONB NOT NULL,
+    recommended_wine_ids UUID[],
+    top_wine_name VARCHAR(500),
+    top_match_score NUMERIC(4, 3),
+    item_count INTEGER NOT NULL DEFAULT 0,
+    ai_model VARCHAR(50),
+    ai_tokens_used INTEGER,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+"""
+
+MONTHS_AHEAD = 3
+
+
+def is_partitioned() -> bool:
+    bind = op.get_bind()
+    return (
+        bind.execute(
+            sa.text(
+                "SELECT 1 FROM pg_partitioned_table pt "
+                "JOIN pg_class c ON c.oid = pt.partrelid "
+                "WHERE c.relname = 'recommendations' "
+                "AND c.relnamespace = 'public'::regnamespace"
+            )
+        ).scalar()
+        is not None
+    )
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def rename_indexes(suffix_from: str, suffix_to: str) -> None:
+    for name in ("recommendations_pkey", "ix_recommendations_user_id", "ix_recommendations_user_created"):
+        op.execute(
+            f"ALTER INDEX IF EXISTS {name}{suffix_from} RENAME TO {name}{suffix_to}"
+        )
+
+
+def create_indexes() -> None:
+    op.execute("CREATE INDEX IF NOT EXISTS ix_recommendations_user_id ON recommendations (user_id)")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_recommendations_user_created "
+        "ON recommendations (user_id, created_at DESC, id DESC)"
+    )
+
+
+def upgrade() -> None:
+    if is_partitioned():
+        return
+
+    op.execute("ALTER TABLE recommendations RENAME TO recommendations_unpartitioned")
+    rename_indexes("", "_unpartitioned")
+
+    op.execute(
+        f"CREATE TABLE recommendations ({COLUMN_DDL}, PRIMARY KEY (id, created_at)) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    op.execute("CREATE TABLE recommendations_default PARTITION OF recommendations DEFAULT")
+
+    bind = op.get_bind()
+    oldest = bind.execute(
+        sa.text("SELECT min(created_at) FROM recommendations_unpartitioned")
+    ).scalar()
+    today = datetime.now(UTC).date()
+    month = date((oldest or today).year, (oldest or today).month, 1)
+    last = add_months(date(today.year, today.month, 1), MONTHS_AHEAD)
+    while month <= last:
+        end = add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE recommendations_y{month.year:04d}m{month.month:02d} "
+            f"PARTITION OF recommendations "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{end.isoformat()} 00:00:00+00')"
+        )
+        month = end
+
+    op.execute(
+        f"INSERT INTO recommendations ({COLUMNS}) "
+        f"SELECT {COLUMNS.replace('created_at', 'COALESCE(created_at, now())')} "
+        "FROM recommendations_unpartitioned"
+    )
+    op.execute("DROP TABLE recommendations_unpartitioned")
+    create_indexes()
+
+
+def downgrade() -> None:
+    if not is_partitioned():
+        return
+
+    op.execute("ALTER TABLE recommendations RENAME TO recommendations_partitioned")
+    rename_indexes("", "_partitioned")
+
+    op.execute(f"CREATE TABLE recommendations ({COLUMN_DDL}, PRIMARY KEY (id))")
+    # Detached partitions are not copied back; they were retired on purpose
+    op.execute(
+        f"INSERT INTO recommendations ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM recommendations_partitioned"
+    )
+    # Dropping the parent drops every attached partition with it
+    op.execute("DROP TABLE recommendations_partitioned")
+    create_indexes()
@@ -0,0 +1,39 @@
+"""Add wines (drinking_window_end, drinking_window_start) index.
+
+Backs the drinking-window list filters and ``sort=drinking_window_end``.
+
+Revision ID: 20260211_001
+Revises: 20260210_002
+Create Date: 2026-02-11
+"""
+
+from sqlalchemy import inspect
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20260211_001"
+down_revision = "20260210_002"
+branch_labels = None
+depends_on = None
+
+
+def index_exists(table_name: str, index_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return index_name in [idx["name"] for idx in inspector.get_indexes(table_name)]
+
+
+def upgrade() -> None:
+    if not index_exists("wines", "ix_wines_drinking_window"):
+        op.create_index(
+            "ix_wines_drinking_window",
+            "wines",
+            ["drinking_window_end", "drinking_window_start"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    if index_exists("wines", "ix_wines_drinking_window"):
+        op.drop_index("ix_wines_drinking_window", table_name="wines")
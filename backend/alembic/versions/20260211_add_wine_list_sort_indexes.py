@@ -0,0 +1,61 @@
+"""Add composite indexes for the wine collection list sorts.
+
+(user_id, column, id) indexes for sorts on user_wines columns, ordered
+like the list's default DESC NULLS LAST so sorted, keyset-paginated pages
+are index scans. Sorts on wines columns use the existing wines indexes
+joined through a (wine_id, user_id) index, which replaces the single
+wine_id index.
+
+Revision ID: 20260211_002
+Revises: 20260211_001
+Create Date: 2026-02-11
+"""
+
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20260211_002"
+down_revision = "20260211_001"
+branch_labels = None
+depends_on = None
+
+
+SORT_INDEXES = {
+    "ix_user_wines_user_created": ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+    "ix_user_wines_user_price": [
+        "user_id",
+        sa.text("purchase_price DESC NULLS LAST"),
+        sa.text("id DESC"),
+    ],
+    "ix_user_wines_user_purchase_date": [
+        "user_id",
+        sa.text("purchase_date DESC NULLS LAST"),
+        sa.text("id DESC"),
+    ],
+    "ix_user_wines_wine_user": ["wine_id", "user_id"],
+}
+
+
+def index_exists(table_name: str, index_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return index_name in [idx["name"] for idx in inspector.get_indexes(table_name)]
+
+
+def upgrade() -> None:
+    for name, columns in SORT_INDEXES.items():
+        if not index_exists("user_wines", name):
+            op.create_index(name, "user_wines", columns, unique=False)
+    if index_exists("user_wines", "ix_user_wines_wine_id"):
+        op.drop_index("ix_user_wines_wine_id", table_name="user_wines")
+
+
+def downgrade() -> None:
+    if not index_exists("user_wines", "ix_user_wines_wine_id"):
+        op.create_index("ix_user_wines_wine_id", "user_wines", ["wine_id"], unique=False)
+    for name in reversed(list(SORT_INDEXES)):
+        if index_exists("user_wines", name):
+            op.drop_index(name, table_name="user_wines")
@@ -0,0 +1,89 @@
+"""Replace the user_wines sort indexes with partial owned-wine indexes.
+
+Almost every collection read filters user_id, deleted_at IS NULL and
+status = 'owned'. The (user_id, column, id) sort indexes become partial
+indexes on that predicate, so they only hold the rows those reads can
+return and also serve the dashboard and recommendation candidate queries.
+Adds a partial (user_id, consumed_at) index for consumed wines and drops
+the single-column status index, which is too unselective to be used.
+
+Revision ID: 20260212_004
+Revises: 20260212_003
+Create Date: 2026-02-12
+"""
+
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20260212_004"
+down_revision = "20260212_003"
+branch_labels = None
+depends_on = None
+
+
+OWNED_INDEX_WHERE = "deleted_at IS NULL AND status = 'owned'"
+
+PARTIAL_INDEXES = {
+    "ix_user_wines_owned_created": (
+        ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+        OWNED_INDEX_WHERE,
+    ),
+    "ix_user_wines_owned_price": (
+        ["user_id", sa.text("purchase_price DESC NULLS LAST"), sa.text("id DESC")],
+        OWNED_INDEX_WHERE,
+    ),
+    "ix_user_wines_owned_purchase_date": (
+        ["user_id", sa.text("purchase_date DESC NULLS LAST"), sa.text("id DESC")],
+        OWNED_INDEX_WHERE,
+    ),
+    "ix_user_wines_user_consumed": (["user_id", "consumed_at"], "status = 'consumed'"),
+}
+
+# Replaced indexes, recreated on downgrade
+FULL_INDEXES = {
+    "ix_user_wines_user_created": ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+    "ix_user_wines_user_price": [
+        "user_id",
+        sa.text("purchase_price DESC NULLS LAST"),
+        sa.text("id DESC"),
+    ],
+    "ix_user_wines_user_purchase_date": [
+        "user_id",
+        sa.text("purchase_date DESC NULLS LAST"),
+        sa.text("id DESC"),
+    ],
+    "ix_user_wines_status": ["status"],
+}
+
+
+def index_exists(table_name: str, index_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return index_name in [idx["name"] for idx in inspector.get_indexes(table_name)]
+
+
+def upgrade() -> None:
+    for name, (columns, where) in PARTIAL_INDEXES.items():
+        if not index_exists("user_wines", name):
+            op.create_index(
+                name,
+                "user_wines",
+                columns,
+                unique=False,
+                postgresql_where=sa.text(where),
+            )
+    for name in FULL_INDEXES:
+        if index_exists("user_wines", name):
+            op.drop_index(name, table_name="user_wines")
+
+
+def downgrade() -> None:
+    for name, columns in FULL_INDEXES.items():
+        if not index_exists("user_wines", name):
+            op.create_index(name, "user_wines", columns, unique=False)
+    for name in reversed(list(PARTIAL_INDEXES)):
+        if index_exists("user_wines", name):
+            op.drop_index(name, table_name="user_wines")
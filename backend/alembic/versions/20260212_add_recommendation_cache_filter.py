@@ -0,0 +1,43 @@
+"""Store the wine type filter on recommendation_cache entries.
+
+``wine_collection_hash`` covers the collection and the wine type filter,
+so cache maintenance could not tell a changed collection from a
+different filter and purged valid filtered entries as superseded. The
+filter is now stored separately ("" = unfiltered); existing entries keep
+NULL and are only removed by expiry.
+
+Revision ID: 20260212_007
+Revises: 20260212_006
+Create Date: 2026-02-12
+"""
+
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20260212_007"
+down_revision = "20260212_006"
+branch_labels = None
+depends_on = None
+
+
+def column_exists(table_name: str, column_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    columns = [col["name"] for col in inspector.get_columns(table_name)]
+    return column_name in columns
+
+
+def upgrade() -> None:
+    if not column_exists("recommendation_cache", "wine_types_filter"):
+        op.add_column(
+            "recommendation_cache",
+            sa.Column("wine_types_filter", sa.String(length=100), nullable=True),
+        )
+
+
+def downgrade() -> None:
+    if column_exists("recommendation_cache", "wine_types_filter"):
+        op.drop_column("recommendation_cache", "wine_types_filter")
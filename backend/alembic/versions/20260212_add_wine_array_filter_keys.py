@@ -0,0 +1,69 @@
+"""Add GIN-indexed folded copies of the wine array columns.
+
+Adds the IMMUTABLE f_fold_array() helper and stored generated
+grape_variety_keys, food_pairing_keys and flavor_notes_keys columns
+(elements lower-cased, unaccented, trimmed and de-duplicated), each with a
+GIN index, for the grape / food / flavor list filters.
+
+Revision ID: 20260212_003
+Revises: 20260212_002
+Create Date: 2026-02-12
+"""
+
+from sqlalchemy import inspect
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20260212_003"
+down_revision = "20260212_002"
+branch_labels = None
+depends_on = None
+
+
+# Kept in sync with app.models.wine (migrations do not import app code)
+ARRAY_KEY_COLUMNS = {
+    "grape_variety_keys": "f_fold_array(grape_variety::text[])",
+    "food_pairing_keys": "f_fold_array(food_pairing)",
+    "flavor_notes_keys": "f_fold_array(flavor_notes)",
+}
+
+
+def column_exists(table_name: str, column_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    columns = [col["name"] for col in inspector.get_columns(table_name)]
+    return column_name in columns
+
+
+def index_exists(table_name: str, index_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return index_name in [idx["name"] for idx in inspector.get_indexes(table_name)]
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE OR REPLACE FUNCTION f_fold_array(text[]) RETURNS text[] "
+        "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT "
+        "AS $$ SELECT array_agg(DISTINCT lower(public.f_unaccent(btrim(value)))) "
+        "FROM unnest($1) AS value WHERE btrim(value) <> '' $$"
+    )
+
+    for name, expression in ARRAY_KEY_COLUMNS.items():
+        if not column_exists("wines", name):
+            op.execute(
+                f"ALTER TABLE wines ADD COLUMN {name} TEXT[] "
+                f"GENERATED ALWAYS AS ({expression}) STORED"
+            )
+        if not index_exists("wines", f"ix_wines_{name}"):
+            op.execute(f"CREATE INDEX ix_wines_{name} ON wines USING gin ({name})")
+
+
+def downgrade() -> None:
+    for name in reversed(list(ARRAY_KEY_COLUMNS)):
+        if index_exists("wines", f"ix_wines_{name}"):
+            op.drop_index(f"ix_wines_{name}", table_name="wines")
+        if column_exists("wines", name):
+            op.drop_column("wines", name)
+    op.execute("DROP FUNCTION IF EXISTS f_fold_array(text[])")
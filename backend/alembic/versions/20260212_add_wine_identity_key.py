@@ -0,0 +1,127 @@
+"""Add wines.identity_key for canonical wine masters.
+
+New wines are upserted on a folded producer|name|vintage key, so the
+same wine added twice reuses one master. Existing rows are backfilled
+when the column is added: the earliest master per key gets it, later
+duplicates keep NULL (the unique index ignores NULLs) until the dedup job
+merges them.
+
+Revision ID: 20260212_006
+Revises: 20260212_005
+Create Date: 2026-02-12
+"""
+
+import unicodedata
+
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20260212_006"
+down_revision = "20260212_005"
+branch_labels = None
+depends_on = None
+
+BACKFILL_CHUNK_SIZE = 5000
+
+
+def column_exists(table_name: str, column_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    columns = [col["name"] for col in inspector.get_columns(table_name)]
+    return column_name in columns
+
+
+def index_exists(table_name: str, index_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return index_name in [idx["name"] for idx in inspector.get_indexes(table_name)]
+
+
+# Kept in sync with app.services.wine_identity (migrations do not import app code)
+def _fold(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text)
+    return " ".join("".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold().split())
+
+
+def wine_identity_key(name: str, producer: str | None, vintage: int | None) -> str:
+    return f"{_fold(producer or '')}|{_fold(name or '')}|{vintage or ''}"
+
+
+def backfill_identity_keys() -> None:
+    """Give the earliest master per key its identity key.
+
+    Keys are computed in Python (the folding must match the app's) and
+    staged in a temporary table chunk by chunk; the dedup is one SQL update.
+    """
+    bind = op.get_bind()
+    bind.execute(
+        sa.text(
+            "CREATE TEMPORARY TABLE wine_identity_backfill "
+            "(id uuid PRIMARY KEY, identity_key text NOT NULL, created_at timestamptz)"
+        )
+    )
+    after = ""
+    params: dict = {"limit": BACKFILL_CHUNK_SIZE}
+    while True:
+        rows = bind.execute(
+            sa.text(
+                f"SELECT id, name, producer, vintage, created_at FROM wines {after} "
+                "ORDER BY id LIMIT :limit"
+            ),
+            params,
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            sa.text(
+                "INSERT INTO wine_identity_backfill (id, identity_key, created_at) "
+                "VALUES (:id, :identity_key, :created_at)"
+            ),
+            [
+                {
+                    "id": row.id,
+                    "identity_key": wine_identity_key(row.name, row.producer, row.vintage),
+                    "created_at": row.created_at,
+                }
+                for row in rows
+            ],
+        )
+        after = "WHERE id > :last_id"
+        params["last_id"] = rows[-1].id
+
+    bind.execute(
+        sa.text(
+            """
+            UPDATE wines
+            SET identity_key = earliest.identity_key
+            FROM (
+                SELECT DISTINCT ON (identity_key) id, identity_key
+                FROM wine_identity_backfill
+                ORDER BY identity_key, created_at, id
+            ) AS earliest
+            WHERE wines.id = earliest.id
+            """
+        )
+    )
+    bind.execute(sa.text("DROP TABLE wine_identity_backfill"))
+
+
+def upgrade() -> None:
+    # start.sh reruns every migration on boot: backfill only in the run that
+    # adds the column, since legacy duplicates keep NULL until merged.
+    if not column_exists("wines", "identity_key"):
+        op.add_column("wines", sa.Column("identity_key", sa.Text(), nullable=True))
+        backfill_identity_keys()
+
+    if not index_exists("wines", "ux_wines_identity_key"):
+        op.create_index("ux_wines_identity_key", "wines", ["identity_key"], unique=True)
+
+
+def downgrade() -> None:
+    if index_exists("wines", "ux_wines_identity_key"):
+        op.drop_index("ux_wines_identity_key", table_name="wines")
+    if column_exists("wines", "identity_key"):
+        op.drop_column("wines", "identity_key")
@@ -0,0 +1,70 @@
+"""Add trigram-indexed wines.search_text for collection search.
+
+Enables pg_trgm and unaccent, adds the IMMUTABLE f_unaccent() wrapper,
+a stored generated search_text column (lower-cased, unaccented name,
+producer and region) and a GIN trigram index on it.
+
+Revision ID: 20260212_001
+Revises: 20260211_002
+Create Date: 2026-02-12
+"""
+
+from sqlalchemy import inspect
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20260212_001"
+down_revision = "20260211_002"
+branch_labels = None
+depends_on = None
+
+
+# Kept in sync with app.models.wine (migrations do not import app code)
+SEARCH_TEXT_SQL = (
+    "lower(f_unaccent("
+    "coalesce(name, '') || ' ' || coalesce(producer, '') || ' ' || coalesce(region, '')"
+    "))"
+)
+
+
+def column_exists(table_name: str, column_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    columns = [col["name"] for col in inspector.get_columns(table_name)]
+    return column_name in columns
+
+
+def index_exists(table_name: str, index_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return index_name in [idx["name"] for idx in inspector.get_indexes(table_name)]
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    op.execute(
+        "CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text "
+        "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT "
+        "AS $$ SELECT public.unaccent('public.unaccent', $1) $$"
+    )
+
+    if not column_exists("wines", "search_text"):
+        op.execute(
+            f"ALTER TABLE wines ADD COLUMN search_text TEXT "
+            f"GENERATED ALWAYS AS ({SEARCH_TEXT_SQL}) STORED"
+        )
+    if not index_exists("wines", "ix_wines_search_text_trgm"):
+        op.execute(
+            "CREATE INDEX ix_wines_search_text_trgm ON wines "
+            "USING gin (search_text gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    if index_exists("wines", "ix_wines_search_text_trgm"):
+        op.drop_index("ix_wines_search_text_trgm", table_name="wines")
+    if column_exists("wines", "search_text"):
+        op.drop_column("wines", "search_text")
+    op.execute("DROP FUNCTION IF EXISTS f_unaccent(text)")
@@ -0,0 +1,59 @@
+"""Make user_wine_tags links unique per (tag, wine).
+
+Removes duplicate (tag_id, user_wine_id) links, keeping the earliest, then
+adds a unique (tag_id, user_wine_id) index. The index backs the tag list
+filter's EXISTS probes and replaces the single tag_id index.
+
+Revision ID: 20260212_002
+Revises: 20260212_001
+Create Date: 2026-02-12
+"""
+
+from sqlalchemy import inspect
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20260212_002"
+down_revision = "20260212_001"
+branch_labels = None
+depends_on = None
+
+
+def index_exists(table_name: str, index_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return index_name in [idx["name"] for idx in inspector.get_indexes(table_name)]
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        DELETE FROM user_wine_tags
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY tag_id, user_wine_id ORDER BY created_at, id
+                ) AS position
+                FROM user_wine_tags
+            ) ranked
+            WHERE ranked.position > 1
+        )
+        """
+    )
+    if not index_exists("user_wine_tags", "ux_user_wine_tags_tag_user_wine"):
+        op.create_index(
+            "ux_user_wine_tags_tag_user_wine",
+            "user_wine_tags",
+            ["tag_id", "user_wine_id"],
+            unique=True,
+        )
+    if index_exists("user_wine_tags", "ix_user_wine_tags_tag_id"):
+        op.drop_index("ix_user_wine_tags_tag_id", table_name="user_wine_tags")
+
+
+def downgrade() -> None:
+    if not index_exists("user_wine_tags", "ix_user_wine_tags_tag_id"):
+        op.create_index("ix_user_wine_tags_tag_id", "user_wine_tags", ["tag_id"], unique=False)
+    if index_exists("user_wine_tags", "ux_user_wine_tags_tag_user_wine"):
+        op.drop_index("ux_user_wine_tags_tag_user_wine", table_name="user_wine_tags")
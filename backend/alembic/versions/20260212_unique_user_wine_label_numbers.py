@@ -0,0 +1,62 @@
+"""Make user_wines label numbers unique per user.
+
+Label numbers used to be allocated without a lock, so concurrent adds
+could hand out the same YY-N twice. Duplicates are kept on the earliest
+wine and suffixed on the others (26-5, 26-5-2, 26-5-3), which keeps the
+printed number recognizable and cannot collide with allocated YY-N
+labels. Then a unique (user_id, label_number) index replaces the single
+label_number index.
+
+Revision ID: 20260212_005
+Revises: 20260212_004
+Create Date: 2026-02-12
+"""
+
+from sqlalchemy import inspect
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20260212_005"
+down_revision = "20260212_004"
+branch_labels = None
+depends_on = None
+
+
+def index_exists(table_name: str, index_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return index_name in [idx["name"] for idx in inspector.get_indexes(table_name)]
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        UPDATE user_wines
+        SET label_number = ranked.label_number || '-' || ranked.position
+        FROM (
+            SELECT id, label_number, row_number() OVER (
+                PARTITION BY user_id, label_number ORDER BY created_at, id
+            ) AS position
+            FROM user_wines
+            WHERE label_number IS NOT NULL
+        ) ranked
+        WHERE user_wines.id = ranked.id AND ranked.position > 1
+        """
+    )
+    if not index_exists("user_wines", "ux_user_wines_user_label_number"):
+        op.create_index(
+            "ux_user_wines_user_label_number",
+            "user_wines",
+            ["user_id", "label_number"],
+            unique=True,
+        )
+    if index_exists("user_wines", "ix_user_wines_label_number"):
+        op.drop_index("ix_user_wines_label_number", table_name="user_wines")
+
+
+def downgrade() -> None:
+    if not index_exists("user_wines", "ix_user_wines_label_number"):
+        op.create_index("ix_user_wines_label_number", "user_wines", ["label_number"], unique=False)
+    if index_exists("user_wines", "ux_user_wines_user_label_number"):
+        op.drop_index("ux_user_wines_user_label_number", table_name="user_wines")
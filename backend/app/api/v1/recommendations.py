@@ -1,15 +1,24 @@
 """Recommendations API endpoints."""
 
-from fastapi import APIRouter, Query
+import json
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 
 from app.api.deps import CurrentUser, DbSession
+from app.database import async_session_maker
 from app.schemas.common import ResponseModel, PaginatedResponse
 from app.schemas.recommendation import (
+    MenuRecommendationRequest,
+    MenuRecommendationResponse,
     RecommendationRequest,
     RecommendationResponse,
     RecommendationHistoryItem,
 )
 from app.services.recommendation_service import RecommendationService
+from app.utils.pagination import decode_cursor
 
 router = APIRouter()
 
@@ -28,24 +37,101 @@ async def get_recommendations(
         query_type=request.query_type,
         preferences=request.preferences,
         user_language=current_user.language,
+        mode=request.mode,
+    )
+
+    return ResponseModel(data=result)
+
+
+@router.post("/menu", response_model=ResponseModel[MenuRecommendationResponse])
+async def get_menu_recommendations(
+    request: MenuRecommendationRequest,
+    current_user: CurrentUser,
+    db: DbSession,
+):
+    """Get wine pairing recommendations for every course of a menu in one request."""
+    service = RecommendationService(db)
+    result = await service.get_menu_recommendations(
+        user_id=current_user.id,
+        courses=request.courses,
+        preferences=request.preferences,
+        user_language=current_user.language,
+        unique_bottles=request.unique_bottles,
+        mode=request.mode,
     )
 
     return ResponseModel(data=result)
 
 
+@router.post("/stream")
+async def stream_recommendations(
+    request: RecommendationRequest,
+    current_user: CurrentUser,
+):
+    """Stream wine pairing recommendations as newline-delimited JSON.
+
+    Each line is one event: ``meta``, then one ``recommendation`` per pick as
+    soon as it is generated, then ``general_advice`` and ``done``.
+    """
+    user_id = current_user.id
+    user_language = current_user.language
+
+    async def event_lines():
+        # The request-scoped session is closed once the endpoint returns,
+        # so the stream uses its own.
+        async with async_session_maker() as db:
+            service = RecommendationService(db)
+            async for event in service.stream_recommendations(
+                user_id=user_id,
+                query=request.query,
+                query_type=request.query_type,
+                preferences=request.preferences,
+                user_language=user_language,
+                mode=request.mode,
+            ):
+                yield json.dumps(event, ensure_ascii=False, default=str) + "\n"
+
+    return StreamingResponse(
+        event_lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/cache/stats", response_model=ResponseModel[dict])
+async def get_recommendation_cache_stats(current_user: CurrentUser):
+    """Get recommendation cache hit statistics for this server process."""
+    return ResponseModel(data=RecommendationService.get_cache_stats())
+
+
+def _parse_history_cursor(cursor: str | None) -> tuple[datetime, UUID] | None:
+    if not cursor:
+        return None
+    try:
+        created_at, recommendation_id = decode_cursor(cursor, 2)
+        return datetime.fromisoformat(created_at), UUID(recommendation_id)
+    except (TypeError, ValueError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid cursor value",
+        ) from exc
+
+
 @router.get("/history", response_model=PaginatedResponse[RecommendationHistoryItem])
 async def get_recommendation_history(
     current_user: CurrentUser,
     db: DbSession,
+    cursor: str | None = None,
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
 ):
-    """Get user's recommendation history."""
+    """Get user's recommendation history (pass `next_cursor` as `cursor` for the next page)."""
     service = RecommendationService(db)
     result = await service.get_history(
         user_id=current_user.id,
-        page=page,
         size=size,
+        cursor=_parse_history_cursor(cursor),
+        page=page,
     )
 
     return result
@@ -12,14 +12,20 @@ from app.schemas.common import ResponseModel, PaginatedResponse
 from app.schemas.wine import (
     UserWineCreate,
     UserWineBatchCreate,
+    UserWineBatchResponse,
     UserWineUpdate,
     UserWineResponse,
-    UserWineListResponse,
+    UserWineSummaryResponse,
     WineStatusUpdate,
     WineQuantityUpdate,
     WineAIAnalysisResponse,
+    WineFacetsResponse,
+    WineSuggestion,
+    WINE_SUMMARY_OPTIONAL_FIELDS,
 )
-from app.services.wine_service import WineService
+from app.services.wine_service import WINE_SORT_KEYS, WineService
+from app.services.wine_facet_service import WineFacetService
+from app.services.wine_suggest_service import WineSuggestService
 from app.services.ai_service import AIService
 
 router = APIRouter()
@@ -43,10 +49,49 @@ def _parse_tag_ids(tag_ids: str | None) -> list[UUID] | None:
     return parsed or None
 
 
-@router.get("", response_model=PaginatedResponse[UserWineListResponse])
+def _parse_fields(fields: str | None) -> set[str] | None:
+    if not fields:
+        return None
+
+    parsed = {field.strip() for field in fields.split(",") if field.strip()}
+    if not parsed <= WINE_SUMMARY_OPTIONAL_FIELDS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid fields value",
+        )
+    return parsed or None
+
+
+def _validate_sort(sort: str | None, search: str | None) -> str:
+    sort = WineService.default_sort(sort, search)
+    if sort not in WINE_SORT_KEYS or (sort == "relevance" and not search):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid sort value",
+        )
+    return sort
+
+
+def _parse_wines_cursor(
+    cursor: str | None, sort: str, order: str
+) -> tuple[object, UUID] | None:
+    if not cursor:
+        return None
+    try:
+        return WineService.parse_cursor(cursor, sort, order)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid cursor value",
+        ) from exc
+
+
+@router.get("", response_model=PaginatedResponse[UserWineSummaryResponse])
 async def list_wines(
     current_user: CurrentUser,
     db: DbSession,
+    cursor: str | None = None,
+    include_total: bool | None = None,
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
     status: WineStatus | None = None,
@@ -54,16 +99,26 @@ async def list_wines(
     type: WineType | None = None,
     country: str | None = None,
     grape: str | None = None,
+    food: str | None = None,
+    flavor: str | None = None,
     tag_id: UUID | None = None,
     tag_ids: str | None = None,
+    tag_mode: Literal["any", "all"] = "any",
     drinking_window: Literal["now", "aging", "urgent"] | None = None,
     min_price: int | None = None,
     max_price: int | None = None,
-    sort: str = "created_at",
+    sort: str | None = None,
     order: Literal["asc", "desc"] = "desc",
     search: str | None = None,
+    fields: str | None = None,
 ):
-    """Get user's wine collection with filters and pagination."""
+    """Get user's wine collection with filters and pagination.
+
+    Pass `next_cursor` as `cursor` for the next page. `include_total`
+    defaults to true for `page` paging and false with a cursor. Wines carry
+    the card fields only; request more with `fields` (e.g. `grape_variety,abv`).
+    """
+    sort = _validate_sort(sort, search)
     service = WineService(db)
     result = await service.get_user_wines(
         user_id=current_user.id,
@@ -74,18 +129,94 @@ async def list_wines(
         wine_type=type,
         country=country,
         grape=grape,
+        food=food,
+        flavor=flavor,
         tag_id=tag_id,
         tag_ids=_parse_tag_ids(tag_ids),
+        tag_mode=tag_mode,
         drinking_window=drinking_window,
         min_price=min_price,
         max_price=max_price,
         sort=sort,
         order=order,
         search=search,
+        cursor=_parse_wines_cursor(cursor, sort, order),
+        include_total=include_total,
+        fields=_parse_fields(fields),
     )
     return result
 
 
+@router.get("/facets", response_model=ResponseModel[WineFacetsResponse])
+async def get_wine_facets(
+    current_user: CurrentUser,
+    db: DbSession,
+    status: WineStatus | None = None,
+    include_all_statuses: bool = Query(False),
+    type: WineType | None = None,
+    country: str | None = None,
+    grape: str | None = None,
+    food: str | None = None,
+    flavor: str | None = None,
+    tag_id: UUID | None = None,
+    tag_ids: str | None = None,
+    tag_mode: Literal["any", "all"] = "any",
+    drinking_window: Literal["now", "aging", "urgent"] | None = None,
+    min_price: int | None = None,
+    max_price: int | None = None,
+    search: str | None = None,
+):
+    """Count wines per type, country, grape and tag for the list filters.
+
+    Takes the same filters as `GET /wines`; counts are cached until the
+    collection changes.
+    """
+    service = WineFacetService(db)
+    facets = await service.get_facets(
+        user_id=current_user.id,
+        collection_version=current_user.collection_version,
+        status=status,
+        include_all_statuses=include_all_statuses,
+        wine_type=type,
+        country=country,
+        grape=grape,
+        food=food,
+        flavor=flavor,
+        tag_id=tag_id,
+        tag_ids=_parse_tag_ids(tag_ids),
+        tag_mode=tag_mode,
+        drinking_window=drinking_window,
+        min_price=min_price,
+        max_price=max_price,
+        search=search,
+    )
+    return ResponseModel(data=facets)
+
+
+@router.get("/suggest", response_model=ResponseModel[list[WineSuggestion]])
+async def suggest_wines(
+    current_user: CurrentUser,
+    db: DbSession,
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=20),
+    include_global: bool = Query(True),
+):
+    """Autocomplete wine names, producers, regions and grapes.
+
+    Served from in-memory prefix indexes: the user's collection first,
+    then common wine names and producers (`include_global`).
+    """
+    service = WineSuggestService(db)
+    suggestions = await service.suggest(
+        user_id=current_user.id,
+        collection_version=current_user.collection_version,
+        query=q,
+        limit=limit,
+        include_global=include_global,
+    )
+    return ResponseModel(data=suggestions)
+
+
 @router.post("", response_model=ResponseModel[UserWineResponse], status_code=status.HTTP_201_CREATED)
 async def create_wine(
     wine_data: UserWineCreate,
@@ -101,15 +232,29 @@ async def create_wine(
     )
 
 
-@router.post("/batch", response_model=ResponseModel[dict], status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/batch",
+    response_model=ResponseModel[UserWineBatchResponse],
+    status_code=status.HTTP_201_CREATED,
+)
 async def create_wines_batch(
     batch_data: UserWineBatchCreate,
     current_user: CurrentUser,
     db: DbSession,
 ):
-    """Add multiple wines to user's collection."""
+    """Add multiple wines (up to 100) to user's collection in one transaction.
+
+    Each item takes the same fields as `POST /wines`; `common_tags` and
+    `common_purchase_date` apply to every item.
+    """
     service = WineService(db)
-    result = await service.create_user_wines_batch(current_user.id, batch_data)
+    try:
+        result = await service.create_user_wines_batch(current_user.id, batch_data)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(exc),
+        ) from exc
     return ResponseModel(
         data=result,
         message=f"{result['total_bottles']} bottles added to your collection",
@@ -66,8 +66,46 @@ class Settings(BaseSettings):
     recommendation_ai_provider: str = ""  # Empty = use ai_provider
     recommendation_ai_model: str = ""  # Empty = use provider default
 
+    recommendation_ai_timeout_seconds: float = 20.0  # Fall back to the offline engine after this
+
+    # Gemini explicit context caching of the pairing prompt prefix (collection snapshot)
+    gemini_context_cache_ttl_seconds: int = 3600  # 0 = disable
+    gemini_context_cache_min_chars: int = 16000  # Shorter prefixes are below Gemini's cache minimum
+
     # Recommendation cache
     recommendation_cache_ttl_hours: int = 24  # Cache expiry in hours
+    recommendation_cache_similarity_threshold: float = 0.85  # Fuzzy query match threshold
+    recommendation_cache_fuzzy_candidates: int = 50  # Recent cached queries compared per lookup
+    recommendation_cache_max_entries_per_user: int = 200  # 0 = unlimited
+    recommendation_cache_maintenance_interval_minutes: int = 60  # 0 = disable in-process sweeps
+    recommendation_cache_warming_enabled: bool = True
+    recommendation_cache_warming_delay_seconds: int = 30  # Debounce after the last collection edit
+    recommendation_cache_warming_max_queries: int = 3  # Popular queries refreshed per user
+    recommendation_cache_warming_min_count: int = 2  # Minimum past requests to count as popular
+
+    # Recommendation history (write-behind, see app.services.history_writer)
+    recommendation_history_write_behind: bool = True  # False = insert inline before responding
+    recommendation_history_queue_size: int = 1000
+    recommendation_history_batch_size: int = 100  # Rows per multi-row INSERT
+    recommendation_history_flush_interval_seconds: float = 1.0
+    recommendation_history_overflow_policy: str = "drop"  # "drop" or "block" (backpressure)
+    # Monthly history partitions (see app.services.history_partition_service)
+    recommendation_history_partition_months_ahead: int = 3
+    recommendation_history_partition_interval_hours: int = 24  # 0 = disable in-process runs
+    recommendation_history_retention_months: int = 0  # 0 = keep forever
+    recommendation_history_retention_mode: str = "detach"  # "detach" (keep table for export) or "drop"
+
+    # Wine autocomplete (in-memory prefix indexes, see app.services.wine_suggest_service)
+    wine_suggest_max_cached_users: int = 1000  # Least recently used collections are evicted
+    wine_suggest_global_refresh_minutes: int = 10
+    wine_suggest_global_max_rows: int = 50000  # Most common (name, producer) pairs indexed
+
+    # Wine list facet counts (in-memory, see app.services.wine_facet_service)
+    wine_facets_max_cached_entries: int = 5000  # (user, collection version, filters) results kept
+
+    # Wine master deduplication (batch job, see app.services.wine_dedup_service)
+    wine_dedup_name_similarity: float = 0.8  # Trigram similarity of folded names (and producers)
+    wine_dedup_chunk_size: int = 1000  # Wines scanned / clusters merged per statement batch
 
     @property
     def effective_scan_provider(self) -> str:
@@ -93,6 +131,8 @@ class Settings(BaseSettings):
         provider = self.effective_recommendation_provider.lower()
         if provider == "gemini":
             return self.gemini_model
+        if provider == "fake":
+            return "fake"
         return "claude-sonnet-4-20250514"
 
     # Storage (Cloudflare R2)
@@ -1,6 +1,7 @@
 """FastAPI application entry point."""
 
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -10,6 +11,10 @@ from app.config import settings
 from app.database import close_db, init_db, async_session_maker
 from app.api.v1.router import api_router
 from app.seeds import run_seeds
+from app.services.cache_maintenance_service import cache_maintenance_loop
+from app.services.cache_warming_service import cache_warmer
+from app.services.history_partition_service import history_partition_loop
+from app.services.history_writer import history_writer
 from app.logging_config import setup_logging, get_logger
 
 # Initialize logging
@@ -33,11 +38,32 @@ async def lifespan(app: FastAPI):
     async with async_session_maker() as db:
         await run_seeds(db)
 
+    # Periodic recommendation cache maintenance
+    maintenance_task = None
+    if settings.recommendation_cache_maintenance_interval_minutes > 0:
+        maintenance_task = asyncio.create_task(
+            cache_maintenance_loop(settings.recommendation_cache_maintenance_interval_minutes)
+        )
+
+    # Recommendation history partitions (upcoming months, retention)
+    partition_task = None
+    if settings.recommendation_history_partition_interval_hours > 0:
+        partition_task = asyncio.create_task(
+            history_partition_loop(settings.recommendation_history_partition_interval_hours)
+        )
+
     logger.info("Application ready")
     yield
 
     # Shutdown
     logger.info("Application shutting down")
+    for task in (maintenance_task, partition_task):
+        if task:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    await cache_warmer.shutdown()
+    await history_writer.shutdown()
     await close_db()
 
 
@@ -2,8 +2,9 @@
 
 import uuid
 from datetime import datetime
+from decimal import Decimal
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import DDL, DateTime, ForeignKey, Index, Integer, Numeric, String, Text, event, text
 from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -12,9 +13,19 @@ from app.database import Base
 
 
 class Recommendation(Base):
-    """AI recommendation history model."""
+    """AI recommendation history model.
+
+    Range-partitioned by month on ``created_at`` (hence the composite
+    primary key); partitions are managed by
+    ``app.services.history_partition_service``.
+    """
 
     __tablename__ = "recommendations"
+    __table_args__ = (
+        # History listing: newest first per user, keyset-paginated
+        Index("ix_recommendations_user_created", "user_id", text("created_at DESC"), text("id DESC")),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -39,12 +50,18 @@ class Recommendation(Base):
         nullable=True,
     )
 
+    # List summary, filled at write time so history pages never read `result`
+    top_wine_name: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    top_match_score: Mapped[Decimal | None] = mapped_column(Numeric(4, 3), nullable=True)
+    item_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
     # AI metadata
     ai_model: Mapped[str | None] = mapped_column(String(50), nullable=True)
     ai_tokens_used: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
+        primary_key=True,
         server_default=func.now(),
     )
 
@@ -53,3 +70,11 @@ class Recommendation(Base):
 
     def __repr__(self) -> str:
         return f"<Recommendation {self.id}>"
+
+
+# Rows outside every monthly partition land here until their month is created
+event.listen(
+    Recommendation.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS recommendations_default PARTITION OF recommendations DEFAULT"),
+)
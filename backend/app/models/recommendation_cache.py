@@ -3,7 +3,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -24,6 +24,15 @@ class RecommendationCache(Base):
     """
 
     __tablename__ = "recommendation_cache"
+    __table_args__ = (
+        # Fuzzy query lookup and per-user cap ranking
+        Index(
+            "ix_recommendation_cache_user_type_hash",
+            "user_id",
+            "query_type",
+            "wine_collection_hash",
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -46,6 +55,12 @@ class RecommendationCache(Base):
     wine_collection_hash: Mapped[str] = mapped_column(
         String(64), nullable=False,
     )
+    # Sorted, comma-joined wine type filter ("" = unfiltered), so maintenance
+    # can tell a changed collection from a different filter. NULL on entries
+    # written before it was stored.
+    wine_types_filter: Mapped[str | None] = mapped_column(
+        String(100), nullable=True,
+    )
 
     # Cached AI response
     ai_result: Mapped[dict] = mapped_column(JSONB, nullable=False)
@@ -60,6 +75,7 @@ class RecommendationCache(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
+        index=True,  # Expiry sweeps
     )
 
     # Relationships
@@ -4,7 +4,7 @@ import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -75,6 +75,10 @@ class UserWineTag(Base):
     """Association table for UserWine and Tag many-to-many relationship."""
 
     __tablename__ = "user_wine_tags"
+    __table_args__ = (
+        # One link per (tag, wine); also serves tag filter EXISTS probes
+        Index("ux_user_wine_tags_tag_user_wine", "tag_id", "user_wine_id", unique=True),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -91,7 +95,6 @@ class UserWineTag(Base):
         UUID(as_uuid=True),
         ForeignKey("tags.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
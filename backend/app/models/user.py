@@ -42,6 +42,10 @@ class User(Base):
     is_verified: Mapped[bool] = mapped_column(Boolean, default=False)
     next_label_sequence: Mapped[int] = mapped_column(Integer, default=1)
     label_sequence_year: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Incremented on every collection change; used to invalidate derived caches
+    collection_version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0",
+    )
 
     last_login_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True),
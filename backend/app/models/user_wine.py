@@ -5,10 +5,24 @@ import uuid
 from datetime import date, datetime
 from decimal import Decimal
 
-from sqlalchemy import Date, DateTime, ForeignKey, Integer, Numeric, SmallInteger, String, Text
+from sqlalchemy import (
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    SmallInteger,
+    String,
+    Text,
+    and_,
+    literal,
+    text,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
+from sqlalchemy.sql.elements import ColumnElement
 
 from app.database import Base
 
@@ -21,10 +35,52 @@ class WineStatus(str, enum.Enum):
     GIFTED = "gifted"
 
 
+# Predicate of the partial indexes below: almost every collection query
+# reads only the user's live, owned wines (see ``owned_condition``)
+OWNED_INDEX_WHERE = "deleted_at IS NULL AND status = 'owned'"
+
+
 class UserWine(Base):
     """User's wine collection model."""
 
     __tablename__ = "user_wines"
+    __table_args__ = (
+        # Owned-wine reads: collection list sorts (WINE_SORT_KEYS, keyset-paginated
+        # on id; nullable columns match the default DESC NULLS LAST order),
+        # dashboard and recommendation candidates
+        Index(
+            "ix_user_wines_owned_created",
+            "user_id",
+            text("created_at DESC"),
+            text("id DESC"),
+            postgresql_where=text(OWNED_INDEX_WHERE),
+        ),
+        Index(
+            "ix_user_wines_owned_price",
+            "user_id",
+            text("purchase_price DESC NULLS LAST"),
+            text("id DESC"),
+            postgresql_where=text(OWNED_INDEX_WHERE),
+        ),
+        Index(
+            "ix_user_wines_owned_purchase_date",
+            "user_id",
+            text("purchase_date DESC NULLS LAST"),
+            text("id DESC"),
+            postgresql_where=text(OWNED_INDEX_WHERE),
+        ),
+        # Dashboard "consumed this month"
+        Index(
+            "ix_user_wines_user_consumed",
+            "user_id",
+            "consumed_at",
+            postgresql_where=text("status = 'consumed'"),
+        ),
+        # Join probe for sorts on wines columns (also serves wine_id lookups)
+        Index("ix_user_wines_wine_user", "wine_id", "user_id"),
+        # Label numbers are allocated per user (WineService._allocate_label_numbers)
+        Index("ux_user_wines_user_label_number", "user_id", "label_number", unique=True),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -41,7 +97,6 @@ class UserWine(Base):
         UUID(as_uuid=True),
         ForeignKey("wines.id", ondelete="RESTRICT"),
         nullable=False,
-        index=True,
     )
 
     # Ownership info
@@ -50,7 +105,6 @@ class UserWine(Base):
         String(20),
         nullable=False,
         default=WineStatus.OWNED.value,
-        index=True,
     )
 
     # Purchase info (optional)
@@ -66,7 +120,7 @@ class UserWine(Base):
     original_image_url: Mapped[str | None] = mapped_column(String(500), nullable=True)
 
     # Label number for easy identification (e.g., "WC-001")
-    label_number: Mapped[str | None] = mapped_column(String(20), nullable=True, index=True)
+    label_number: Mapped[str | None] = mapped_column(String(20), nullable=True)
 
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(
@@ -104,3 +158,15 @@ class UserWine(Base):
 
     def __repr__(self) -> str:
         return f"<UserWine {self.id} - {self.wine_id}>"
+
+
+def owned_condition() -> ColumnElement:
+    """Filter for the user's live, owned wines, matching ``OWNED_INDEX_WHERE``.
+
+    The status is rendered into the SQL rather than bound, so generic plans
+    of prepared statements can still prove the partial index predicate.
+    """
+    return and_(
+        UserWine.deleted_at.is_(None),
+        UserWine.status == literal(WineStatus.OWNED.value, literal_execute=True),
+    )
@@ -5,7 +5,18 @@ import uuid
 from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import DateTime, Integer, Numeric, SmallInteger, String, Text
+from sqlalchemy import (
+    DDL,
+    Computed,
+    DateTime,
+    Index,
+    Integer,
+    Numeric,
+    SmallInteger,
+    String,
+    Text,
+    event,
+)
 from sqlalchemy.dialects.postgresql import ARRAY, JSON, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -25,10 +36,57 @@ class WineType(str, enum.Enum):
     OTHER = "other"
 
 
+SEARCH_TEXT_SQL = (
+    "lower(f_unaccent("
+    "coalesce(name, '') || ' ' || coalesce(producer, '') || ' ' || coalesce(region, '')"
+    "))"
+)
+
+# unaccent() is only STABLE; generated columns and indexes need an IMMUTABLE wrapper.
+# f_fold_array() applies the same folding to each element of a text array.
+SEARCH_FUNCTIONS_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    "CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text "
+    "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT "
+    "AS $$ SELECT public.unaccent('public.unaccent', $1) $$",
+    "CREATE OR REPLACE FUNCTION f_fold_array(text[]) RETURNS text[] "
+    "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT "
+    "AS $$ SELECT array_agg(DISTINCT lower(public.f_unaccent(btrim(value)))) "
+    "FROM unnest($1) AS value WHERE btrim(value) <> '' $$",
+)
+
+# Folded copies of the array columns, filtered with GIN-indexed containment
+ARRAY_KEY_COLUMNS = {
+    "grape_variety_keys": "f_fold_array(grape_variety::text[])",
+    "food_pairing_keys": "f_fold_array(food_pairing)",
+    "flavor_notes_keys": "f_fold_array(flavor_notes)",
+}
+
+
 class Wine(Base):
     """Wine master data model."""
 
     __tablename__ = "wines"
+    __table_args__ = (
+        # One master per producer/name/vintage (app.services.wine_identity);
+        # NULL on legacy duplicates awaiting the dedup job
+        Index("ux_wines_identity_key", "identity_key", unique=True),
+        # Drinking-window range filters and sort (app.services.drinking_window)
+        Index("ix_wines_drinking_window", "drinking_window_end", "drinking_window_start"),
+        # Collection search (app.services.wine_search)
+        Index(
+            "ix_wines_search_text_trgm",
+            "search_text",
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
+        # grape / food / flavor list filters (app.services.wine_search)
+        *(
+            Index(f"ix_wines_{name}", name, postgresql_using="gin")
+            for name in ARRAY_KEY_COLUMNS
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -75,6 +133,33 @@ class Wine(Base):
     image_url: Mapped[str | None] = mapped_column(String(500), nullable=True)
     ai_confidence: Mapped[Decimal | None] = mapped_column(Numeric(3, 2), nullable=True)
 
+    # Folded "producer|name|vintage" (app.services.wine_identity.wine_identity_key)
+    identity_key: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    # Lower-cased, unaccented name/producer/region for search (database-generated)
+    search_text: Mapped[str | None] = mapped_column(
+        Text,
+        Computed(SEARCH_TEXT_SQL, persisted=True),
+        deferred=True,
+    )
+
+    # Lower-cased, unaccented, de-duplicated array values for filters (database-generated)
+    grape_variety_keys: Mapped[list[str] | None] = mapped_column(
+        ARRAY(Text),
+        Computed(ARRAY_KEY_COLUMNS["grape_variety_keys"], persisted=True),
+        deferred=True,
+    )
+    food_pairing_keys: Mapped[list[str] | None] = mapped_column(
+        ARRAY(Text),
+        Computed(ARRAY_KEY_COLUMNS["food_pairing_keys"], persisted=True),
+        deferred=True,
+    )
+    flavor_notes_keys: Mapped[list[str] | None] = mapped_column(
+        ARRAY(Text),
+        Computed(ARRAY_KEY_COLUMNS["flavor_notes_keys"], persisted=True),
+        deferred=True,
+    )
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
@@ -93,3 +178,7 @@ class Wine(Base):
 
     def __repr__(self) -> str:
         return f"<Wine {self.name} {self.vintage}>"
+
+
+for statement in SEARCH_FUNCTIONS_DDL:
+    event.listen(Wine.__table__, "before_create", DDL(statement))
@@ -16,6 +16,8 @@ from app.schemas.wine import (
     UserWineUpdate,
     UserWineResponse,
     UserWineListResponse,
+    UserWineSummaryResponse,
+    WineSummaryResponse,
     WineStatusUpdate,
     WineQuantityUpdate,
 )
@@ -55,6 +57,8 @@ __all__ = [
     "UserWineUpdate",
     "UserWineResponse",
     "UserWineListResponse",
+    "UserWineSummaryResponse",
+    "WineSummaryResponse",
     "WineStatusUpdate",
     "WineQuantityUpdate",
     # Tag
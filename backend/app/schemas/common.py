@@ -37,14 +37,19 @@ class ErrorResponse(BaseModel):
 
 
 class PaginationMeta(BaseModel):
-    """Pagination metadata."""
+    """Pagination metadata.
 
-    total: int
-    page: int
+    Keyset-paginated endpoints set ``next_cursor`` and may omit ``total``,
+    ``total_pages`` and ``page``.
+    """
+
+    total: int | None = None
+    page: int | None = None
     size: int
-    total_pages: int
+    total_pages: int | None = None
     has_next: bool
     has_prev: bool
+    next_cursor: str | None = None
 
 
 class PaginatedData(BaseModel, Generic[T]):
@@ -24,6 +24,23 @@ class RecommendationRequest(BaseModel):
     query: str = Field(..., min_length=1, max_length=500)
     query_type: Literal["food", "occasion", "mood"] = "food"
     preferences: RecommendationPreferences | None = None
+    mode: Literal["ai", "fast"] = "ai"  # "fast" = offline rule-based engine only
+
+
+class MenuCourse(BaseModel):
+    """One course of a menu recommendation request."""
+
+    query: str = Field(..., min_length=1, max_length=500)
+    query_type: Literal["food", "occasion", "mood"] = "food"
+
+
+class MenuRecommendationRequest(BaseModel):
+    """Multi-course menu recommendation request."""
+
+    courses: list[MenuCourse] = Field(..., min_length=1, max_length=8)
+    preferences: RecommendationPreferences | None = None
+    unique_bottles: bool = True  # Don't pour the same bottle for two courses
+    mode: Literal["ai", "fast"] = "ai"
 
 
 class RecommendationItem(BaseModel):
@@ -51,6 +68,27 @@ class RecommendationResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class MenuCourseRecommendation(BaseModel):
+    """Recommendations for one course of a menu."""
+
+    course_index: int
+    query: str
+    query_type: str
+    recommendations: list[RecommendationItem]
+    general_advice: str | None = None
+    cached: bool = False
+
+
+class MenuRecommendationResponse(BaseModel):
+    """Multi-course menu recommendation response."""
+
+    recommendation_id: UUID
+    courses: list[MenuCourseRecommendation]
+    general_advice: str | None = None
+    no_match_alternatives: str | None = None
+    created_at: datetime
+
+
 class RecommendationHistoryItem(BaseModel):
     """Recommendation history list item."""
 
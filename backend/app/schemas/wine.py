@@ -5,7 +5,7 @@ from decimal import Decimal
 from typing import Literal
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, SerializerFunctionWrapHandler, model_serializer
 
 from app.models.wine import WineType
 from app.models.user_wine import WineStatus
@@ -114,10 +114,10 @@ class UserWineCreate(BaseModel):
 class UserWineBatchCreate(BaseModel):
     """Batch user wine creation request."""
 
-    scan_session_id: str
-    wines: list[dict]  # List of wine creation data
-    common_tags: list[UUID] | None = None
-    common_purchase_date: date | None = None
+    scan_session_id: str | None = None
+    wines: list[UserWineCreate] = Field(..., min_length=1, max_length=100)
+    common_tags: list[UUID] | None = None  # Added to every wine's tag_ids
+    common_purchase_date: date | None = None  # Used where purchase_date is not set
 
 
 class UserWineUpdate(BaseModel):
@@ -205,6 +205,103 @@ class UserWineListResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+# Wine fields a list card always gets; anything else is opt-in via ``fields=``
+WINE_SUMMARY_FIELDS = frozenset(
+    {"id", "name", "producer", "vintage", "type", "country", "region", "image_url"}
+)
+
+
+class WineSummaryResponse(BaseModel):
+    """Wine summary for collection list cards.
+
+    Only the card fields are serialized by default; the optional fields are
+    included when the service sets them (requested through ``fields=``).
+    """
+
+    id: UUID
+    name: str
+    producer: str | None = None
+    vintage: int | None = None
+    type: WineType = WineType.RED
+    country: str | None = None
+    region: str | None = None
+    image_url: str | None = None
+    grape_variety: list[str] | None = None
+    appellation: str | None = None
+    abv: Decimal | None = None
+    taste_profile: TasteProfile | None = None
+    food_pairing: list[str] | None = None
+    flavor_notes: list[str] | None = None
+    serving_temp_min: int | None = None
+    serving_temp_max: int | None = None
+    drinking_window_start: int | None = None
+    drinking_window_end: int | None = None
+    description: str | None = None
+    ai_confidence: Decimal | None = None
+    ai_analysis: dict | None = None
+
+    @model_serializer(mode="wrap")
+    def _serialize_requested(self, handler: SerializerFunctionWrapHandler) -> dict:
+        data = handler(self)
+        return {
+            key: value
+            for key, value in data.items()
+            if key in WINE_SUMMARY_FIELDS or key in self.model_fields_set
+        }
+
+
+WINE_SUMMARY_OPTIONAL_FIELDS = frozenset(WineSummaryResponse.model_fields) - WINE_SUMMARY_FIELDS
+
+
+class UserWineSummaryResponse(BaseModel):
+    """User wine collection list item (card projection)."""
+
+    id: UUID
+    quantity: int
+    status: WineStatus
+    purchase_date: date | None = None
+    purchase_price: Decimal | None = None
+    label_number: str | None = None
+    created_at: datetime
+    wine: WineSummaryResponse
+    tags: list[TagInWine] = []
+    drinking_status: str | None = None
+
+
+class UserWineBatchResponse(BaseModel):
+    """Batch user wine creation result."""
+
+    created_count: int
+    total_bottles: int
+    user_wines: list[UserWineSummaryResponse]
+
+
+class WineSuggestion(BaseModel):
+    """Autocomplete suggestion."""
+
+    text: str
+    field: Literal["name", "producer", "region", "grape"]
+    source: Literal["collection", "global"]
+
+
+class WineFacetCount(BaseModel):
+    """Wine count for one facet value."""
+
+    value: str  # Filter parameter value (type, country, folded grape, tag id)
+    label: str
+    count: int
+
+
+class WineFacetsResponse(BaseModel):
+    """Wine list facet counts for the current filters."""
+
+    total: int
+    type: list[WineFacetCount] = []
+    country: list[WineFacetCount] = []
+    grape: list[WineFacetCount] = []
+    tag: list[WineFacetCount] = []
+
+
 class WineAIAnalysisResponse(BaseModel):
     """AI wine analysis response."""
 
@@ -2,6 +2,7 @@
 
 from .base import TextProvider, VisionProvider
 from .anthropic import AnthropicTextProvider, AnthropicVisionProvider
+from .fake import FakeTextProvider
 from .gemini import GeminiTextProvider, GeminiVisionProvider
 
 __all__ = [
@@ -9,6 +10,7 @@ __all__ = [
     "VisionProvider",
     "AnthropicTextProvider",
     "AnthropicVisionProvider",
+    "FakeTextProvider",
     "GeminiTextProvider",
     "GeminiVisionProvider",
 ]
@@ -3,11 +3,47 @@
 from __future__ import annotations
 
 import base64
+import logging
+from collections.abc import AsyncIterator
 
 import anthropic
 
 from .base import TextProvider, VisionProvider
 
+logger = logging.getLogger(__name__)
+
+_EPHEMERAL_CACHE = {"type": "ephemeral"}
+
+
+def _text_content(prompt: str, cached_prefix: str | None) -> str | list[dict]:
+    """Build message content with a cache breakpoint after ``cached_prefix``."""
+    if not cached_prefix:
+        return prompt
+    return [
+        {
+            "type": "text",
+            "text": cached_prefix,
+            "cache_control": _EPHEMERAL_CACHE,
+        },
+        {
+            "type": "text",
+            "text": prompt,
+        },
+    ]
+
+
+def _log_cache_usage(kind: str, usage) -> None:
+    if usage is None:
+        return
+    logger.debug(
+        "Anthropic %s usage: input=%s, cache_read=%s, cache_write=%s, output=%s",
+        kind,
+        getattr(usage, "input_tokens", None),
+        getattr(usage, "cache_read_input_tokens", None),
+        getattr(usage, "cache_creation_input_tokens", None),
+        getattr(usage, "output_tokens", None),
+    )
+
 
 class AnthropicVisionProvider(VisionProvider):
     """Vision provider backed by Anthropic's Claude models."""
@@ -23,31 +59,46 @@ class AnthropicVisionProvider(VisionProvider):
         image_content: bytes,
         prompt: str,
         max_tokens: int,
+        cache_prompt: bool = False,
     ) -> str:
         image_base64 = base64.standard_b64encode(image_content).decode("utf-8")
+        image_block = {
+            "type": "image",
+            "source": {
+                "type": "base64",
+                "media_type": "image/jpeg",
+                "data": image_base64,
+            },
+        }
+        if cache_prompt:
+            # Cached prefixes must come first, so the static prompt precedes the image.
+            content = [
+                {
+                    "type": "text",
+                    "text": prompt,
+                    "cache_control": _EPHEMERAL_CACHE,
+                },
+                image_block,
+            ]
+        else:
+            content = [
+                image_block,
+                {
+                    "type": "text",
+                    "text": prompt,
+                },
+            ]
         message = self.client.messages.create(
             model=self.model,
             max_tokens=max_tokens,
             messages=[
                 {
                     "role": "user",
-                    "content": [
-                        {
-                            "type": "image",
-                            "source": {
-                                "type": "base64",
-                                "media_type": "image/jpeg",
-                                "data": image_base64,
-                            },
-                        },
-                        {
-                            "type": "text",
-                            "text": prompt,
-                        },
-                    ],
+                    "content": content,
                 }
             ],
         )
+        _log_cache_usage("vision", getattr(message, "usage", None))
         if not message.content:
             return ""
         return message.content[0].text
@@ -59,24 +110,45 @@ class AnthropicTextProvider(TextProvider):
     name = "anthropic"
 
     def __init__(self, api_key: str, model: str) -> None:
-        self.client = anthropic.Anthropic(api_key=api_key)
+        self.client = anthropic.AsyncAnthropic(api_key=api_key)
         self.model = model
 
     async def generate_text(
         self,
         prompt: str,
         max_tokens: int,
+        cached_prefix: str | None = None,
     ) -> str:
-        message = self.client.messages.create(
+        message = await self.client.messages.create(
             model=self.model,
             max_tokens=max_tokens,
             messages=[
                 {
                     "role": "user",
-                    "content": prompt,
+                    "content": _text_content(prompt, cached_prefix),
                 }
             ],
         )
+        _log_cache_usage("text", getattr(message, "usage", None))
         if not message.content:
             return ""
         return message.content[0].text
+
+    async def stream_text(
+        self,
+        prompt: str,
+        max_tokens: int,
+        cached_prefix: str | None = None,
+    ) -> AsyncIterator[str]:
+        async with self.client.messages.stream(
+            model=self.model,
+            max_tokens=max_tokens,
+            messages=[
+                {
+                    "role": "user",
+                    "content": _text_content(prompt, cached_prefix),
+                }
+            ],
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
@@ -2,7 +2,11 @@
 
 from __future__ import annotations
 
+import hashlib
+import time
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from typing import Any
 
 
 class VisionProvider(ABC):
@@ -16,8 +20,13 @@ class VisionProvider(ABC):
         image_content: bytes,
         prompt: str,
         max_tokens: int,
+        cache_prompt: bool = False,
     ) -> str:
-        """Generate a text response for an image and prompt."""
+        """Generate a text response for an image and prompt.
+
+        ``cache_prompt`` marks ``prompt`` as static so providers that support
+        prompt caching can reuse it across calls.
+        """
         raise NotImplementedError
 
 
@@ -31,6 +40,63 @@ class TextProvider(ABC):
         self,
         prompt: str,
         max_tokens: int,
+        cached_prefix: str | None = None,
     ) -> str:
-        """Generate a text response for a text-only prompt."""
+        """Generate a text response for a text-only prompt.
+
+        The model sees ``cached_prefix + prompt``. ``cached_prefix`` is the
+        part repeated verbatim across calls (instructions, collection
+        snapshot) and is cached by providers that support it.
+        """
         raise NotImplementedError
+
+    async def stream_text(
+        self,
+        prompt: str,
+        max_tokens: int,
+        cached_prefix: str | None = None,
+    ) -> AsyncIterator[str]:
+        """Stream a text response in chunks.
+
+        Providers without native streaming yield the full response once.
+        """
+        yield await self.generate_text(
+            prompt=prompt, max_tokens=max_tokens, cached_prefix=cached_prefix
+        )
+
+
+class PrefixCacheRegistry:
+    """Process-wide map of cached prompt prefixes to provider cache handles.
+
+    Providers are built per ``AIService`` and so per request; handles kept
+    on the provider would never be reused. Entries are keyed by model and
+    prefix hash and expire ``expiry_margin_seconds`` before the provider's
+    own cache TTL, so an expired handle is never handed out.
+    """
+
+    def __init__(self, expiry_margin_seconds: float = 60) -> None:
+        self.expiry_margin_seconds = expiry_margin_seconds
+        # (model, prefix hash) -> (handle, monotonic expiry)
+        self._entries: dict[tuple[str, str], tuple[Any, float]] = {}
+
+    @staticmethod
+    def prefix_hash(prefix: str) -> str:
+        return hashlib.sha256(prefix.encode()).hexdigest()
+
+    def get(self, model: str, prefix: str) -> Any | None:
+        entry = self._entries.get((model, self.prefix_hash(prefix)))
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+        return None
+
+    def put(self, model: str, prefix: str, handle: Any, ttl_seconds: float) -> None:
+        now = time.monotonic()
+        # Drop handles that are about to expire server-side
+        self._entries = {key: entry for key, entry in self._entries.items() if entry[1] > now}
+        self._entries[(model, self.prefix_hash(prefix))] = (
+            handle,
+            now + max(ttl_seconds - self.expiry_margin_seconds, 0),
+        )
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -0,0 +1,127 @@
+"""Local fake provider for development and prompt-layout checks."""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+from dataclasses import dataclass
+
+from .base import PrefixCacheRegistry, TextProvider
+
+logger = logging.getLogger(__name__)
+
+# Shared by all FakeTextProvider instances, like Gemini's context caches
+seen_prefixes = PrefixCacheRegistry()
+
+_WINE_ID_RE = re.compile(r'"id": "([0-9a-fA-F-]{36})"')
+_COURSES_RE = re.compile(r"^Courses, in serving order:\n(\[.*\])$", re.MULTILINE)
+
+
+@dataclass
+class FakeCall:
+    """One recorded ``generate_text`` call."""
+
+    prefix_hash: str | None
+    prefix_chars: int
+    suffix_chars: int
+    cache_hit: bool
+
+
+class FakeTextProvider(TextProvider):
+    """Text provider that never leaves the process.
+
+    Records the cached-prefix / suffix split of every prompt and simulates
+    prefix caching (a prefix seen before by any instance within
+    ``prefix_cache_ttl_seconds`` counts as a hit), so the prompt
+    layout can be checked without API keys (wine ids in the uncached suffix
+    are logged as a layout error). Responses rank the wines found
+    in the prompt in listed order, enough to drive the pairing pipeline.
+
+    Select it with ``AI_PROVIDER=fake`` (or ``RECOMMENDATION_AI_PROVIDER=fake``).
+    """
+
+    name = "fake"
+
+    def __init__(self, model: str = "fake", prefix_cache_ttl_seconds: int = 3600) -> None:
+        self.model = model
+        self.prefix_cache_ttl_seconds = prefix_cache_ttl_seconds
+        self.calls: list[FakeCall] = []
+
+    @property
+    def cache_hits(self) -> int:
+        return sum(1 for call in self.calls if call.cache_hit)
+
+    @property
+    def cache_misses(self) -> int:
+        return sum(1 for call in self.calls if call.prefix_hash and not call.cache_hit)
+
+    def _record(self, prompt: str, cached_prefix: str | None) -> FakeCall:
+        prefix_hash = None
+        cache_hit = False
+        if cached_prefix:
+            prefix_hash = seen_prefixes.prefix_hash(cached_prefix)
+            cache_hit = seen_prefixes.get(self.model, cached_prefix) is not None
+            if not cache_hit:
+                seen_prefixes.put(self.model, cached_prefix, True, self.prefix_cache_ttl_seconds)
+        call = FakeCall(
+            prefix_hash=prefix_hash,
+            prefix_chars=len(cached_prefix or ""),
+            suffix_chars=len(prompt),
+            cache_hit=cache_hit,
+        )
+        self.calls.append(call)
+        if _WINE_ID_RE.search(prompt):
+            # The collection snapshot belongs in the cached prefix, not the per-query suffix
+            logger.warning("Fake provider: wine ids found outside the cached prefix")
+        logger.debug(
+            "Fake provider call: prefix=%d chars (%s), suffix=%d chars",
+            call.prefix_chars,
+            "hit" if cache_hit else "miss" if prefix_hash else "none",
+            call.suffix_chars,
+        )
+        return call
+
+    @staticmethod
+    def _rank(wine_ids: list[str]) -> list[dict]:
+        return [
+            {
+                "wine_id": wine_id,
+                "rank": rank,
+                "match_score": round(1 - rank * 0.05, 2),
+                "reason": "Fake provider pick",
+                "pairing_tips": None,
+                "drinking_urgency": "optimal",
+            }
+            for rank, wine_id in enumerate(wine_ids[:5], start=1)
+        ]
+
+    async def generate_text(
+        self,
+        prompt: str,
+        max_tokens: int,
+        cached_prefix: str | None = None,
+    ) -> str:
+        self._record(prompt, cached_prefix)
+        full_prompt = (cached_prefix or "") + prompt
+        wine_ids = list(dict.fromkeys(_WINE_ID_RE.findall(full_prompt)))
+
+        courses_match = _COURSES_RE.search(prompt)
+        if courses_match:
+            courses = json.loads(courses_match.group(1))
+            return json.dumps({
+                "courses": [
+                    {
+                        "course_index": course["course_index"],
+                        "recommendations": self._rank(wine_ids),
+                        "general_advice": "Fake provider advice",
+                    }
+                    for course in courses
+                ],
+                "general_advice": "Fake provider advice",
+            })
+
+        return json.dumps({
+            "recommendations": self._rank(wine_ids),
+            "general_advice": "Fake provider advice",
+        })
@@ -2,14 +2,20 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+from collections.abc import AsyncIterator
+from datetime import timedelta
 
 import google.generativeai as genai
 
-from .base import TextProvider, VisionProvider
+from .base import PrefixCacheRegistry, TextProvider, VisionProvider
 
 logger = logging.getLogger(__name__)
 
+# Shared by all GeminiTextProvider instances (one is built per request)
+context_caches = PrefixCacheRegistry()
+
 
 def _build_generation_config(max_tokens: int) -> dict | genai.GenerationConfig:
     """Build a generation config that includes both max_output_tokens and
@@ -62,7 +68,10 @@ class GeminiVisionProvider(VisionProvider):
         image_content: bytes,
         prompt: str,
         max_tokens: int,
+        cache_prompt: bool = False,
     ) -> str:
+        # Scan prompts are below the explicit context-cache minimum; keeping
+        # the static prompt ahead of the image lets implicit caching apply.
         image_part = None
         if hasattr(genai, "types"):
             if hasattr(genai.types, "Part"):
@@ -98,25 +107,85 @@ class GeminiVisionProvider(VisionProvider):
 
 
 class GeminiTextProvider(TextProvider):
-    """Text provider backed by Google's Gemini models."""
+    """Text provider backed by Google's Gemini models.
+
+    ``cached_prefix`` is uploaded as explicit cached content once it is long
+    enough to qualify; handles are kept process-wide (``context_caches``)
+    per model and prefix hash until shortly before their TTL, so a new
+    collection snapshot gets a new cache entry and the old one simply
+    expires.
+    """
 
     name = "gemini"
 
-    def __init__(self, api_key: str, model: str) -> None:
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        context_cache_ttl_seconds: int = 3600,
+        context_cache_min_chars: int = 16000,
+    ) -> None:
         genai.configure(api_key=api_key)
+        self.model_name = model
         self.model = genai.GenerativeModel(model)
+        self.context_cache_ttl_seconds = context_cache_ttl_seconds
+        self.context_cache_min_chars = context_cache_min_chars
+
+    async def _model_for_prefix(
+        self,
+        cached_prefix: str | None,
+    ) -> tuple[genai.GenerativeModel, bool]:
+        """Return the model to call and whether it already holds ``cached_prefix``."""
+        if (
+            not cached_prefix
+            or self.context_cache_ttl_seconds <= 0
+            or len(cached_prefix) < self.context_cache_min_chars
+        ):
+            return self.model, False
+
+        cached_model = context_caches.get(self.model_name, cached_prefix)
+        if cached_model is not None:
+            return cached_model, True
+
+        try:
+            cached_content = await asyncio.to_thread(
+                genai.caching.CachedContent.create,
+                model=self.model_name,
+                contents=[cached_prefix],
+                ttl=timedelta(seconds=self.context_cache_ttl_seconds),
+            )
+            cached_model = genai.GenerativeModel.from_cached_content(cached_content=cached_content)
+        except Exception as e:
+            logger.info("Gemini context cache unavailable, sending full prompt: %s", e)
+            return self.model, False
+
+        context_caches.put(
+            self.model_name, cached_prefix, cached_model, self.context_cache_ttl_seconds
+        )
+        return cached_model, True
 
     async def generate_text(
         self,
         prompt: str,
         max_tokens: int,
+        cached_prefix: str | None = None,
     ) -> str:
         gen_config = _build_generation_config(max_tokens)
-        response = self.model.generate_content(
-            prompt,
+        model, prefix_cached = await self._model_for_prefix(cached_prefix)
+        response = await model.generate_content_async(
+            prompt if prefix_cached else (cached_prefix or "") + prompt,
             generation_config=gen_config,
         )
 
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            logger.debug(
+                "Gemini text usage: prompt=%s, cached=%s, output=%s",
+                getattr(usage, "prompt_token_count", None),
+                getattr(usage, "cached_content_token_count", None),
+                getattr(usage, "candidates_token_count", None),
+            )
+
         if response.candidates:
             candidate = response.candidates[0]
             finish_reason = getattr(candidate, "finish_reason", None)
@@ -127,3 +196,25 @@ class GeminiTextProvider(TextProvider):
                 )
 
         return response.text or ""
+
+    async def stream_text(
+        self,
+        prompt: str,
+        max_tokens: int,
+        cached_prefix: str | None = None,
+    ) -> AsyncIterator[str]:
+        gen_config = _build_generation_config(max_tokens)
+        model, prefix_cached = await self._model_for_prefix(cached_prefix)
+        response = await model.generate_content_async(
+            prompt if prefix_cached else (cached_prefix or "") + prompt,
+            generation_config=gen_config,
+            stream=True,
+        )
+        async for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunks without text parts (e.g. the final finish_reason chunk)
+                continue
+            if text:
+                yield text
@@ -0,0 +1,101 @@
+"""Incremental parser for streamed pairing recommendation JSON.
+
+The pairing prompt asks for ``{"recommendations": [{...}, ...], "general_advice": "..."}``.
+``RecommendationStreamParser`` is fed raw text chunks as they arrive from
+the provider and returns each recommendation object as soon as its closing
+brace is seen, without waiting for the rest of the document.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+_LINE_COMMENT_RE = re.compile(r'(?<=[,\d\]\}\"\s])//[^\n]*')
+
+
+class RecommendationStreamParser:
+    """Character-level scanner that tracks JSON nesting across chunks."""
+
+    ARRAY_KEY = "recommendations"
+
+    def __init__(self) -> None:
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._last_string = ""
+        self._last_key = ""
+        self._array_depth: int | None = None
+        self._item_start = -1
+
+    def feed(self, chunk: str) -> list[dict]:
+        """Consume a chunk and return recommendation objects completed by it."""
+        self.text += chunk
+        completed: list[dict] = []
+        text = self.text
+
+        while self._pos < len(text):
+            ch = text[self._pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._last_string = text[self._string_start + 1 : self._pos]
+                self._pos += 1
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = self._pos
+            elif ch == ":":
+                self._last_key = self._last_string
+            elif ch == "/" and self._pos == len(text) - 1:
+                break  # Could be the start of a // comment split across chunks
+            elif ch == "/" and text.startswith("//", self._pos):
+                # Skip a // comment; wait for more text if the line is incomplete
+                newline = text.find("\n", self._pos)
+                if newline == -1:
+                    break
+                self._pos = newline
+            elif ch in "{[":
+                self._depth += 1
+                if ch == "[" and self._array_depth is None and self._last_key == self.ARRAY_KEY:
+                    self._array_depth = self._depth
+                elif ch == "{" and self._array_depth is not None and self._depth == self._array_depth + 1:
+                    self._item_start = self._pos
+            elif ch in "}]":
+                if (
+                    ch == "}"
+                    and self._array_depth is not None
+                    and self._depth == self._array_depth + 1
+                    and self._item_start != -1
+                ):
+                    item = self._load(text[self._item_start : self._pos + 1])
+                    if item is not None:
+                        completed.append(item)
+                    self._item_start = -1
+                elif ch == "]" and self._depth == self._array_depth:
+                    self._array_depth = -1  # Array closed; ignore later arrays
+                self._depth -= 1
+
+            self._pos += 1
+
+        return completed
+
+    @staticmethod
+    def _load(fragment: str) -> dict | None:
+        for candidate in (fragment, _TRAILING_COMMA_RE.sub(r"\1", _LINE_COMMENT_RE.sub("", fragment))):
+            try:
+                value = json.loads(candidate)
+            except json.JSONDecodeError:
+                continue
+            return value if isinstance(value, dict) else None
+        return None
@@ -1,20 +1,25 @@
 """AI service for wine label recognition and recommendations."""
 
+import asyncio
 import json
 import logging
 import re
+from collections.abc import AsyncIterator
 from decimal import Decimal
 
 from app.config import settings
 from app.services.ai.providers import (
     AnthropicTextProvider,
     AnthropicVisionProvider,
+    FakeTextProvider,
     GeminiTextProvider,
     GeminiVisionProvider,
     TextProvider,
     VisionProvider,
 )
 from app.services.ai.scan_prompts import get_scan_prompt_config, resolve_model_tier
+from app.services.ai.stream_parser import RecommendationStreamParser
+from app.services.pairing_engine import ENGINE_NAME, PairingEngine
 
 
 class AIService:
@@ -35,6 +40,7 @@ class AIService:
             settings.effective_recommendation_provider,
             settings.effective_recommendation_model,
         )
+        self.pairing_engine = PairingEngine()
         self.scan_prompt_config = get_scan_prompt_config(settings.effective_scan_model)
         scan_tier = resolve_model_tier(settings.effective_scan_model)
         self.logger.info(
@@ -64,11 +70,21 @@ class AIService:
         if provider_name == "gemini":
             if not settings.gemini_api_key:
                 return None
-            return GeminiTextProvider(api_key=settings.gemini_api_key, model=model)
+            return GeminiTextProvider(
+                api_key=settings.gemini_api_key,
+                model=model,
+                context_cache_ttl_seconds=settings.gemini_context_cache_ttl_seconds,
+                context_cache_min_chars=settings.gemini_context_cache_min_chars,
+            )
         if provider_name == "anthropic":
             if not settings.anthropic_api_key:
                 return None
             return AnthropicTextProvider(api_key=settings.anthropic_api_key, model=model)
+        if provider_name == "fake":
+            return FakeTextProvider(
+                model=model,
+                prefix_cache_ttl_seconds=settings.gemini_context_cache_ttl_seconds,
+            )
         self.logger.warning("Unknown text provider '%s'", provider_name)
         return None
 
@@ -207,6 +223,7 @@ class AIService:
                 image_content=image_content,
                 prompt=cfg.single_prompt,
                 max_tokens=cfg.single_max_tokens,
+                cache_prompt=True,
             )
             self.logger.debug("Single scan AI raw response: %s", response_text)
             parsed = self._parse_json_object(response_text)
@@ -238,6 +255,7 @@ class AIService:
                 image_content=image_content,
                 prompt=cfg.batch_prompt,
                 max_tokens=cfg.batch_max_tokens,
+                cache_prompt=True,
             )
             self.logger.debug("Batch scan AI raw response: %s", response_text)
             return self._parse_json_array(response_text)
@@ -395,39 +413,53 @@ Important:
             self.logger.exception("Wine analysis error: %s", e)
             return None
 
-    async def get_pairing_recommendations(
-        self,
-        query: str,
+    @staticmethod
+    def _pairing_language_instruction(user_language: str | None) -> str:
+        """Prompt suffix forcing free-text fields into the user's language."""
+        language_map = {
+            "ko": "Korean",
+            "en": "English",
+            "ja": "Japanese",
+            "zh": "Chinese",
+            "fr": "French",
+            "es": "Spanish",
+            "it": "Italian",
+            "de": "German",
+        }
+        lang_name = language_map.get(user_language, "") if user_language else ""
+        return f"\n\nIMPORTANT: All text fields (reason, pairing_tips, general_advice) MUST be written in {lang_name}." if lang_name else ""
+
+    @staticmethod
+    def _build_collection_prefix(
         wines: list[dict],
         user_language: str | None = None,
-    ) -> dict:
-        """Get wine pairing recommendations using AI."""
-        if not self.recommendation_provider:
-            return self._get_mock_recommendations(wines)
+    ) -> str:
+        """Build the cacheable prompt prefix shared by all pairing prompts.
 
-        try:
-            wines_json = json.dumps(wines, ensure_ascii=False, default=str)
-
-            language_map = {
-                "ko": "Korean",
-                "en": "English",
-                "ja": "Japanese",
-                "zh": "Chinese",
-                "fr": "French",
-                "es": "Spanish",
-                "it": "Italian",
-                "de": "German",
-            }
-            lang_name = language_map.get(user_language, "") if user_language else ""
-            language_instruction = f"\n\nIMPORTANT: All text fields (reason, pairing_tips, general_advice) MUST be written in {lang_name}." if lang_name else ""
-
-            prompt = f"""You are a sommelier. A user wants wine recommendations.
+        Holds only the static sommelier instructions and the collection
+        snapshot, which stay identical across a user's queries until the
+        cellar changes. Anything query-specific belongs in the suffix.
+        """
+        wines_json = json.dumps(wines, ensure_ascii=False, default=str)
+        language_instruction = AIService._pairing_language_instruction(user_language)
 
-User's request: "{query}"
+        return f"""You are a sommelier. A user wants wine recommendations from their own collection.
 
 Available wines in their collection:
 {wines_json}
 
+When recommending, consider:
+1. Food pairing compatibility
+2. Drinking window (prioritize wines that should be drunk soon)
+3. Wine characteristics matching the occasion{language_instruction}
+
+"""
+
+    @staticmethod
+    def _build_pairing_prompt(query: str) -> str:
+        """Build the query-specific suffix of the pairing prompt."""
+        return f"""User's request: "{query}"
+
 Recommend the best matching wines from their collection. Return JSON:
 {{
   "recommendations": [
@@ -443,16 +475,52 @@ Recommend the best matching wines from their collection. Return JSON:
   "general_advice": "General pairing advice for the user's request"
 }}
 
-Consider:
-1. Food pairing compatibility
-2. Drinking window (prioritize wines that should be drunk soon)
-3. Wine characteristics matching the occasion{language_instruction}
-
 Return only valid JSON."""
 
-            response_text = await self.recommendation_provider.generate_text(
-                prompt=prompt,
-                max_tokens=2000,
+    def get_offline_recommendations(
+        self,
+        query: str,
+        wines: list[dict],
+        user_language: str | None = None,
+        max_results: int = 5,
+        prioritize_expiring: bool = True,
+    ) -> dict:
+        """Get rule-based pairing recommendations without calling an AI provider."""
+        return self.pairing_engine.recommend(
+            query,
+            wines,
+            user_language=user_language,
+            max_results=max_results,
+            prioritize_expiring=prioritize_expiring,
+        )
+
+    async def get_pairing_recommendations(
+        self,
+        query: str,
+        wines: list[dict],
+        user_language: str | None = None,
+        max_results: int = 5,
+        prioritize_expiring: bool = True,
+    ) -> dict:
+        """Get wine pairing recommendations using AI.
+
+        Falls back to the offline pairing engine when no provider is
+        configured, the provider errors, or it exceeds
+        ``recommendation_ai_timeout_seconds``.
+        """
+        if not self.recommendation_provider:
+            return self.get_offline_recommendations(
+                query, wines, user_language, max_results, prioritize_expiring
+            )
+
+        try:
+            response_text = await asyncio.wait_for(
+                self.recommendation_provider.generate_text(
+                    prompt=self._build_pairing_prompt(query),
+                    max_tokens=2000,
+                    cached_prefix=self._build_collection_prefix(wines, user_language),
+                ),
+                timeout=settings.recommendation_ai_timeout_seconds,
             )
             self.logger.debug("Pairing AI raw response: %s", response_text)
 
@@ -465,11 +533,239 @@ Return only valid JSON."""
                 len(response_text) if response_text else 0,
                 response_text,
             )
-            return {"recommendations": [], "general_advice": None}
 
+        except TimeoutError:
+            self.logger.warning(
+                "Pairing AI timed out after %ss; using offline engine.",
+                settings.recommendation_ai_timeout_seconds,
+            )
         except Exception as e:
             self.logger.exception("Pairing recommendation error: %s", e)
-            return {"recommendations": [], "general_advice": None}
+
+        return self.get_offline_recommendations(
+            query, wines, user_language, max_results, prioritize_expiring
+        )
+
+    async def stream_pairing_recommendations(
+        self,
+        query: str,
+        wines: list[dict],
+        user_language: str | None = None,
+        max_results: int = 5,
+        prioritize_expiring: bool = True,
+    ) -> AsyncIterator[tuple[str, dict]]:
+        """Stream wine pairing recommendations as the provider generates them.
+
+        Yields ``("recommendation", item)`` for each recommendation object as
+        soon as it is complete, then exactly one ``("result", result)`` with
+        the full parsed response (same shape as
+        ``get_pairing_recommendations``).
+
+        ``recommendation_ai_timeout_seconds`` applies to the wait for each
+        chunk. If the provider fails before any recommendation was emitted,
+        the offline engine's result is streamed instead; if it fails midway,
+        the result holds the recommendations emitted so far and is marked
+        ``incomplete``.
+        """
+        emitted: list[dict] = []
+        parser = RecommendationStreamParser()
+
+        if self.recommendation_provider:
+            chunks = self.recommendation_provider.stream_text(
+                prompt=self._build_pairing_prompt(query),
+                max_tokens=2000,
+                cached_prefix=self._build_collection_prefix(wines, user_language),
+            )
+            try:
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(
+                            chunks.__anext__(),
+                            timeout=settings.recommendation_ai_timeout_seconds,
+                        )
+                    except StopAsyncIteration:
+                        break
+                    for item in parser.feed(chunk):
+                        emitted.append(item)
+                        yield "recommendation", item
+
+                self.logger.debug("Pairing AI raw streamed response: %s", parser.text)
+                parsed = self._parse_json_object(parser.text)
+                if parsed:
+                    yield "result", parsed
+                    return
+                if emitted:
+                    yield "result", {"recommendations": emitted, "general_advice": None}
+                    return
+
+                self.logger.debug(
+                    "Streamed pairing recommendation parse failed. response_length=%d, response_text=%s",
+                    len(parser.text),
+                    parser.text,
+                )
+
+            except TimeoutError:
+                self.logger.warning(
+                    "Pairing AI stream stalled for %ss; emitted=%d.",
+                    settings.recommendation_ai_timeout_seconds,
+                    len(emitted),
+                )
+            except Exception as e:
+                self.logger.exception("Pairing recommendation stream error: %s", e)
+            finally:
+                await chunks.aclose()
+
+            if emitted:
+                yield "result", {
+                    "recommendations": emitted,
+                    "general_advice": None,
+                    "incomplete": True,
+                }
+                return
+
+        result = self.get_offline_recommendations(
+            query, wines, user_language, max_results, prioritize_expiring
+        )
+        for item in result.get("recommendations", []):
+            yield "recommendation", item
+        yield "result", result
+
+    @staticmethod
+    def _build_menu_prompt(
+        courses: list[dict],
+        max_results: int = 5,
+        unique_bottles: bool = True,
+    ) -> str:
+        """Build the query-specific suffix of the multi-course menu prompt."""
+        courses_json = json.dumps(
+            [
+                {"course_index": index, "query": course["query"], "query_type": course["query_type"]}
+                for index, course in enumerate(courses)
+            ],
+            ensure_ascii=False,
+        )
+        unique_instruction = (
+            "\nAvoid recommending the same bottle for more than one course unless the user owns several (see quantity)."
+            if unique_bottles
+            else ""
+        )
+
+        return f"""The user is planning a multi-course menu.
+Courses, in serving order:
+{courses_json}
+
+For EACH course, rank up to {max_results} matching wines from their collection, keeping a natural progression across the menu (lighter to fuller, dry to sweet).{unique_instruction} Return JSON:
+{{
+  "courses": [
+    {{
+      "course_index": 0,
+      "recommendations": [
+        {{
+          "wine_id": "uuid",
+          "rank": 1,
+          "match_score": 0.95,
+          "reason": "Why this wine pairs well with this course",
+          "pairing_tips": "Serving suggestions",
+          "drinking_urgency": "optimal"  // drink_now, drink_soon, optimal, can_wait
+        }}
+      ],
+      "general_advice": "Pairing advice for this course"
+    }}
+  ],
+  "general_advice": "Advice for the menu as a whole (serving order, progression)"
+}}
+
+Return only valid JSON."""
+
+    def get_offline_menu_recommendations(
+        self,
+        courses: list[dict],
+        wines: list[dict],
+        user_language: str | None = None,
+        max_results: int = 5,
+        prioritize_expiring: bool = True,
+    ) -> dict:
+        """Rank every course with the offline pairing engine."""
+        course_results = [
+            self.get_offline_recommendations(
+                course["query"], wines, user_language, max_results, prioritize_expiring
+            )
+            for course in courses
+        ]
+        return {
+            "courses": course_results,
+            "general_advice": None,
+            "engine": ENGINE_NAME,
+        }
+
+    async def get_menu_pairing_recommendations(
+        self,
+        courses: list[dict],
+        wines: list[dict],
+        user_language: str | None = None,
+        max_results: int = 5,
+        prioritize_expiring: bool = True,
+        unique_bottles: bool = True,
+    ) -> dict:
+        """Get pairing recommendations for several courses in one AI call.
+
+        ``courses`` are ``{"query", "query_type"}`` dicts. Returns
+        ``{"courses": [...], "general_advice": ...}`` where ``courses[i]``
+        has the ``get_pairing_recommendations`` shape for ``courses[i]``.
+        Falls back to the offline engine like the single-query variant.
+        """
+        if not self.recommendation_provider:
+            return self.get_offline_menu_recommendations(
+                courses, wines, user_language, max_results, prioritize_expiring
+            )
+
+        try:
+            # Output grows with the number of courses; so do the limits.
+            response_text = await asyncio.wait_for(
+                self.recommendation_provider.generate_text(
+                    prompt=self._build_menu_prompt(courses, max_results, unique_bottles),
+                    max_tokens=min(1000 * len(courses) + 500, 8000),
+                    cached_prefix=self._build_collection_prefix(wines, user_language),
+                ),
+                timeout=settings.recommendation_ai_timeout_seconds * max(1, len(courses) / 2),
+            )
+            self.logger.debug("Menu pairing AI raw response: %s", response_text)
+
+            parsed = self._parse_json_object(response_text)
+            if parsed and isinstance(parsed.get("courses"), list):
+                by_index: dict[int, dict] = {}
+                for position, course_result in enumerate(parsed["courses"]):
+                    if not isinstance(course_result, dict):
+                        continue
+                    index = course_result.get("course_index", position)
+                    if isinstance(index, int) and 0 <= index < len(courses):
+                        by_index.setdefault(index, course_result)
+                if len(by_index) == len(courses):
+                    return {
+                        "courses": [
+                            {
+                                "recommendations": by_index[i].get("recommendations", []),
+                                "general_advice": by_index[i].get("general_advice"),
+                            }
+                            for i in range(len(courses))
+                        ],
+                        "general_advice": parsed.get("general_advice"),
+                    }
+
+            self.logger.debug(
+                "Menu pairing recommendation parse failed. response_length=%d, response_text=%s",
+                len(response_text) if response_text else 0,
+                response_text,
+            )
+
+        except TimeoutError:
+            self.logger.warning("Menu pairing AI timed out; using offline engine.")
+        except Exception as e:
+            self.logger.exception("Menu pairing recommendation error: %s", e)
+
+        return self.get_offline_menu_recommendations(
+            courses, wines, user_language, max_results, prioritize_expiring
+        )
 
     def _get_mock_wine_data(self) -> dict:
         """Return mock wine data for development."""
@@ -497,22 +793,3 @@ Return only valid JSON."""
             "confidence": Decimal("0.95"),
             "status": "success",
         }
-
-    def _get_mock_recommendations(self, wines: list[dict]) -> dict:
-        """Return mock recommendations for development."""
-        recommendations = []
-
-        for i, wine in enumerate(wines[:3]):
-            recommendations.append({
-                "wine_id": wine.get("id"),
-                "rank": i + 1,
-                "match_score": 0.95 - (i * 0.05),
-                "reason": f"{wine.get('name', 'This wine')}의 풍미가 요청하신 음식과 잘 어울립니다.",
-                "pairing_tips": "15분 전에 디캔팅하시면 더 좋습니다.",
-                "drinking_urgency": "optimal",
-            })
-
-        return {
-            "recommendations": recommendations,
-            "general_advice": "선택하신 음식에는 풀바디 레드 와인이 잘 어울립니다.",
-        }
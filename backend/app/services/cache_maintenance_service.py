@@ -0,0 +1,144 @@
+"""Recommendation cache maintenance (expiry, superseded keys, per-user caps).
+
+Runs periodically inside the API process (see ``app.main``) or once from
+the command line::
+
+    python -m app.services.cache_maintenance_service
+"""
+
+import asyncio
+import logging
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.config import settings
+from app.database import async_session_maker
+from app.models.recommendation_cache import RecommendationCache
+
+logger = logging.getLogger(__name__)
+
+
+class CacheMaintenanceService:
+    """Service for pruning the recommendation cache table."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def purge_expired(self) -> int:
+        """Delete entries older than the cache TTL (they can never be read)."""
+        cutoff = datetime.now(UTC) - timedelta(
+            hours=settings.recommendation_cache_ttl_hours
+        )
+        result = await self.db.execute(
+            delete(RecommendationCache)
+            .where(RecommendationCache.created_at < cutoff)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount or 0
+
+    async def purge_superseded(self) -> int:
+        """Delete entries whose collection snapshot has been superseded.
+
+        An entry is superseded when a newer entry exists for the same user,
+        query type, query text and wine type filter under a different
+        collection hash: the collection changed and the old key will not be
+        produced again. Entries with another filter hash differently while
+        still valid, so the filter must match; entries written before the
+        filter was stored are left to expiry.
+        """
+        newer = aliased(RecommendationCache)
+        superseded = (
+            select(newer.id)
+            .where(
+                newer.user_id == RecommendationCache.user_id,
+                newer.query_type == RecommendationCache.query_type,
+                newer.query_text == RecommendationCache.query_text,
+                newer.wine_types_filter == RecommendationCache.wine_types_filter,
+                newer.wine_collection_hash != RecommendationCache.wine_collection_hash,
+                newer.created_at > RecommendationCache.created_at,
+            )
+            .exists()
+        )
+        result = await self.db.execute(
+            delete(RecommendationCache)
+            .where(superseded)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount or 0
+
+    async def enforce_user_cap(self, max_entries: int | None = None) -> int:
+        """Keep at most ``max_entries`` rows per user.
+
+        Rows are ranked by recency of use (``last_hit_at``, falling back to
+        ``created_at``) and then by ``hit_count``; the tail is evicted.
+        """
+        cap = max_entries if max_entries is not None else settings.recommendation_cache_max_entries_per_user
+        if cap <= 0:
+            return 0
+
+        ranked = select(
+            RecommendationCache.id,
+            func.row_number()
+            .over(
+                partition_by=RecommendationCache.user_id,
+                order_by=(
+                    func.coalesce(
+                        RecommendationCache.last_hit_at, RecommendationCache.created_at
+                    ).desc(),
+                    RecommendationCache.hit_count.desc(),
+                ),
+            )
+            .label("rank"),
+        ).subquery()
+
+        result = await self.db.execute(
+            delete(RecommendationCache)
+            .where(RecommendationCache.id.in_(select(ranked.c.id).where(ranked.c.rank > cap)))
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount or 0
+
+    async def run(self) -> dict:
+        """Run all maintenance steps and commit."""
+        stats = {
+            "expired": await self.purge_expired(),
+            "superseded": await self.purge_superseded(),
+            "over_cap": await self.enforce_user_cap(),
+        }
+        await self.db.commit()
+        return stats
+
+
+async def run_cache_maintenance() -> dict:
+    """Run one maintenance pass with its own database session."""
+    async with async_session_maker() as db:
+        stats = await CacheMaintenanceService(db).run()
+    logger.info("Recommendation cache maintenance: %s", stats)
+    return stats
+
+
+async def cache_maintenance_loop(interval_minutes: int) -> None:
+    """Run maintenance forever, every ``interval_minutes``."""
+    while True:
+        try:
+            await run_cache_maintenance()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception("Recommendation cache maintenance failed: %s", e)
+        await asyncio.sleep(interval_minutes * 60)
+
+
+if __name__ == "__main__":
+    from app.database import close_db
+
+    async def _main() -> None:
+        try:
+            print(await run_cache_maintenance())
+        finally:
+            await close_db()
+
+    asyncio.run(_main())
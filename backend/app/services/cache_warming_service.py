@@ -0,0 +1,159 @@
+"""Background warming of recommendation cache entries for popular queries.
+
+When a user's collection changes, every cached recommendation for the old
+collection hash becomes unreachable. ``cache_warmer.schedule`` is called
+after each collection change; once the user has stopped editing for
+``recommendation_cache_warming_delay_seconds`` their most frequent past
+queries are re-run in the background so the next request hits the cache.
+"""
+
+import asyncio
+import logging
+from collections import Counter
+from datetime import UTC, datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session_maker
+from app.models.recommendation import Recommendation
+from app.models.user import User
+from app.services.query_normalizer import canonicalize_query
+from app.services.recommendation_service import MENU_QUERY_TYPE, RecommendationService
+
+logger = logging.getLogger(__name__)
+
+
+class CacheWarmingService:
+    """Service that refreshes cache entries for a user's frequent queries."""
+
+    HISTORY_WINDOW_DAYS = 30
+    HISTORY_SAMPLE_SIZE = 200
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_popular_queries(
+        self,
+        user_id: UUID,
+        limit: int,
+        min_count: int = 2,
+    ) -> list[tuple[str, str]]:
+        """Return up to ``limit`` (query_type, query_text) pairs, most frequent first.
+
+        Queries are grouped by canonical form; the most recent wording of
+        each group is returned so the AI sees a natural request. Menu
+        requests are skipped: no request reads a cache entry for the joined
+        course text.
+        """
+        since = datetime.now(UTC) - timedelta(days=self.HISTORY_WINDOW_DAYS)
+        result = await self.db.execute(
+            select(Recommendation.query_type, Recommendation.query_text)
+            .where(
+                Recommendation.user_id == user_id,
+                Recommendation.created_at >= since,
+                Recommendation.query_type != MENU_QUERY_TYPE,
+            )
+            .order_by(Recommendation.created_at.desc())
+            .limit(self.HISTORY_SAMPLE_SIZE)
+        )
+
+        counts: Counter[tuple[str, str]] = Counter()
+        latest_text: dict[tuple[str, str], str] = {}
+        for query_type, query_text in result.all():
+            key = (query_type, canonicalize_query(query_text))
+            counts[key] += 1
+            latest_text.setdefault(key, query_text)
+
+        return [
+            (key[0], latest_text[key])
+            for key, count in counts.most_common()
+            if count >= min_count
+        ][:limit]
+
+    async def warm_user(self, user_id: UUID) -> int:
+        """Warm cache entries for the user's popular queries. Returns AI calls made."""
+        user_result = await self.db.execute(select(User.language).where(User.id == user_id))
+        user_language = user_result.scalar_one_or_none()
+
+        queries = await self.get_popular_queries(
+            user_id,
+            limit=settings.recommendation_cache_warming_max_queries,
+            min_count=settings.recommendation_cache_warming_min_count,
+        )
+
+        recommendation_service = RecommendationService(self.db)
+        if not recommendation_service.ai_service.recommendation_provider:
+            return 0
+
+        warmed = 0
+        for query_type, query_text in queries:
+            if await recommendation_service.warm_cache(
+                user_id, query_text, query_type=query_type, user_language=user_language
+            ):
+                warmed += 1
+        return warmed
+
+
+class CacheWarmer:
+    """Debounced, low-priority scheduler for ``CacheWarmingService`` runs.
+
+    Each collection change cancels the user's pending run and starts a new
+    delay. Only one user is warmed at a time per process, so warming never
+    competes with interactive requests for more than one AI call.
+    """
+
+    def __init__(self) -> None:
+        self._pending: dict[UUID, asyncio.Task] = {}
+        self._slot = asyncio.Semaphore(1)
+
+    def schedule(self, user_id: UUID, collection_version: int) -> None:
+        """Schedule warming for ``user_id`` after the debounce delay."""
+        if not settings.recommendation_cache_warming_enabled:
+            return
+
+        existing = self._pending.pop(user_id, None)
+        if existing and not existing.done():
+            existing.cancel()
+
+        task = asyncio.create_task(self._run(user_id, collection_version))
+        self._pending[user_id] = task
+        task.add_done_callback(lambda t: self._forget(user_id, t))
+
+    def _forget(self, user_id: UUID, task: asyncio.Task) -> None:
+        if self._pending.get(user_id) is task:
+            del self._pending[user_id]
+
+    async def _run(self, user_id: UUID, collection_version: int) -> None:
+        await asyncio.sleep(settings.recommendation_cache_warming_delay_seconds)
+        async with self._slot:
+            try:
+                async with async_session_maker() as db:
+                    # Another process may have seen a later edit; it owns the warm-up.
+                    result = await db.execute(
+                        select(User.collection_version).where(User.id == user_id)
+                    )
+                    if result.scalar_one_or_none() != collection_version:
+                        return
+                    warmed = await CacheWarmingService(db).warm_user(user_id)
+                if warmed:
+                    logger.info(
+                        "Warmed %d recommendation cache entries for user %s", warmed, user_id
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Recommendation cache warming failed for user %s: %s", user_id, e)
+
+    async def shutdown(self) -> None:
+        """Cancel all pending warm-ups."""
+        tasks = list(self._pending.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._pending.clear()
+
+
+cache_warmer = CacheWarmer()
@@ -3,13 +3,18 @@
 from datetime import datetime, timedelta
 from uuid import UUID
 
-from sqlalchemy import and_, func, select
+from sqlalchemy import and_, func, literal, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models.wine import Wine
-from app.models.user_wine import UserWine
+from app.models.user_wine import UserWine, owned_condition
 from app.models.tag import Tag, UserWineTag
+from app.services.drinking_window import (
+    current_year,
+    drinking_status_expr,
+    drinking_window_filter,
+)
 
 
 class DashboardService:
@@ -23,8 +28,7 @@ class DashboardService:
         # Get owned wines
         owned_query = select(UserWine).options(selectinload(UserWine.wine)).where(
             UserWine.user_id == user_id,
-            UserWine.deleted_at.is_(None),
-            UserWine.status == "owned",
+            owned_condition(),
         )
         result = await self.db.execute(owned_query)
         user_wines = result.scalars().all()
@@ -108,7 +112,8 @@ class DashboardService:
         consumed_result = await self.db.execute(
             select(func.count()).where(
                 UserWine.user_id == user_id,
-                UserWine.status == "consumed",
+                # Inline literal so ix_user_wines_user_consumed's predicate applies
+                UserWine.status == literal("consumed", literal_execute=True),
                 UserWine.consumed_at >= month_start,
             )
         )
@@ -132,54 +137,55 @@ class DashboardService:
         limit: int = 10,
     ) -> dict:
         """Get wines approaching their drinking window end."""
-        current_year = datetime.now().year
+        year = current_year()
+        status = drinking_status_expr(year).label("drinking_status")
 
-        # Get owned wines with drinking window
+        # Aging wines are filtered out in the database
         result = await self.db.execute(
-            select(UserWine)
-            .options(selectinload(UserWine.wine))
+            select(
+                UserWine.id,
+                Wine.name,
+                Wine.vintage,
+                Wine.drinking_window_end,
+                status,
+            )
             .join(Wine)
             .where(
                 UserWine.user_id == user_id,
-                UserWine.deleted_at.is_(None),
-                UserWine.status == "owned",
-                Wine.drinking_window_end.isnot(None),
+                owned_condition(),
+                drinking_window_filter("urgent", year) | drinking_window_filter("now", year),
             )
             .order_by(Wine.drinking_window_end.asc())
         )
-        user_wines = result.scalars().all()
+        rows = result.all()
 
         urgent = []
         soon = []
         optimal = []
 
-        for uw in user_wines:
-            wine = uw.wine
-            years_left = wine.drinking_window_end - current_year
+        for row in rows:
+            years_left = row.drinking_window_end - year
 
             item = {
-                "user_wine_id": str(uw.id),
+                "user_wine_id": str(row.id),
                 "wine": {
-                    "name": wine.name,
-                    "vintage": wine.vintage,
+                    "name": row.name,
+                    "vintage": row.vintage,
                 },
-                "drinking_window_end": wine.drinking_window_end,
+                "drinking_window_end": row.drinking_window_end,
                 "years_left": years_left,
             }
 
-            if years_left < 0:
+            if row.drinking_status == "urgent":
                 item["message"] = "음용 적기가 지났습니다. 빨리 드세요!"
                 urgent.append(item)
-            elif years_left == 0:
+            elif row.drinking_status == "drink_soon" and years_left == 0:
                 item["message"] = "올해 안에 드시는 것이 좋습니다!"
                 urgent.append(item)
-            elif years_left <= 1:
+            elif row.drinking_status == "drink_soon":
                 item["message"] = "1년 내 음용을 권장합니다."
                 soon.append(item)
-            elif (
-                wine.drinking_window_start
-                and wine.drinking_window_start <= current_year
-            ):
+            else:
                 item["message"] = "지금 마시기 최적입니다."
                 optimal.append(item)
 
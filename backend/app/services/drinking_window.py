@@ -0,0 +1,101 @@
+"""Drinking-window classification, shared by Python and SQL callers.
+
+A wine's drinking status relative to the current year:
+
+- ``urgent``: the window has ended
+- ``drink_soon``: the window ends this year or next
+- ``optimal``: the window has started
+- ``aging``: the window has not started yet
+
+Wines without a window end have no status. ``drinking_status`` classifies
+loaded values; ``drinking_status_expr`` is the same rule as a SQL ``CASE``
+and ``drinking_status_condition`` as plain range predicates on the window
+columns, so list filters and sorts run in the database (before
+pagination) and can use ``ix_wines_drinking_window``.
+
+The status depends on the current year, so it cannot be a stored
+generated column; every caller passes the year it classifies against.
+"""
+
+from datetime import datetime
+from typing import Literal
+
+from sqlalchemy import and_, case, or_
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.wine import Wine
+
+DrinkingStatus = Literal["urgent", "drink_soon", "optimal", "aging"]
+
+# Recommendation urgency vocabulary (``RecommendationItem.drinking_urgency``)
+URGENCY_BY_STATUS = {
+    "urgent": "drink_now",
+    "drink_soon": "drink_soon",
+    "optimal": "optimal",
+    "aging": "can_wait",
+}
+
+# ``GET /wines?drinking_window=`` values
+DRINKING_WINDOW_STATUSES: dict[str, tuple[DrinkingStatus, ...]] = {
+    "now": ("drink_soon", "optimal"),
+    "aging": ("aging",),
+    "urgent": ("urgent",),
+}
+
+
+def current_year() -> int:
+    return datetime.now().year
+
+
+def drinking_status(
+    start: int | None, end: int | None, year: int | None = None
+) -> DrinkingStatus | None:
+    """Classify a drinking window (see module docstring)."""
+    if not end:
+        return None
+    year = year or current_year()
+    if end < year:
+        return "urgent"
+    if end <= year + 1:
+        return "drink_soon"
+    if start and start <= year:
+        return "optimal"
+    return "aging"
+
+
+def drinking_urgency(start: int | None, end: int | None, year: int | None = None) -> str:
+    """Classify a drinking window as drink_now / drink_soon / optimal / can_wait."""
+    return URGENCY_BY_STATUS.get(drinking_status(start, end, year), "can_wait")
+
+
+def drinking_status_condition(status: DrinkingStatus, year: int | None = None) -> ColumnElement:
+    """Predicate on ``wines`` matching rows with ``status``."""
+    year = year or current_year()
+    end, start = Wine.drinking_window_end, Wine.drinking_window_start
+    if status == "urgent":
+        return end < year
+    if status == "drink_soon":
+        return end.between(year, year + 1)
+    if status == "optimal":
+        return and_(end > year + 1, start <= year)
+    return and_(end > year + 1, or_(start.is_(None), start > year))
+
+
+def drinking_window_filter(window: str, year: int | None = None) -> ColumnElement:
+    """Predicate for a ``drinking_window`` list filter value."""
+    year = year or current_year()
+    return or_(
+        *(drinking_status_condition(status, year) for status in DRINKING_WINDOW_STATUSES[window])
+    )
+
+
+def drinking_status_expr(year: int | None = None) -> ColumnElement:
+    """``drinking_status`` as a SQL expression (NULL without a window end)."""
+    year = year or current_year()
+    return case(
+        (Wine.drinking_window_end.is_(None), None),
+        (drinking_status_condition("urgent", year), "urgent"),
+        (drinking_status_condition("drink_soon", year), "drink_soon"),
+        (drinking_status_condition("optimal", year), "optimal"),
+        else_="aging",
+    )
@@ -0,0 +1,214 @@
+"""Monthly partition management and retention for recommendation history.
+
+``recommendations`` is range-partitioned by ``created_at`` into one
+partition per calendar month (``recommendations_y2026m02``) plus a
+``recommendations_default`` catch-all. This module keeps partitions
+created ahead of time and applies the retention policy:
+
+- ``detach``: old partitions are detached and left as standalone tables,
+  ready to be exported (``pg_dump -t recommendations_y2025m01``) and
+  dropped by an operator
+- ``drop``: old partitions are dropped
+
+Runs periodically inside the API process (see ``app.main``) or once from
+the command line::
+
+    python -m app.services.history_partition_service
+"""
+
+import asyncio
+import logging
+import re
+from datetime import UTC, date, datetime
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session_maker
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "recommendations"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+_PARTITION_RE = re.compile(rf"^{PARENT_TABLE}_y(\d{{4}})m(\d{{2}})$")
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def retention_cutoff() -> datetime | None:
+    """Start of the oldest month kept by the retention policy (None = keep all)."""
+    months = settings.recommendation_history_retention_months
+    if months <= 0:
+        return None
+    cutoff = add_months(month_start(datetime.now(UTC).date()), -months)
+    return datetime(cutoff.year, cutoff.month, 1, tzinfo=UTC)
+
+
+class HistoryPartitionService:
+    """Service for creating and retiring ``recommendations`` partitions."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def is_partitioned(self) -> bool:
+        result = await self.db.execute(
+            text(
+                "SELECT 1 FROM pg_partitioned_table pt "
+                "JOIN pg_class c ON c.oid = pt.partrelid "
+                "WHERE c.relname = :table AND c.relnamespace = 'public'::regnamespace"
+            ),
+            {"table": PARENT_TABLE},
+        )
+        return result.scalar() is not None
+
+    async def list_month_partitions(self) -> dict[date, str]:
+        """Attached monthly partitions keyed by month start."""
+        result = await self.db.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = :table"
+            ),
+            {"table": PARENT_TABLE},
+        )
+        partitions = {}
+        for (name,) in result.all():
+            match = _PARTITION_RE.match(name)
+            if match:
+                partitions[date(int(match.group(1)), int(match.group(2)), 1)] = name
+        return partitions
+
+    async def create_month_partition(self, month: date) -> str:
+        """Create and attach the partition for ``month``.
+
+        Rows that already landed in the default partition for that month
+        are moved into the new table before it is attached, since Postgres
+        refuses to attach a range the default partition still holds.
+        """
+        name = partition_name(month)
+        # Explicit UTC bounds, independent of the session time zone
+        start = f"{month.isoformat()} 00:00:00+00"
+        end = f"{add_months(month, 1).isoformat()} 00:00:00+00"
+        await self.db.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {name} "
+                f"(LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            )
+        )
+        await self.db.execute(
+            text(
+                f"WITH moved AS ("
+                f"DELETE FROM {DEFAULT_PARTITION} "
+                f"WHERE created_at >= '{start}' AND created_at < '{end}' RETURNING *"
+                f") INSERT INTO {name} SELECT * FROM moved"
+            )
+        )
+        await self.db.execute(
+            text(
+                f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+                f"FOR VALUES FROM ('{start}') TO ('{end}')"
+            )
+        )
+        return name
+
+    async def ensure_partitions(self, months_ahead: int | None = None) -> list[str]:
+        """Make sure partitions exist from this month through ``months_ahead``."""
+        ahead = (
+            months_ahead
+            if months_ahead is not None
+            else settings.recommendation_history_partition_months_ahead
+        )
+        existing = await self.list_month_partitions()
+        current = month_start(datetime.now(UTC).date())
+
+        created = []
+        for offset in range(ahead + 1):
+            month = add_months(current, offset)
+            if month not in existing:
+                created.append(await self.create_month_partition(month))
+        return created
+
+    async def apply_retention(self) -> list[str]:
+        """Detach or drop monthly partitions older than the retention window."""
+        cutoff = retention_cutoff()
+        if cutoff is None:
+            return []
+
+        mode = settings.recommendation_history_retention_mode
+        retired = []
+        for month, name in sorted((await self.list_month_partitions()).items()):
+            if add_months(month, 1) > cutoff.date():
+                continue
+            if mode == "drop":
+                await self.db.execute(text(f"DROP TABLE {name}"))
+            else:
+                await self.db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+            retired.append(name)
+
+        if mode == "drop":
+            # Stragglers in the default partition follow the same policy
+            await self.db.execute(
+                text(f"DELETE FROM {DEFAULT_PARTITION} WHERE created_at < :cutoff"),
+                {"cutoff": cutoff},
+            )
+        return retired
+
+    async def run(self) -> dict:
+        """Create upcoming partitions, apply retention and commit."""
+        if not await self.is_partitioned():
+            return {"partitioned": False}
+        # Serialize with other API processes running the same pass
+        await self.db.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {"name": PARENT_TABLE}
+        )
+        stats = {
+            "created": await self.ensure_partitions(),
+            "retired": await self.apply_retention(),
+        }
+        await self.db.commit()
+        return stats
+
+
+async def run_history_partition_maintenance() -> dict:
+    """Run one partition maintenance pass with its own database session."""
+    async with async_session_maker() as db:
+        stats = await HistoryPartitionService(db).run()
+    logger.info("Recommendation history partition maintenance: %s", stats)
+    return stats
+
+
+async def history_partition_loop(interval_hours: int) -> None:
+    """Run partition maintenance forever, every ``interval_hours``."""
+    while True:
+        try:
+            await run_history_partition_maintenance()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception("Recommendation history partition maintenance failed: %s", e)
+        await asyncio.sleep(interval_hours * 3600)
+
+
+if __name__ == "__main__":
+    from app.database import close_db
+
+    async def _main() -> None:
+        try:
+            print(await run_history_partition_maintenance())
+        finally:
+            await close_db()
+
+    asyncio.run(_main())
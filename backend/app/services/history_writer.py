@@ -0,0 +1,201 @@
+"""Write-behind recommendation history and cache-hit bookkeeping.
+
+Recommendation responses no longer wait for their history ``INSERT`` (or
+the cache ``hit_count`` ``UPDATE`` on cache hits). Records are queued in
+process and a background worker flushes them in batches:
+
+- history rows as one multi-row ``INSERT`` per batch; if it fails the
+  batch is bisected, so only the rows that cannot be written are dropped
+- cache hits aggregated per entry, one ``UPDATE`` per distinct count
+
+The queue is bounded. When it is full, ``recommendation_history_overflow_policy``
+decides whether new records are dropped (``drop``, default; history is
+best-effort) or the caller waits for room (``block``, backpressure).
+Pending records are flushed on application shutdown.
+"""
+
+import asyncio
+import logging
+from collections import Counter
+from datetime import UTC, datetime
+from uuid import UUID
+
+from sqlalchemy import func, insert, update
+
+from app.config import settings
+from app.database import async_session_maker
+from app.models.recommendation import Recommendation
+from app.models.recommendation_cache import RecommendationCache
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryWriter:
+    """Bounded queue plus a lazily started flush worker."""
+
+    def __init__(
+        self,
+        max_queue_size: int,
+        batch_size: int,
+        flush_interval_seconds: float,
+        overflow_policy: str = "drop",
+    ) -> None:
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.overflow_policy = overflow_policy
+        self.dropped = 0
+        self._queue: asyncio.Queue[dict] | None = None
+        self._worker: asyncio.Task | None = None
+        self._stopping = False
+        self._cache_hits: Counter[UUID] = Counter()
+
+    def _ensure_started(self) -> asyncio.Queue[dict]:
+        # Created on first use so the queue binds to the running event loop
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        return self._queue
+
+    async def add(self, values: dict) -> bool:
+        """Queue one ``recommendations`` row. Returns False if it was dropped."""
+        values.setdefault("created_at", datetime.now(UTC))
+        queue = self._ensure_started()
+        if self.overflow_policy == "block":
+            await queue.put(values)
+            return True
+        try:
+            queue.put_nowait(values)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(
+                "Recommendation history queue full (%d); dropped record %s",
+                self.max_queue_size,
+                values.get("id"),
+            )
+            return False
+        return True
+
+    def record_cache_hit(self, cache_id: UUID) -> None:
+        """Count a cache hit; written with the next flush."""
+        self._ensure_started()
+        self._cache_hits[cache_id] += 1
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while not self._stopping:
+            batch = []
+            try:
+                batch.append(
+                    await asyncio.wait_for(queue.get(), timeout=self.flush_interval_seconds)
+                )
+            except TimeoutError:
+                pass
+            # Take whatever else is already waiting, up to one batch
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            if batch or self._cache_hits:
+                await self._write(batch)
+
+    async def _write(self, batch: list[dict]) -> None:
+        cache_hits, self._cache_hits = self._cache_hits, Counter()
+        try:
+            async with async_session_maker() as db:
+                if batch:
+                    await db.execute(insert(Recommendation), batch)
+                await self._apply_cache_hits(db, cache_hits)
+                await db.commit()
+            return
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Recommendation history flush failed, retrying in parts: %s", e)
+
+        # One bad row must not take the rest of the batch (other users' history) with it
+        await self._write_cache_hits(cache_hits)
+        await self._write_rows(batch)
+
+    @staticmethod
+    async def _apply_cache_hits(db, cache_hits: Counter[UUID]) -> None:
+        ids_by_count: dict[int, list[UUID]] = {}
+        for cache_id, count in cache_hits.items():
+            ids_by_count.setdefault(count, []).append(cache_id)
+        for count, cache_ids in ids_by_count.items():
+            await db.execute(
+                update(RecommendationCache)
+                .where(RecommendationCache.id.in_(cache_ids))
+                .values(
+                    hit_count=RecommendationCache.hit_count + count,
+                    last_hit_at=func.now(),
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+    async def _write_cache_hits(self, cache_hits: Counter[UUID]) -> None:
+        if not cache_hits:
+            return
+        try:
+            async with async_session_maker() as db:
+                await self._apply_cache_hits(db, cache_hits)
+                await db.commit()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception(
+                "Recommendation cache hit update failed; dropped %d entries: %s", len(cache_hits), e
+            )
+
+    async def _write_rows(self, rows: list[dict]) -> None:
+        """Insert ``rows``, bisecting on failure so only failing rows are dropped."""
+        if not rows:
+            return
+        try:
+            async with async_session_maker() as db:
+                await db.execute(insert(Recommendation), rows)
+                await db.commit()
+            return
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if len(rows) == 1:
+                self.dropped += 1
+                logger.exception(
+                    "Recommendation history record %s dropped: %s", rows[0].get("id"), e
+                )
+                return
+        middle = len(rows) // 2
+        await self._write_rows(rows[:middle])
+        await self._write_rows(rows[middle:])
+
+    async def flush(self) -> None:
+        """Write everything queued so far."""
+        if self._queue is None:
+            return
+        while not self._queue.empty() or self._cache_hits:
+            batch = []
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            await self._write(batch)
+
+    async def shutdown(self) -> None:
+        """Stop the worker and flush pending records.
+
+        The worker is asked to stop rather than cancelled, so a batch that is
+        being written is never lost; it exits within one flush interval.
+        """
+        self._stopping = True
+        if self._worker:
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+        await self.flush()
+        self._stopping = False
+
+
+history_writer = HistoryWriter(
+    max_queue_size=settings.recommendation_history_queue_size,
+    batch_size=settings.recommendation_history_batch_size,
+    flush_interval_seconds=settings.recommendation_history_flush_interval_seconds,
+    overflow_policy=settings.recommendation_history_overflow_policy,
+)
@@ -0,0 +1,386 @@
+"""Deterministic, rule-based wine pairing engine.
+
+Used as an instant fallback when the recommendation AI provider is not
+configured, fails or times out, and as the ``fast`` recommendation mode.
+It returns the same dict shape as ``AIService.get_pairing_recommendations``
+so results flow through the normal ``RecommendationResponse`` path.
+
+Scoring combines:
+- a food/occasion category -> wine style matrix (types and taste axes)
+- grape heuristics, with grapes inferred from region/appellation if missing
+- overlap with the wine's own ``food_pairing`` notes
+- drinking-window urgency
+"""
+
+from __future__ import annotations
+
+import unicodedata
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from app.services.drinking_window import drinking_urgency
+from app.services.query_normalizer import tokenize_query
+
+ENGINE_NAME = "offline"
+ENGINE_MODEL = "offline/rule-based"
+
+_AXES = ("body", "tannin", "acidity", "sweetness")
+
+
+@dataclass(frozen=True)
+class StyleProfile:
+    """Target wine style for a food or occasion category."""
+
+    types: tuple[str, ...]
+    body: float | None = None
+    tannin: float | None = None
+    acidity: float | None = None
+    sweetness: float | None = None
+    grapes: frozenset[str] = field(default_factory=frozenset)
+    style_ko: str = ""
+    style_en: str = ""
+
+
+def _grapes(*names: str) -> frozenset[str]:
+    return frozenset(names)
+
+
+_FULL_RED = _grapes("cabernet sauvignon", "malbec", "syrah", "shiraz", "nebbiolo", "tempranillo")
+
+STYLE_MATRIX: dict[str, StyleProfile] = {
+    "steak": StyleProfile(("red",), 4.5, 4, 3, 1, _FULL_RED, "풀바디 레드", "full-bodied red"),
+    "beef": StyleProfile(("red",), 4, 3.5, 3, 1, _FULL_RED | _grapes("merlot"), "풀바디 레드", "full-bodied red"),
+    "bbq": StyleProfile(
+        ("red",), 4, 3, 3, 1.5,
+        _grapes("zinfandel", "primitivo", "shiraz", "syrah", "malbec", "grenache"),
+        "과실향 풍부한 레드", "fruit-forward red",
+    ),
+    "lamb": StyleProfile(
+        ("red",), 4, 3.5, 3, 1,
+        _grapes("syrah", "shiraz", "grenache", "cabernet sauvignon", "tempranillo", "mourvedre"),
+        "스파이시한 레드", "spicy, savoury red",
+    ),
+    "pork": StyleProfile(
+        ("red", "white", "rose"), 3, 2, 3.5, 1.5,
+        _grapes("pinot noir", "grenache", "riesling", "chenin blanc", "gamay"),
+        "산도 좋은 미디엄바디", "medium-bodied wine with fresh acidity",
+    ),
+    "chicken": StyleProfile(
+        ("white", "red"), 3, 1.5, 3, 1,
+        _grapes("chardonnay", "pinot noir", "viognier", "gamay"),
+        "미디엄바디 화이트", "medium-bodied white",
+    ),
+    "duck": StyleProfile(
+        ("red",), 3, 2.5, 4, 1,
+        _grapes("pinot noir", "merlot", "nebbiolo"),
+        "우아한 레드", "elegant red",
+    ),
+    "salmon": StyleProfile(
+        ("white", "rose", "red"), 3, 1.5, 3.5, 1,
+        _grapes("pinot noir", "chardonnay", "pinot gris"),
+        "가벼운 레드 또는 풍성한 화이트", "light red or rich white",
+    ),
+    "tuna": StyleProfile(
+        ("rose", "red", "white"), 3, 1.5, 3.5, 1,
+        _grapes("pinot noir", "grenache", "gamay"),
+        "로제 또는 가벼운 레드", "rosé or light red",
+    ),
+    "fish": StyleProfile(
+        ("white", "sparkling"), 2, 1, 4, 1,
+        _grapes("sauvignon blanc", "albarino", "chardonnay", "vermentino", "muscadet"),
+        "상큼한 화이트", "crisp white",
+    ),
+    "seafood": StyleProfile(
+        ("white", "sparkling"), 2, 1, 4.5, 1,
+        _grapes("sauvignon blanc", "albarino", "muscadet", "chardonnay"),
+        "상큼한 화이트", "crisp white",
+    ),
+    "shellfish": StyleProfile(
+        ("white", "sparkling"), 2, 1, 4.5, 1,
+        _grapes("albarino", "muscadet", "sauvignon blanc", "chardonnay"),
+        "미네랄리티 있는 화이트", "mineral white",
+    ),
+    "oyster": StyleProfile(
+        ("sparkling", "white"), 1.5, 1, 5, 1,
+        _grapes("chardonnay", "muscadet", "sauvignon blanc"),
+        "드라이한 스파클링", "dry sparkling",
+    ),
+    "sushi": StyleProfile(
+        ("sparkling", "white", "rose"), 2, 1, 4, 1.5,
+        _grapes("riesling", "sauvignon blanc", "gruner veltliner"),
+        "산뜻한 화이트 또는 스파클링", "fresh white or sparkling",
+    ),
+    "pasta": StyleProfile(
+        ("red", "white"), 3, 2.5, 4, 1,
+        _grapes("sangiovese", "barbera", "montepulciano", "nebbiolo"),
+        "산도 좋은 이탈리아 레드", "high-acid Italian red",
+    ),
+    "pizza": StyleProfile(
+        ("red",), 3, 2.5, 4, 1,
+        _grapes("sangiovese", "barbera", "zinfandel", "montepulciano"),
+        "산도 좋은 레드", "juicy, high-acid red",
+    ),
+    "tomato": StyleProfile(
+        ("red",), 3, 2.5, 4, 1,
+        _grapes("sangiovese", "barbera"),
+        "산도 좋은 레드", "high-acid red",
+    ),
+    "mushroom": StyleProfile(
+        ("red",), 3, 2.5, 3.5, 1,
+        _grapes("pinot noir", "nebbiolo"),
+        "흙내음 있는 레드", "earthy red",
+    ),
+    "cheese": StyleProfile(
+        ("red", "white", "fortified"), 3.5, 2.5, 3.5, 1.5,
+        _grapes("cabernet sauvignon", "chardonnay", "nebbiolo"),
+        "구조감 있는 와인", "structured wine",
+    ),
+    "spicy": StyleProfile(
+        ("white", "rose"), 2.5, 1, 3.5, 2.5,
+        _grapes("riesling", "gewurztraminer", "chenin blanc"),
+        "오프드라이 화이트", "off-dry white",
+    ),
+    "salad": StyleProfile(
+        ("white", "rose"), 2, 1, 4, 1,
+        _grapes("sauvignon blanc", "gruner veltliner"),
+        "상큼한 화이트", "crisp white",
+    ),
+    "dessert": StyleProfile(
+        ("dessert", "fortified", "sparkling"), 3.5, 1, 3, 4.5,
+        _grapes("muscat", "moscato", "semillon"),
+        "스위트 와인", "sweet wine",
+    ),
+    "chocolate": StyleProfile(
+        ("fortified", "dessert", "red"), 4.5, 3, 2.5, 4,
+        _grapes("touriga nacional", "grenache", "zinfandel"),
+        "주정강화 와인", "fortified wine",
+    ),
+    # Occasions / moods
+    "celebration": StyleProfile(
+        ("sparkling",), 2.5, 1, 4, 1.5,
+        _grapes("chardonnay", "pinot noir", "pinot meunier"),
+        "스파클링", "sparkling",
+    ),
+    "relax": StyleProfile(
+        ("red", "white"), 3, 2.5, 3, 1.5,
+        _grapes("merlot", "pinot noir", "chardonnay"),
+        "부드러운 와인", "smooth, easy-drinking wine",
+    ),
+}
+
+_DEFAULT_PROFILE = StyleProfile(("red", "white"), 3, 2.5, 3, 1.5, frozenset(), "균형 잡힌 와인", "balanced wine")
+
+_OCCASION_KEYWORDS: dict[str, str] = {
+    "celebration": "celebration", "celebrate": "celebration", "party": "celebration",
+    "anniversary": "celebration", "birthday": "celebration", "wedding": "celebration",
+    "축하": "celebration", "파티": "celebration", "기념일": "celebration", "생일": "celebration",
+    "relax": "relax", "relaxing": "relax", "cozy": "relax", "calm": "relax",
+    "편안한": "relax", "휴식": "relax", "혼술": "relax",
+}
+
+# Typical taste axes by wine type, used when a wine has no profile stored.
+_TYPE_DEFAULT_AXES: dict[str, tuple[float, float, float, float]] = {
+    "red": (4, 3, 3, 1),
+    "white": (3, 1, 3.5, 1.5),
+    "rose": (2.5, 1, 3.5, 1.5),
+    "sparkling": (2, 1, 4, 1.5),
+    "dessert": (4, 1, 3, 5),
+    "fortified": (5, 2, 2.5, 4.5),
+}
+
+_REGION_GRAPES: dict[str, frozenset[str]] = {
+    "bordeaux": _grapes("cabernet sauvignon", "merlot"),
+    "medoc": _grapes("cabernet sauvignon", "merlot"),
+    "margaux": _grapes("cabernet sauvignon", "merlot"),
+    "pauillac": _grapes("cabernet sauvignon", "merlot"),
+    "saint-emilion": _grapes("merlot", "cabernet franc"),
+    "pomerol": _grapes("merlot"),
+    "burgundy": _grapes("pinot noir", "chardonnay"),
+    "bourgogne": _grapes("pinot noir", "chardonnay"),
+    "chablis": _grapes("chardonnay"),
+    "champagne": _grapes("chardonnay", "pinot noir", "pinot meunier"),
+    "beaujolais": _grapes("gamay"),
+    "rhone": _grapes("syrah", "grenache"),
+    "chateauneuf-du-pape": _grapes("grenache", "syrah", "mourvedre"),
+    "loire": _grapes("sauvignon blanc", "chenin blanc", "cabernet franc"),
+    "sancerre": _grapes("sauvignon blanc"),
+    "alsace": _grapes("riesling", "gewurztraminer", "pinot gris"),
+    "mosel": _grapes("riesling"),
+    "barolo": _grapes("nebbiolo"),
+    "barbaresco": _grapes("nebbiolo"),
+    "piedmont": _grapes("nebbiolo", "barbera"),
+    "piemonte": _grapes("nebbiolo", "barbera"),
+    "chianti": _grapes("sangiovese"),
+    "tuscany": _grapes("sangiovese"),
+    "toscana": _grapes("sangiovese"),
+    "montalcino": _grapes("sangiovese"),
+    "rioja": _grapes("tempranillo"),
+    "ribera del duero": _grapes("tempranillo"),
+    "rias baixas": _grapes("albarino"),
+    "douro": _grapes("touriga nacional"),
+    "mendoza": _grapes("malbec"),
+    "napa": _grapes("cabernet sauvignon"),
+    "barossa": _grapes("shiraz"),
+    "marlborough": _grapes("sauvignon blanc"),
+}
+
+
+_URGENCY_BONUS = {"drink_now": 0.08, "drink_soon": 0.05, "optimal": 0.03, "can_wait": 0.0}
+
+
+def _normalize_grape(name: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", name.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).strip()
+
+
+class PairingEngine:
+    """Rule-based pairing engine (pure Python, no I/O)."""
+
+    def resolve_profiles(self, query: str) -> tuple[list[str], list[StyleProfile]]:
+        """Map a query onto matching categories and their style profiles."""
+        categories: list[str] = []
+        for token in tokenize_query(query):
+            category = token if token in STYLE_MATRIX else _OCCASION_KEYWORDS.get(token)
+            if category and category not in categories:
+                categories.append(category)
+        if not categories:
+            return [], [_DEFAULT_PROFILE]
+        return categories, [STYLE_MATRIX[c] for c in categories]
+
+    @staticmethod
+    def _wine_axes(wine: dict) -> dict[str, float]:
+        defaults = _TYPE_DEFAULT_AXES.get(wine.get("type") or "red", _TYPE_DEFAULT_AXES["red"])
+        return {
+            axis: float(wine[axis]) if wine.get(axis) is not None else default
+            for axis, default in zip(_AXES, defaults, strict=True)
+        }
+
+    @staticmethod
+    def _wine_grapes(wine: dict) -> set[str]:
+        grapes = {_normalize_grape(g) for g in (wine.get("grape_variety") or [])}
+        if grapes:
+            return grapes
+        location = " ".join(
+            _normalize_grape(wine.get(key) or "") for key in ("region", "appellation")
+        )
+        for region, region_grapes in _REGION_GRAPES.items():
+            if region in location:
+                grapes |= region_grapes
+        return grapes
+
+    def _score(
+        self,
+        wine: dict,
+        profiles: list[StyleProfile],
+        query_tokens: set[str],
+        urgency: str,
+        prioritize_expiring: bool,
+    ) -> float:
+        axes = self._wine_axes(wine)
+        grapes = self._wine_grapes(wine)
+        wine_type = wine.get("type") or "red"
+
+        best = 0.0
+        for profile in profiles:
+            if wine_type in profile.types:
+                type_score = 1.0 - 0.15 * profile.types.index(wine_type)
+            else:
+                type_score = 0.3
+
+            diffs = [
+                abs(axes[axis] - target)
+                for axis in _AXES
+                if (target := getattr(profile, axis)) is not None
+            ]
+            axis_score = 1.0 - (sum(diffs) / len(diffs)) / 4 if diffs else 0.5
+            grape_score = 1.0 if grapes & profile.grapes else 0.0
+
+            best = max(best, 0.4 * type_score + 0.3 * axis_score + 0.15 * grape_score)
+
+        pairing_tokens: set[str] = set()
+        for pairing in wine.get("food_pairing") or []:
+            pairing_tokens.update(tokenize_query(pairing))
+        food_score = 1.0 if query_tokens and pairing_tokens & query_tokens else 0.0
+
+        score = best + 0.15 * food_score
+        if prioritize_expiring:
+            score += _URGENCY_BONUS[urgency]
+        return min(score, 0.99)
+
+    @staticmethod
+    def _texts(
+        wine: dict,
+        profile: StyleProfile,
+        query: str,
+        urgency: str,
+        english: bool,
+    ) -> tuple[str, str]:
+        name = wine.get("name") or ("This wine" if english else "이 와인")
+        wine_type = wine.get("type") or "red"
+        if english:
+            reason = f"{name} matches the {profile.style_en} style that suits \"{query}\"."
+            if urgency in ("drink_now", "drink_soon"):
+                reason += " It is at the end of its drinking window, so now is a good time to open it."
+        else:
+            reason = f"{name}은(는) \"{query}\"에 어울리는 {profile.style_ko} 스타일입니다."
+            if urgency in ("drink_now", "drink_soon"):
+                reason += " 음용 적기가 얼마 남지 않아 지금 여는 것을 추천합니다."
+
+        if wine_type == "red" and (wine.get("tannin") or 3) >= 4:
+            tips = "Decant for 30 minutes and serve at 16-18°C." if english else "30분 정도 디캔팅 후 16-18°C로 서빙하세요."
+        elif wine_type == "red":
+            tips = "Serve slightly cool, around 14-16°C." if english else "14-16°C로 살짝 차게 서빙하세요."
+        elif wine_type in ("sparkling", "white", "rose"):
+            tips = "Serve well chilled at 6-10°C." if english else "6-10°C로 충분히 차게 서빙하세요."
+        else:
+            tips = "Serve in small glasses at 10-14°C." if english else "작은 잔에 10-14°C로 서빙하세요."
+        return reason, tips
+
+    def recommend(
+        self,
+        query: str,
+        wines: list[dict],
+        user_language: str | None = None,
+        max_results: int = 5,
+        prioritize_expiring: bool = True,
+    ) -> dict:
+        """Rank ``wines`` for ``query`` and return an AI-compatible result dict."""
+        english = bool(user_language) and not user_language.lower().startswith("ko")
+        categories, profiles = self.resolve_profiles(query)
+        query_tokens = set(tokenize_query(query))
+        current_year = datetime.now().year
+
+        scored = []
+        for wine in wines:
+            urgency = drinking_urgency(
+                wine.get("drinking_window_start"), wine.get("drinking_window_end"), current_year
+            )
+            score = self._score(wine, profiles, query_tokens, urgency, prioritize_expiring)
+            scored.append((score, urgency, wine))
+        # Stable, deterministic ordering: score, then name/id
+        scored.sort(key=lambda item: (-item[0], item[2].get("name") or "", str(item[2].get("id"))))
+
+        primary = profiles[0]
+        recommendations = []
+        for rank, (score, urgency, wine) in enumerate(scored[:max_results], start=1):
+            reason, tips = self._texts(wine, primary, query, urgency, english)
+            recommendations.append({
+                "wine_id": wine.get("id"),
+                "wine_name": wine.get("name"),
+                "rank": rank,
+                "match_score": round(score, 2),
+                "reason": reason,
+                "pairing_tips": tips,
+                "drinking_urgency": urgency,
+            })
+
+        if english:
+            advice = f"A {primary.style_en} is the safest match for this request."
+        else:
+            advice = f"요청하신 메뉴에는 {primary.style_ko} 스타일이 가장 잘 어울립니다."
+
+        return {
+            "recommendations": recommendations,
+            "general_advice": advice,
+            "engine": ENGINE_NAME,
+        }
@@ -0,0 +1,220 @@
+"""Local query canonicalization for recommendation cache keys.
+
+Maps free-form pairing queries such as "Steak", "steak dinner" and
+"grilled ribeye steak" onto a shared canonical form so they resolve to
+the same cache entry instead of triggering separate AI calls.
+
+Pipeline:
+1. Tokenize (Unicode word characters, Hangul included).
+2. Strip Korean particles (unless the token is a dictionary word as is)
+   and apply a light English suffix stemmer.
+3. Drop Korean / English stop words and cooking-method modifiers.
+4. Map multi-word dishes, then single food synonyms, onto a canonical
+   term (e.g. crab cake -> shellfish, ribeye -> steak).
+5. Sort and de-duplicate the remaining tokens.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from difflib import SequenceMatcher
+
+_TOKEN_RE = re.compile(r"[\w'-]+", re.UNICODE)
+
+_EN_STOP_WORDS = frozenset({
+    "a", "an", "and", "any", "as", "at", "best", "by", "can", "dinner", "dish",
+    "drink", "eat", "eating", "evening", "for", "food", "good", "goes", "go",
+    "have", "i", "in", "is", "it", "lunch", "me", "meal", "my", "night", "of",
+    "on", "or", "pair", "pairing", "please", "recommend", "recommendation",
+    "some", "something", "that", "the", "tonight", "to", "today", "what",
+    "which", "wine", "wines", "with", "would",
+})
+
+_KO_STOP_WORDS = frozenset({
+    "같이", "곁들일", "먹을", "먹는", "마실", "마시기", "메뉴", "무엇", "뭐",
+    "어울리는", "어울릴", "오늘", "와인", "요리", "음식", "저녁", "점심", "좋은",
+    "주세요", "추천", "추천해줘", "추천해주세요", "함께", "해줘", "때",
+})
+
+# Cooking methods barely move the pairing compared to the main ingredient,
+# so they are dropped to let "grilled steak" share an entry with "steak".
+_MODIFIERS = frozenset({
+    "bake", "baked", "braise", "braised", "fry", "fried", "grill", "grilled",
+    "pan", "pan-seared", "roast", "roasted", "sear", "seared", "smoked",
+    "구운", "튀긴", "찐", "볶은", "훈제",
+})
+
+# Korean particles (josa) stripped from the end of a token, longest first.
+_KO_PARTICLES = (
+    "이랑", "으로", "에서", "에는", "하고", "이나",
+    "과", "와", "랑", "을", "를", "은", "는", "이", "가", "에", "의", "도", "로", "나",
+)
+
+_FOOD_SYNONYMS: dict[str, str] = {
+    # Beef
+    "ribeye": "steak", "rib-eye": "steak", "sirloin": "steak", "tenderloin": "steak",
+    "filet": "steak", "t-bone": "steak", "striploin": "steak", "스테이크": "steak",
+    "등심": "steak", "안심": "steak", "채끝": "steak", "립아이": "steak",
+    "소고기": "beef", "쇠고기": "beef", "한우": "beef", "brisket": "beef",
+    "갈비": "bbq", "불고기": "bbq", "바비큐": "bbq", "barbecue": "bbq",
+    # Other meat
+    "돼지고기": "pork", "삼겹살": "pork", "목살": "pork", "bacon": "pork",
+    "양고기": "lamb", "양갈비": "lamb", "mutton": "lamb",
+    "닭": "chicken", "닭고기": "chicken", "치킨": "chicken",
+    "오리": "duck", "오리고기": "duck",
+    # Seafood
+    "연어": "salmon", "참치": "tuna",
+    "생선": "fish", "흰살생선": "fish", "cod": "fish", "대구": "fish",
+    "해산물": "seafood", "shrimp": "shellfish", "prawn": "shellfish", "새우": "shellfish",
+    "조개": "shellfish", "lobster": "shellfish", "랍스터": "shellfish",
+    "crab": "shellfish", "게": "shellfish", "oyster": "oyster", "굴": "oyster",
+    "초밥": "sushi", "스시": "sushi", "sashimi": "sushi", "회": "sushi",
+    # Other
+    "파스타": "pasta", "spaghetti": "pasta", "스파게티": "pasta",
+    "피자": "pizza", "치즈": "cheese", "버섯": "mushroom",
+    "초콜릿": "chocolate", "초콜렛": "chocolate",
+    "디저트": "dessert", "케이크": "dessert", "cheesecake": "dessert", "cupcake": "dessert",
+    "매운": "spicy", "매콤한": "spicy", "떡볶이": "spicy",
+    "샐러드": "salad", "토마토": "tomato",
+}
+
+# Two-token dishes (after stemming) checked before single synonyms: "cake"
+# alone is no dessert, as "crab cakes" shows.
+_FOOD_PHRASES: dict[tuple[str, str], str] = {
+    ("cheese", "cake"): "dessert", ("chocolate", "cake"): "dessert",
+    ("carrot", "cake"): "dessert", ("sponge", "cake"): "dessert",
+    ("crab", "cake"): "shellfish", ("fish", "cake"): "fish",
+}
+
+
+def _strip_accents(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def fold_text(text: str) -> str:
+    """Case- and accent-insensitive form of ``text`` for matching."""
+    return _strip_accents(text).casefold()
+
+
+def _is_hangul(token: str) -> bool:
+    return any("가" <= ch <= "힣" for ch in token)
+
+
+def _is_known_word(token: str) -> bool:
+    return token in _FOOD_SYNONYMS or token in _KO_STOP_WORDS or token in _MODIFIERS
+
+
+def _strip_korean_particle(token: str) -> str:
+    """Drop a trailing particle, preferring forms found in the dictionaries.
+
+    "떡볶이" is kept whole (its 이 is not a particle) and "떡볶이랑" loses
+    랑 rather than 이랑; unknown words lose their longest particle.
+    """
+    if _is_known_word(token):
+        return token
+    stripped = [
+        token[: -len(particle)]
+        for particle in _KO_PARTICLES
+        if token.endswith(particle) and len(token) - len(particle) >= 2
+    ]
+    for candidate in stripped:
+        if _is_known_word(candidate):
+            return candidate
+    return stripped[0] if stripped else token
+
+
+def _stem_english(token: str) -> str:
+    """Very small suffix stemmer; good enough for food nouns and adjectives."""
+    if len(token) <= 3:
+        return token
+    if token.endswith("ies") and len(token) > 4:
+        return token[:-3] + "y"
+    if token.endswith(("ches", "shes", "xes", "sses", "oes")):
+        return token[:-2]
+    if token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def tokenize_query(query: str) -> list[str]:
+    """Split a query into canonical food tokens (order preserved, may repeat)."""
+    text = unicodedata.normalize("NFKC", query).lower()
+    tokens: list[str] = []
+    for raw in _TOKEN_RE.findall(text):
+        raw = raw.strip("'-_")
+        if not raw:
+            continue
+        if _is_hangul(raw):
+            token = _strip_korean_particle(raw)
+            if token in _KO_STOP_WORDS:
+                continue
+        else:
+            token = _strip_accents(raw)
+            if token in _EN_STOP_WORDS:
+                continue
+            if token not in _FOOD_SYNONYMS and token not in _MODIFIERS:
+                token = _stem_english(token)
+            if token in _EN_STOP_WORDS:
+                continue
+        if token in _MODIFIERS or raw in _MODIFIERS:
+            continue
+        tokens.append(token)
+
+    canonical: list[str] = []
+    index = 0
+    while index < len(tokens):
+        phrase = _FOOD_PHRASES.get(tuple(tokens[index:index + 2]))
+        if phrase:
+            canonical.append(phrase)
+            index += 2
+        else:
+            canonical.append(_FOOD_SYNONYMS.get(tokens[index], tokens[index]))
+            index += 1
+    return canonical
+
+
+def legacy_normalize(query: str) -> str:
+    """The pre-canonicalization cache key form (strip + lowercase)."""
+    return query.strip().lower()
+
+
+def canonicalize_query(query: str) -> str:
+    """Return the canonical cache form of a query.
+
+    Falls back to the whitespace-collapsed lowercase query when every
+    token is a stop word, so the key is never empty.
+    """
+    tokens = sorted(set(tokenize_query(query)))
+    if tokens:
+        return " ".join(tokens)
+    return " ".join(legacy_normalize(query).split())
+
+
+def query_similarity(a: str, b: str) -> float:
+    """Similarity of two canonical queries in [0, 1].
+
+    Takes the better of token-set Jaccard (reordering, extra tokens) and
+    character-level ratio (typos such as "chiken" vs "chicken").
+    """
+    if a == b:
+        return 1.0
+    tokens_a, tokens_b = set(a.split()), set(b.split())
+    union = tokens_a | tokens_b
+    jaccard = len(tokens_a & tokens_b) / len(union) if union else 0.0
+    return max(jaccard, SequenceMatcher(None, a, b).ratio())
+
+
+def find_similar_query(
+    canonical: str,
+    candidates: list[str],
+    threshold: float,
+) -> str | None:
+    """Pick the most similar candidate at or above ``threshold``."""
+    best, best_score = None, threshold
+    for candidate in candidates:
+        score = query_similarity(canonical, candidate)
+        if score >= best_score:
+            best, best_score = candidate, score
+    return best
@@ -4,32 +4,161 @@ import hashlib
 import json
 import logging
 import uuid
-from datetime import datetime, timedelta, timezone
-from decimal import Decimal
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal, InvalidOperation
 from uuid import UUID
 
-from sqlalchemy import func, select, update
+from sqlalchemy import func, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
 
 from app.config import settings
-from app.models.wine import Wine
-from app.models.user_wine import UserWine
 from app.models.recommendation import Recommendation
 from app.models.recommendation_cache import RecommendationCache
+from app.models.user_wine import UserWine, owned_condition
+from app.models.wine import Wine
+from app.schemas.common import PaginatedData, PaginatedResponse, PaginationMeta
 from app.schemas.recommendation import (
+    MenuCourse,
+    MenuCourseRecommendation,
+    MenuRecommendationResponse,
+    RecommendationHistoryItem,
+    RecommendationItem,
     RecommendationPreferences,
     RecommendationResponse,
-    RecommendationItem,
-    RecommendationHistoryItem,
 )
-from app.schemas.common import PaginatedResponse, PaginatedData, PaginationMeta
 from app.services.ai_service import AIService
-
+from app.services.drinking_window import drinking_urgency
+from app.services.history_partition_service import retention_cutoff
+from app.services.history_writer import history_writer
+from app.services.pairing_engine import ENGINE_MODEL, ENGINE_NAME
+from app.services.query_normalizer import (
+    canonicalize_query,
+    find_similar_query,
+    legacy_normalize,
+)
+from app.utils.pagination import encode_cursor
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class RecommendationCacheStats:
+    """Process-wide cache lookup counters.
+
+    ``legacy_hits`` counts hits whose canonical key equals the old
+    strip/lowercase form, i.e. hits the previous normalization would also
+    have produced. Comparing it with ``hit_ratio`` shows the gain from
+    canonicalization and fuzzy matching.
+    """
+
+    legacy_hits: int = 0
+    canonical_hits: int = 0
+    fuzzy_hits: int = 0
+    misses: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.legacy_hits + self.canonical_hits + self.fuzzy_hits + self.misses
+
+    @property
+    def hit_ratio(self) -> float:
+        if not self.lookups:
+            return 0.0
+        return (self.lookups - self.misses) / self.lookups
+
+    @property
+    def legacy_hit_ratio(self) -> float:
+        if not self.lookups:
+            return 0.0
+        return self.legacy_hits / self.lookups
+
+    def as_dict(self) -> dict:
+        return {
+            "lookups": self.lookups,
+            "legacy_hits": self.legacy_hits,
+            "canonical_hits": self.canonical_hits,
+            "fuzzy_hits": self.fuzzy_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hit_ratio, 4),
+            "legacy_hit_ratio": round(self.legacy_hit_ratio, 4),
+        }
+
+
+cache_stats = RecommendationCacheStats()
+
+
+@dataclass(slots=True)
+class CandidateWine:
+    """Lean projection of an owned bottle used to rank recommendations.
+
+    Only the columns the AI prompt and the offline engine read are loaded;
+    full ``UserWine`` rows (wine, tags) are hydrated for the final picks.
+    """
+
+    id: UUID
+    wine_id: UUID
+    quantity: int
+    name: str
+    vintage: int | None
+    type: str
+    country: str | None
+    region: str | None
+    grape_variety: list[str] | None
+    body: int | None
+    tannin: int | None
+    acidity: int | None
+    sweetness: int | None
+    food_pairing: list[str] | None
+    flavor_notes: list[str] | None
+    drinking_window_start: int | None
+    drinking_window_end: int | None
+
+
+def normalize_match_score(value) -> Decimal:
+    """AI ``match_score`` as a Decimal in [0, 1] with three decimals.
+
+    Models sometimes answer in percent (95 instead of 0.95); unparseable
+    scores become 0. Keeps ``top_match_score`` (Numeric(4, 3)) in range.
+    """
+    try:
+        score = Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        return Decimal("0.000")
+    if not score.is_finite():
+        return Decimal("0.000")
+    if score > 1:
+        score /= 100
+    return min(max(score, Decimal(0)), Decimal(1)).quantize(Decimal("0.001"))
+
+
+# History query_type of menu requests. Their query_text joins the courses,
+# but the cache is keyed per course, so it is never a cache key itself.
+MENU_QUERY_TYPE = "menu"
+
+_CANDIDATE_COLUMNS = (
+    UserWine.id,
+    UserWine.wine_id,
+    UserWine.quantity,
+    Wine.name,
+    Wine.vintage,
+    Wine.type,
+    Wine.country,
+    Wine.region,
+    Wine.grape_variety,
+    Wine.body,
+    Wine.tannin,
+    Wine.acidity,
+    Wine.sweetness,
+    Wine.food_pairing,
+    Wine.flavor_notes,
+    Wine.drinking_window_start,
+    Wine.drinking_window_end,
+)
+
+
 class RecommendationService:
     """Service for wine pairing recommendations."""
 
@@ -37,26 +166,15 @@ class RecommendationService:
         self.db = db
         self.ai_service = AIService()
 
-    def _get_drinking_urgency(self, wine: Wine) -> str:
+    @staticmethod
+    def _get_drinking_urgency(wine: Wine) -> str:
         """Calculate drinking urgency based on drinking window."""
-        if not wine.drinking_window_end:
-            return "can_wait"
-
-        current_year = datetime.now().year
-
-        if wine.drinking_window_end < current_year:
-            return "drink_now"
-        elif wine.drinking_window_end <= current_year + 1:
-            return "drink_soon"
-        elif wine.drinking_window_start and wine.drinking_window_start <= current_year:
-            return "optimal"
-        else:
-            return "can_wait"
+        return drinking_urgency(wine.drinking_window_start, wine.drinking_window_end)
 
     @staticmethod
     def _normalize_query(query: str) -> str:
-        """Normalize query text for consistent cache keys."""
-        return query.strip().lower()
+        """Canonicalize query text so near-identical requests share a cache key."""
+        return canonicalize_query(query)
 
     @staticmethod
     def _build_wine_collection_hash(user_wines: list, wine_types_filter: list[str] | None = None) -> str:
@@ -72,6 +190,21 @@ class RecommendationService:
         payload = json.dumps({"wines": wine_data, "filter": sorted(wine_types_filter) if wine_types_filter else None})
         return hashlib.sha256(payload.encode()).hexdigest()
 
+    @staticmethod
+    def _build_filter_key(wine_types_filter: list[str] | None) -> str:
+        """Stored form of the wine type filter ("" when unfiltered)."""
+        return ",".join(sorted(wine_types_filter)) if wine_types_filter else ""
+
+    @staticmethod
+    def _menu_cache_query_type(query_type: str, unique_bottles: bool) -> str:
+        """Cache query_type of a menu course, e.g. ``menu:food:unique``.
+
+        Menu course results come from the menu prompt (course progression,
+        unique bottles, extra candidates), so they must not answer a
+        standalone query of the same dish, nor a menu in the other mode.
+        """
+        return f"{MENU_QUERY_TYPE}:{query_type}:{'unique' if unique_bottles else 'shared'}"
+
     @staticmethod
     def _build_cache_key(
         user_id: UUID,
@@ -87,7 +220,7 @@ class RecommendationService:
     async def _lookup_cache(self, cache_key: str) -> RecommendationCache | None:
         """Look up a valid (non-expired) cache entry."""
         ttl_hours = settings.recommendation_cache_ttl_hours
-        cutoff = datetime.now(timezone.utc) - timedelta(hours=ttl_hours)
+        cutoff = datetime.now(UTC) - timedelta(hours=ttl_hours)
 
         result = await self.db.execute(
             select(RecommendationCache).where(
@@ -97,6 +230,79 @@ class RecommendationService:
         )
         return result.scalar_one_or_none()
 
+    async def _find_similar_cached_query(
+        self,
+        user_id: UUID,
+        query_type: str,
+        normalized_query: str,
+        wine_collection_hash: str,
+    ) -> str | None:
+        """Find a recently cached query text close enough to reuse its entry.
+
+        Candidates are limited to the same user, query type and collection
+        snapshot, so a match can only differ in wording.
+        """
+        ttl_hours = settings.recommendation_cache_ttl_hours
+        cutoff = datetime.now(UTC) - timedelta(hours=ttl_hours)
+
+        result = await self.db.execute(
+            select(RecommendationCache.query_text)
+            .where(
+                RecommendationCache.user_id == user_id,
+                RecommendationCache.query_type == query_type,
+                RecommendationCache.wine_collection_hash == wine_collection_hash,
+                RecommendationCache.created_at >= cutoff,
+            )
+            .order_by(RecommendationCache.created_at.desc())
+            .limit(settings.recommendation_cache_fuzzy_candidates)
+        )
+        candidates = [text for text in result.scalars().all() if text != normalized_query]
+        return find_similar_query(
+            normalized_query,
+            candidates,
+            settings.recommendation_cache_similarity_threshold,
+        )
+
+    async def _lookup_cache_for_query(
+        self,
+        user_id: UUID,
+        query: str,
+        query_type: str,
+        normalized_query: str,
+        wine_collection_hash: str,
+        user_language: str | None,
+    ) -> RecommendationCache | None:
+        """Exact canonical lookup, falling back to fuzzy matching."""
+        cache_key = self._build_cache_key(
+            user_id, query_type, normalized_query, wine_collection_hash, user_language
+        )
+        cached = await self._lookup_cache(cache_key)
+        if cached:
+            if normalized_query == legacy_normalize(query):
+                cache_stats.legacy_hits += 1
+            else:
+                cache_stats.canonical_hits += 1
+            return cached
+
+        similar_query = await self._find_similar_cached_query(
+            user_id, query_type, normalized_query, wine_collection_hash
+        )
+        if similar_query:
+            cached = await self._lookup_cache(
+                self._build_cache_key(
+                    user_id, query_type, similar_query, wine_collection_hash, user_language
+                )
+            )
+            if cached:
+                logger.debug(
+                    "Recommendation cache fuzzy hit: %r -> %r", normalized_query, similar_query
+                )
+                cache_stats.fuzzy_hits += 1
+                return cached
+
+        cache_stats.misses += 1
+        return None
+
     async def _store_cache(
         self,
         cache_key: str,
@@ -104,6 +310,7 @@ class RecommendationService:
         query_type: str,
         query_text: str,
         wine_collection_hash: str,
+        wine_types_filter: list[str] | None,
         ai_result: dict,
         ai_model: str,
     ) -> None:
@@ -114,6 +321,7 @@ class RecommendationService:
             query_type=query_type,
             query_text=query_text,
             wine_collection_hash=wine_collection_hash,
+            wine_types_filter=self._build_filter_key(wine_types_filter),
             ai_result=ai_result,
             ai_model=ai_model,
         )
@@ -121,6 +329,9 @@ class RecommendationService:
 
     async def _bump_cache_hit(self, cache_entry: RecommendationCache) -> None:
         """Increment hit count and update last_hit_at."""
+        if settings.recommendation_history_write_behind:
+            history_writer.record_cache_hit(cache_entry.id)
+            return
         await self.db.execute(
             update(RecommendationCache)
             .where(RecommendationCache.id == cache_entry.id)
@@ -130,37 +341,221 @@ class RecommendationService:
             )
         )
 
-    async def get_recommendations(
+    async def _load_available_wines(
         self,
         user_id: UUID,
-        query: str,
-        query_type: str = "food",
-        preferences: RecommendationPreferences | None = None,
-        user_language: str | None = None,
-    ) -> RecommendationResponse:
-        """Get wine pairing recommendations based on user query."""
-        # Get user's available wines
+        wine_types_filter: list[str] | None = None,
+    ) -> list[CandidateWine]:
+        """Load the user's owned, in-stock wines (optionally filtered by type)."""
         wine_query = (
-            select(UserWine)
-            .options(selectinload(UserWine.wine), selectinload(UserWine.tags))
+            select(*_CANDIDATE_COLUMNS)
+            .join(Wine, UserWine.wine_id == Wine.id)
             .where(
                 UserWine.user_id == user_id,
-                UserWine.deleted_at.is_(None),
-                UserWine.status == "owned",
+                owned_condition(),
                 UserWine.quantity > 0,
             )
+            # Stable order keeps the prompt's collection prefix byte-identical (prompt caching)
+            .order_by(UserWine.created_at, UserWine.id)
         )
 
         # Apply wine type filter if specified
-        wine_types_filter = None
-        if preferences and preferences.wine_types:
-            wine_types_filter = preferences.wine_types
-            wine_query = wine_query.join(Wine).where(
-                Wine.type.in_(preferences.wine_types)
-            )
+        if wine_types_filter:
+            wine_query = wine_query.where(Wine.type.in_(wine_types_filter))
 
         result = await self.db.execute(wine_query)
-        user_wines = result.scalars().all()
+        return [CandidateWine(*row) for row in result.all()]
+
+    async def _load_user_wines(
+        self,
+        user_id: UUID,
+        user_wine_ids: list[str],
+    ) -> dict[str, UserWine]:
+        """Hydrate full ``UserWine`` rows (wine, tags) for the final picks only."""
+        if not user_wine_ids:
+            return {}
+        result = await self.db.execute(
+            select(UserWine)
+            .options(joinedload(UserWine.wine), selectinload(UserWine.tags))
+            .where(
+                UserWine.user_id == user_id,
+                UserWine.id.in_([UUID(user_wine_id) for user_wine_id in user_wine_ids]),
+            )
+        )
+        return {str(uw.id): uw for uw in result.scalars().all()}
+
+    @staticmethod
+    def _select_picks(
+        recs: list[dict],
+        candidate_map: dict[str, CandidateWine],
+        limit: int,
+    ) -> list[dict]:
+        """Keep up to ``limit`` AI picks that refer to a candidate wine."""
+        picks = []
+        for rec in recs:
+            if len(picks) >= limit:
+                break
+            user_wine_id = rec.get("wine_id")
+            if not user_wine_id:
+                logger.debug("AI recommendation missing wine_id: %s", rec)
+                continue
+            if str(user_wine_id) not in candidate_map:
+                logger.debug(
+                    "AI recommended wine_id=%s not found in user collection", user_wine_id
+                )
+                continue
+            picks.append(rec)
+        return picks
+
+    @staticmethod
+    def _build_wines_data(user_wines: list[CandidateWine]) -> list[dict]:
+        """Prepare the collection snapshot sent to the AI provider."""
+        return [
+            {
+                "id": str(uw.id),
+                "name": uw.name,
+                "vintage": uw.vintage,
+                "type": uw.type,
+                "country": uw.country,
+                "region": uw.region,
+                "grape_variety": uw.grape_variety,
+                "body": uw.body,
+                "tannin": uw.tannin,
+                "acidity": uw.acidity,
+                "sweetness": uw.sweetness,
+                "food_pairing": uw.food_pairing,
+                "flavor_notes": uw.flavor_notes,
+                "drinking_window_start": uw.drinking_window_start,
+                "drinking_window_end": uw.drinking_window_end,
+                "quantity": uw.quantity,
+            }
+            for uw in user_wines
+        ]
+
+    async def _generate_and_cache(
+        self,
+        user_id: UUID,
+        query: str,
+        query_type: str,
+        normalized_query: str,
+        wine_collection_hash: str,
+        cache_key: str,
+        user_wines: list[CandidateWine],
+        user_language: str | None,
+        preferences: RecommendationPreferences | None = None,
+        wine_types_filter: list[str] | None = None,
+    ) -> dict:
+        """Call the AI provider for a cache miss and store the result.
+
+        Offline-engine fallbacks (provider missing, failing or timing out)
+        are not cached, so the next request retries the AI.
+        """
+        wines_data = self._build_wines_data(user_wines)
+
+        # Get AI recommendations
+        ai_result = await self.ai_service.get_pairing_recommendations(
+            query,
+            wines_data,
+            user_language=user_language,
+            max_results=preferences.max_results if preferences else 5,
+            prioritize_expiring=preferences.prioritize_expiring if preferences else True,
+        )
+
+        ai_recs = ai_result.get("recommendations", [])
+        if not ai_recs:
+            logger.debug(
+                "AI returned no recommendations. query=%r, wines_count=%d, ai_result=%s",
+                query,
+                len(wines_data),
+                json.dumps(ai_result, ensure_ascii=False, default=str),
+            )
+        else:
+            logger.debug(
+                "AI returned %d recommendations. query=%r, ai_result=%s",
+                len(ai_recs),
+                query,
+                json.dumps(ai_result, ensure_ascii=False, default=str),
+            )
+
+        if self._is_offline_result(ai_result):
+            return ai_result
+
+        # Store in cache
+        await self._store_cache(
+            cache_key=cache_key,
+            user_id=user_id,
+            query_type=query_type,
+            query_text=normalized_query,
+            wine_collection_hash=wine_collection_hash,
+            wine_types_filter=wine_types_filter,
+            ai_result=ai_result,
+            ai_model=self._ai_model_label(ai_result),
+        )
+        return ai_result
+
+    @staticmethod
+    def _is_offline_result(ai_result: dict) -> bool:
+        return ai_result.get("engine") == ENGINE_NAME
+
+    def _ai_model_label(self, ai_result: dict) -> str:
+        """Model identifier recorded with cache entries and history."""
+        if self._is_offline_result(ai_result):
+            return ENGINE_MODEL
+        model_info = self.ai_service.get_recommendation_model_info()
+        return f"{model_info['provider']}/{model_info['model']}"
+
+    async def warm_cache(
+        self,
+        user_id: UUID,
+        query: str,
+        query_type: str = "food",
+        user_language: str | None = None,
+    ) -> bool:
+        """Make sure an unfiltered cache entry exists for ``query``.
+
+        Used by background cache warming: no history record is written and
+        hit statistics are left untouched. Returns True if the AI was called.
+        """
+        user_wines = await self._load_available_wines(user_id)
+        if not user_wines:
+            return False
+
+        normalized_query = self._normalize_query(query)
+        wine_collection_hash = self._build_wine_collection_hash(user_wines)
+        cache_key = self._build_cache_key(user_id, query_type, normalized_query, wine_collection_hash, user_language)
+        if await self._lookup_cache(cache_key):
+            return False
+
+        await self._generate_and_cache(
+            user_id=user_id,
+            query=query,
+            query_type=query_type,
+            normalized_query=normalized_query,
+            wine_collection_hash=wine_collection_hash,
+            cache_key=cache_key,
+            user_wines=user_wines,
+            user_language=user_language,
+        )
+        await self.db.commit()
+        return True
+
+    async def get_recommendations(
+        self,
+        user_id: UUID,
+        query: str,
+        query_type: str = "food",
+        preferences: RecommendationPreferences | None = None,
+        user_language: str | None = None,
+        mode: str = "ai",
+    ) -> RecommendationResponse:
+        """Get wine pairing recommendations based on user query.
+
+        ``mode="fast"`` skips the cache and the AI provider and ranks the
+        collection with the offline pairing engine.
+        """
+        # Get user's available wines
+        wine_types_filter = preferences.wine_types if preferences and preferences.wine_types else None
+        user_wines = await self._load_available_wines(user_id, wine_types_filter)
 
         if not user_wines:
             recommendation_id = uuid.uuid4()
@@ -173,203 +568,607 @@ class RecommendationService:
                 created_at=datetime.utcnow(),
             )
 
+        if mode == "fast":
+            ai_result = self.ai_service.get_offline_recommendations(
+                query,
+                self._build_wines_data(user_wines),
+                user_language=user_language,
+                max_results=preferences.max_results if preferences else 5,
+                prioritize_expiring=preferences.prioritize_expiring if preferences else True,
+            )
+            return await self._build_response(
+                user_id, query, query_type, ai_result, user_wines, preferences, is_cached=False
+            )
+
         # Build cache key
         normalized_query = self._normalize_query(query)
         wine_collection_hash = self._build_wine_collection_hash(user_wines, wine_types_filter)
         cache_key = self._build_cache_key(user_id, query_type, normalized_query, wine_collection_hash, user_language)
 
-        # Check cache
-        cached = await self._lookup_cache(cache_key)
+        # Check cache (canonical key first, then near-duplicate queries)
+        cached = await self._lookup_cache_for_query(
+            user_id, query, query_type, normalized_query, wine_collection_hash, user_language
+        )
         if cached:
             ai_result = cached.ai_result
             await self._bump_cache_hit(cached)
             is_cached = True
         else:
-            # Prepare wine data for AI
-            wines_data = []
-            for uw in user_wines:
-                wine = uw.wine
-                wines_data.append({
-                    "id": str(uw.id),
-                    "name": wine.name,
-                    "vintage": wine.vintage,
-                    "type": wine.type,
-                    "country": wine.country,
-                    "region": wine.region,
-                    "grape_variety": wine.grape_variety,
-                    "body": wine.body,
-                    "tannin": wine.tannin,
-                    "acidity": wine.acidity,
-                    "sweetness": wine.sweetness,
-                    "food_pairing": wine.food_pairing,
-                    "flavor_notes": wine.flavor_notes,
-                    "drinking_window_end": wine.drinking_window_end,
-                    "quantity": uw.quantity,
-                })
-
-            # Get AI recommendations
-            ai_result = await self.ai_service.get_pairing_recommendations(query, wines_data, user_language=user_language)
+            ai_result = await self._generate_and_cache(
+                user_id=user_id,
+                query=query,
+                query_type=query_type,
+                normalized_query=normalized_query,
+                wine_collection_hash=wine_collection_hash,
+                cache_key=cache_key,
+                user_wines=user_wines,
+                user_language=user_language,
+                preferences=preferences,
+                wine_types_filter=wine_types_filter,
+            )
             is_cached = False
 
-            ai_recs = ai_result.get("recommendations", [])
-            if not ai_recs:
-                logger.debug(
-                    "AI returned no recommendations. query=%r, wines_count=%d, ai_result=%s",
-                    query,
-                    len(wines_data),
-                    json.dumps(ai_result, ensure_ascii=False, default=str),
-                )
-            else:
-                logger.debug(
-                    "AI returned %d recommendations. query=%r, ai_result=%s",
-                    len(ai_recs),
-                    query,
-                    json.dumps(ai_result, ensure_ascii=False, default=str),
-                )
+        return await self._build_response(
+            user_id, query, query_type, ai_result, user_wines, preferences, is_cached
+        )
+
+    def _build_item(
+        self,
+        rec: dict,
+        user_wine_map: dict[str, UserWine],
+    ) -> RecommendationItem | None:
+        """Join one AI pick with the user's collection; None if it does not match."""
+        user_wine_id = rec.get("wine_id")
+        if not user_wine_id:
+            logger.debug("AI recommendation missing wine_id: %s", rec)
+            return None
+
+        user_wine = user_wine_map.get(str(user_wine_id))
+        if not user_wine:
+            logger.debug(
+                "AI recommended wine_id=%s not found in user collection", user_wine_id
+            )
+            return None
+
+        # Build light wine response
+        wine_response = {
+            "id": user_wine.id,
+            "quantity": user_wine.quantity,
+            "status": user_wine.status,
+            "purchase_date": user_wine.purchase_date,
+            "purchase_price": user_wine.purchase_price,
+            "created_at": user_wine.created_at,
+            "wine": user_wine.wine,
+            "tags": user_wine.tags,
+            "drinking_status": self._get_drinking_urgency(user_wine.wine),
+        }
+
+        return RecommendationItem(
+            rank=rec["rank"],
+            match_score=normalize_match_score(rec.get("match_score")),
+            user_wine=wine_response,
+            reason=rec["reason"],
+            pairing_tips=rec.get("pairing_tips"),
+            drinking_urgency=rec.get("drinking_urgency", "can_wait"),
+        )
+
+    async def _record_history(
+        self,
+        recommendation_id: UUID,
+        user_id: UUID,
+        query: str,
+        query_type: str,
+        ai_result: dict,
+        items: list[RecommendationItem],
+    ) -> None:
+        """Save a recommendation to the user's history.
+
+        The list summary (top wine, score, item count) is taken from the
+        delivered ``items`` so history pages never have to read ``result``.
+
+        With write-behind enabled the row is queued for ``history_writer``
+        and only pending session changes (new cache entries) are committed
+        here, so cache hits respond without any write.
+        """
+        top = items[0] if items else None
+        values = {
+            "id": recommendation_id,
+            "user_id": user_id,
+            "query_type": query_type,
+            "query_text": query,
+            "result": ai_result,
+            "recommended_wine_ids": list(dict.fromkeys(item.user_wine.id for item in items)),
+            "top_wine_name": top.user_wine.wine.name if top else None,
+            "top_match_score": top.match_score if top else None,
+            "item_count": len(items),
+            "ai_model": self._ai_model_label(ai_result),
+            # Part of the primary key on the partitioned table
+            "created_at": datetime.now(UTC),
+        }
+        if settings.recommendation_history_write_behind:
+            await history_writer.add(values)
+            if self.db.new or self.db.dirty:
+                await self.db.commit()
+            return
+
+        self.db.add(Recommendation(**values))
+        await self.db.commit()
+
+    async def _build_response(
+        self,
+        user_id: UUID,
+        query: str,
+        query_type: str,
+        ai_result: dict,
+        user_wines: list[CandidateWine],
+        preferences: RecommendationPreferences | None,
+        is_cached: bool,
+    ) -> RecommendationResponse:
+        """Join AI picks with the collection, record history and build the response."""
+        picks = self._select_picks(
+            ai_result.get("recommendations", []),
+            {str(uw.id): uw for uw in user_wines},
+            preferences.max_results if preferences else 5,
+        )
+        user_wine_map = await self._load_user_wines(user_id, [str(rec["wine_id"]) for rec in picks])
+        recommendations = []
+
+        for rec in picks:
+            item = self._build_item(rec, user_wine_map)
+            if item is None:
+                continue
+            recommendations.append(item)
+
+        recommendation_id = uuid.uuid4()
+        await self._record_history(
+            recommendation_id, user_id, query, query_type, ai_result, recommendations
+        )
+
+        return RecommendationResponse(
+            recommendation_id=recommendation_id,
+            query=query,
+            recommendations=recommendations,
+            general_advice=ai_result.get("general_advice"),
+            no_match_alternatives=None,
+            cached=is_cached,
+            created_at=datetime.utcnow(),
+        )
+
+    async def stream_recommendations(
+        self,
+        user_id: UUID,
+        query: str,
+        query_type: str = "food",
+        preferences: RecommendationPreferences | None = None,
+        user_language: str | None = None,
+        mode: str = "ai",
+    ) -> AsyncIterator[dict]:
+        """Stream recommendations as events for ``POST /recommendations/stream``.
+
+        Events, in order:
+        - ``{"event": "meta", "data": {recommendation_id, query, cached}}``
+        - ``{"event": "recommendation", "data": RecommendationItem}`` per pick
+        - ``{"event": "general_advice", "data": {general_advice, no_match_alternatives}}``
+        - ``{"event": "done", "data": {recommendation_id, created_at}}``
+
+        Cached and ``mode="fast"`` results are emitted in one burst; AI results
+        are emitted item by item while the provider is still generating.
+        Cache storage and history are written after the last item.
+        """
+        max_results = preferences.max_results if preferences else 5
+        prioritize_expiring = preferences.prioritize_expiring if preferences else True
+        recommendation_id = uuid.uuid4()
+
+        wine_types_filter = preferences.wine_types if preferences and preferences.wine_types else None
+        user_wines = await self._load_available_wines(user_id, wine_types_filter)
+
+        if not user_wines:
+            yield {
+                "event": "meta",
+                "data": {"recommendation_id": recommendation_id, "query": query, "cached": False},
+            }
+            yield {
+                "event": "general_advice",
+                "data": {
+                    "general_advice": "셀러에 와인이 없습니다. 먼저 와인을 등록해주세요.",
+                    "no_match_alternatives": "와인을 스캔하여 컬렉션에 추가해보세요.",
+                },
+            }
+            yield {
+                "event": "done",
+                "data": {"recommendation_id": recommendation_id, "created_at": datetime.utcnow()},
+            }
+            return
+
+        candidate_map = {str(uw.id): uw for uw in user_wines}
+        user_wine_map: dict[str, UserWine] = {}
+        wines_data = self._build_wines_data(user_wines)
+        cached = None
+        normalized_query = wine_collection_hash = cache_key = None
+
+        if mode != "fast":
+            normalized_query = self._normalize_query(query)
+            wine_collection_hash = self._build_wine_collection_hash(user_wines, wine_types_filter)
+            cache_key = self._build_cache_key(
+                user_id, query_type, normalized_query, wine_collection_hash, user_language
+            )
+            cached = await self._lookup_cache_for_query(
+                user_id, query, query_type, normalized_query, wine_collection_hash, user_language
+            )
+
+        yield {
+            "event": "meta",
+            "data": {"recommendation_id": recommendation_id, "query": query, "cached": cached is not None},
+        }
+
+        complete_result = None
+        if cached:
+            await self._bump_cache_hit(cached)
+            complete_result = cached.ai_result
+        elif mode == "fast":
+            complete_result = self.ai_service.get_offline_recommendations(
+                query, wines_data, user_language, max_results, prioritize_expiring
+            )
+
+        if complete_result is not None:
+            # All picks are known upfront: hydrate them in one query
+            picks = self._select_picks(
+                complete_result.get("recommendations", []), candidate_map, max_results
+            )
+            user_wine_map = await self._load_user_wines(user_id, [str(rec["wine_id"]) for rec in picks])
+            events = self._replay_result(complete_result)
+        else:
+            events = self.ai_service.stream_pairing_recommendations(
+                query,
+                wines_data,
+                user_language=user_language,
+                max_results=max_results,
+                prioritize_expiring=prioritize_expiring,
+            )
+
+        ai_result: dict = {}
+        items: list[RecommendationItem] = []
+        async for kind, payload in events:
+            if kind == "result":
+                ai_result = payload
+                continue
+            if len(items) >= max_results:
+                continue
+            if not self._select_picks([payload], candidate_map, 1):
+                continue
+            user_wine_id = str(payload["wine_id"])
+            if user_wine_id not in user_wine_map:
+                user_wine_map.update(await self._load_user_wines(user_id, [user_wine_id]))
+            item = self._build_item(payload, user_wine_map)
+            if item is None or any(item.user_wine.id == seen.user_wine.id for seen in items):
+                continue
+            items.append(item)
+            yield {"event": "recommendation", "data": item.model_dump(mode="json")}
 
-            # Store in cache
-            model_info = self.ai_service.get_recommendation_model_info()
-            ai_model_str = f"{model_info['provider']}/{model_info['model']}"
+        yield {
+            "event": "general_advice",
+            "data": {
+                "general_advice": ai_result.get("general_advice"),
+                "no_match_alternatives": None,
+            },
+        }
+
+        if (
+            not cached
+            and mode != "fast"
+            and not self._is_offline_result(ai_result)
+            and not ai_result.get("incomplete")
+        ):
             await self._store_cache(
                 cache_key=cache_key,
                 user_id=user_id,
                 query_type=query_type,
                 query_text=normalized_query,
                 wine_collection_hash=wine_collection_hash,
+                wine_types_filter=wine_types_filter,
                 ai_result=ai_result,
-                ai_model=ai_model_str,
+                ai_model=self._ai_model_label(ai_result),
             )
+        await self._record_history(
+            recommendation_id, user_id, query, query_type, ai_result, items
+        )
 
-        # Build recommendation items
-        recommendations = []
-        recommended_wine_ids = []
+        yield {
+            "event": "done",
+            "data": {"recommendation_id": recommendation_id, "created_at": datetime.utcnow()},
+        }
 
-        for rec in ai_result.get("recommendations", [])[:preferences.max_results if preferences else 5]:
-            user_wine_id = rec.get("wine_id")
-            if not user_wine_id:
-                logger.debug("AI recommendation missing wine_id: %s", rec)
-                continue
+    @staticmethod
+    async def _replay_result(ai_result: dict) -> AsyncIterator[tuple[str, dict]]:
+        """Replay a complete result in the ``stream_pairing_recommendations`` event shape."""
+        for rec in ai_result.get("recommendations", []):
+            yield "recommendation", rec
+        yield "result", ai_result
+
+    async def get_menu_recommendations(
+        self,
+        user_id: UUID,
+        courses: list[MenuCourse],
+        preferences: RecommendationPreferences | None = None,
+        user_language: str | None = None,
+        unique_bottles: bool = True,
+        mode: str = "ai",
+    ) -> MenuRecommendationResponse:
+        """Get recommendations for every course of a menu.
+
+        The collection is loaded and serialized once. Each course is looked
+        up in the cache of earlier menu courses in the same ``unique_bottles``
+        mode (see ``_menu_cache_query_type``); all remaining courses are sent to the AI in a single request and each
+        course result is cached separately. With ``unique_bottles`` a bottle
+        is only poured for as many courses as the user has bottles of it,
+        earlier courses taking precedence.
+        """
+        max_results = preferences.max_results if preferences else 5
+        prioritize_expiring = preferences.prioritize_expiring if preferences else True
+        wine_types_filter = preferences.wine_types if preferences and preferences.wine_types else None
+        user_wines = await self._load_available_wines(user_id, wine_types_filter)
 
-            # Find the user wine
-            user_wine = next(
-                (uw for uw in user_wines if str(uw.id) == user_wine_id),
-                None
+        if not user_wines:
+            return MenuRecommendationResponse(
+                recommendation_id=uuid.uuid4(),
+                courses=[
+                    MenuCourseRecommendation(
+                        course_index=index,
+                        query=course.query,
+                        query_type=course.query_type,
+                        recommendations=[],
+                    )
+                    for index, course in enumerate(courses)
+                ],
+                general_advice="셀러에 와인이 없습니다. 먼저 와인을 등록해주세요.",
+                no_match_alternatives="와인을 스캔하여 컬렉션에 추가해보세요.",
+                created_at=datetime.utcnow(),
             )
-            if not user_wine:
-                logger.debug(
-                    "AI recommended wine_id=%s not found in user collection", user_wine_id
+
+        wines_data = self._build_wines_data(user_wines)
+        course_results: list[dict | None] = [None] * len(courses)
+        cached_flags = [False] * len(courses)
+        menu_advice = None
+        is_offline = False
+
+        if mode == "fast":
+            menu_result = self.ai_service.get_offline_menu_recommendations(
+                [course.model_dump() for course in courses],
+                wines_data,
+                user_language=user_language,
+                max_results=max_results + len(courses) - 1 if unique_bottles else max_results,
+                prioritize_expiring=prioritize_expiring,
+            )
+            course_results = menu_result["courses"]
+            is_offline = True
+        else:
+            wine_collection_hash = self._build_wine_collection_hash(user_wines, wine_types_filter)
+            # cache_key -> (normalized query, course indexes); identical courses share one slot
+            misses: dict[str, tuple[str, list[int]]] = {}
+            for index, course in enumerate(courses):
+                normalized_query = self._normalize_query(course.query)
+                cache_query_type = self._menu_cache_query_type(course.query_type, unique_bottles)
+                cached = await self._lookup_cache_for_query(
+                    user_id, course.query, cache_query_type,
+                    normalized_query, wine_collection_hash, user_language,
                 )
-                continue
+                if cached:
+                    await self._bump_cache_hit(cached)
+                    course_results[index] = cached.ai_result
+                    cached_flags[index] = True
+                    continue
+                cache_key = self._build_cache_key(
+                    user_id, cache_query_type, normalized_query, wine_collection_hash, user_language
+                )
+                misses.setdefault(cache_key, (normalized_query, []))[1].append(index)
 
-            recommended_wine_ids.append(UUID(user_wine_id))
-
-            # Build light wine response
-            wine_response = {
-                "id": user_wine.id,
-                "quantity": user_wine.quantity,
-                "status": user_wine.status,
-                "purchase_date": user_wine.purchase_date,
-                "purchase_price": user_wine.purchase_price,
-                "created_at": user_wine.created_at,
-                "wine": user_wine.wine,
-                "tags": user_wine.tags,
-                "drinking_status": self._get_drinking_urgency(user_wine.wine),
-            }
+            if misses:
+                pending = [(key, normalized, indexes) for key, (normalized, indexes) in misses.items()]
+                menu_result = await self.ai_service.get_menu_pairing_recommendations(
+                    [courses[indexes[0]].model_dump() for _, _, indexes in pending],
+                    wines_data,
+                    user_language=user_language,
+                    # Extra candidates so unique-bottle filtering still fills each course
+                    max_results=min(max_results + len(courses) - 1, 10) if unique_bottles else max_results,
+                    prioritize_expiring=prioritize_expiring,
+                    unique_bottles=unique_bottles,
+                )
+                menu_advice = menu_result.get("general_advice")
+                is_offline = self._is_offline_result(menu_result)
+
+                for (cache_key, normalized_query, indexes), course_result in zip(
+                    pending, menu_result["courses"], strict=True
+                ):
+                    for index in indexes:
+                        course_results[index] = course_result
+                    if not is_offline:
+                        first = courses[indexes[0]]
+                        await self._store_cache(
+                            cache_key=cache_key,
+                            user_id=user_id,
+                            query_type=self._menu_cache_query_type(
+                                first.query_type, unique_bottles
+                            ),
+                            query_text=normalized_query,
+                            wine_collection_hash=wine_collection_hash,
+                            wine_types_filter=wine_types_filter,
+                            ai_result=course_result,
+                            ai_model=self._ai_model_label(course_result),
+                        )
 
-            recommendations.append(
-                RecommendationItem(
-                    rank=rec["rank"],
-                    match_score=Decimal(str(rec["match_score"])),
-                    user_wine=wine_response,
-                    reason=rec["reason"],
-                    pairing_tips=rec.get("pairing_tips"),
-                    drinking_urgency=rec.get("drinking_urgency", "can_wait"),
+        candidate_map = {str(uw.id): uw for uw in user_wines}
+        course_candidates = [
+            [
+                rec for rec in (course_results[index] or {}).get("recommendations", [])
+                if str(rec.get("wine_id")) in candidate_map
+            ]
+            for index in range(len(courses))
+        ]
+
+        # Reserve one bottle per course for its best available pick, in serving
+        # order; alternatives may not use bottles fully reserved by other courses.
+        top_picks: list[str | None] = [None] * len(courses)
+        if unique_bottles:
+            bottles_left = {wine_id: uw.quantity for wine_id, uw in candidate_map.items()}
+            for index, candidates in enumerate(course_candidates):
+                for rec in candidates:
+                    wine_id = str(rec["wine_id"])
+                    if bottles_left[wine_id] > 0:
+                        bottles_left[wine_id] -= 1
+                        top_picks[index] = wine_id
+                        break
+
+        course_picks: list[list[dict]] = []
+        for index, candidates in enumerate(course_candidates):
+            if unique_bottles:
+                top_pick = top_picks[index]
+                candidates = [rec for rec in candidates if str(rec["wine_id"]) == top_pick] + [
+                    rec for rec in candidates
+                    if str(rec["wine_id"]) != top_pick and bottles_left[str(rec["wine_id"])] > 0
+                ]
+            course_picks.append(candidates[:max_results])
+
+        # One hydration query for every bottle shown on the menu
+        user_wine_map = await self._load_user_wines(
+            user_id,
+            list(dict.fromkeys(str(rec["wine_id"]) for picks in course_picks for rec in picks)),
+        )
+
+        menu_courses: list[MenuCourseRecommendation] = []
+        history_courses: list[dict] = []
+        menu_items: list[RecommendationItem] = []
+
+        for index, course in enumerate(courses):
+            course_result = course_results[index] or {}
+            items: list[RecommendationItem] = []
+            picks: list[dict] = []
+            for rec in course_picks[index]:
+                item = self._build_item({**rec, "rank": len(items) + 1}, user_wine_map)
+                if item is None:
+                    continue
+                items.append(item)
+                picks.append({**rec, "rank": item.rank})
+            menu_items.extend(items)
+
+            menu_courses.append(
+                MenuCourseRecommendation(
+                    course_index=index,
+                    query=course.query,
+                    query_type=course.query_type,
+                    recommendations=items,
+                    general_advice=course_result.get("general_advice"),
+                    cached=cached_flags[index],
                 )
             )
+            history_courses.append({
+                "query": course.query,
+                "query_type": course.query_type,
+                "recommendations": picks,
+                "general_advice": course_result.get("general_advice"),
+            })
+
+        history_result = {
+            "courses": history_courses,
+            "recommendations": [pick for course in history_courses for pick in course["recommendations"]],
+            "general_advice": menu_advice,
+        }
+        if is_offline:
+            history_result["engine"] = ENGINE_NAME
 
-        # Save recommendation to history
         recommendation_id = uuid.uuid4()
-        model_info = self.ai_service.get_recommendation_model_info()
-        recommendation_record = Recommendation(
-            id=recommendation_id,
-            user_id=user_id,
-            query_type=query_type,
-            query_text=query,
-            result=ai_result,
-            recommended_wine_ids=recommended_wine_ids,
-            ai_model=f"{model_info['provider']}/{model_info['model']}",
+        await self._record_history(
+            recommendation_id,
+            user_id,
+            " / ".join(course.query for course in courses),
+            MENU_QUERY_TYPE,
+            history_result,
+            menu_items,
         )
-        self.db.add(recommendation_record)
-        await self.db.commit()
 
-        return RecommendationResponse(
+        return MenuRecommendationResponse(
             recommendation_id=recommendation_id,
-            query=query,
-            recommendations=recommendations,
-            general_advice=ai_result.get("general_advice"),
-            no_match_alternatives=None,
-            cached=is_cached,
+            courses=menu_courses,
+            general_advice=menu_advice,
             created_at=datetime.utcnow(),
         )
 
+    @staticmethod
+    def get_cache_stats() -> dict:
+        """Return process-wide recommendation cache hit statistics."""
+        return cache_stats.as_dict()
+
     async def get_history(
         self,
         user_id: UUID,
-        page: int = 1,
         size: int = 20,
+        cursor: tuple[datetime, UUID] | None = None,
+        page: int = 1,
     ) -> PaginatedResponse:
-        """Get user's recommendation history."""
-        # Count total
-        count_result = await self.db.execute(
-            select(func.count()).where(Recommendation.user_id == user_id)
-        )
-        total = count_result.scalar() or 0
+        """Get user's recommendation history, newest first.
 
-        # Get recommendations
-        offset = (page - 1) * size
-        result = await self.db.execute(
-            select(Recommendation)
+        Keyset-paginated on ``(created_at, id)``: pass the previous page's
+        ``next_cursor`` to continue. Only the summary columns are read and
+        no total is counted, so every page costs the same. Rows older than
+        the retention window are excluded. ``page`` without
+        a cursor falls back to offset paging for older clients.
+        """
+        query = (
+            select(
+                Recommendation.id,
+                Recommendation.query_text,
+                Recommendation.query_type,
+                Recommendation.top_wine_name,
+                Recommendation.top_match_score,
+                Recommendation.item_count,
+                Recommendation.created_at,
+            )
             .where(Recommendation.user_id == user_id)
-            .order_by(Recommendation.created_at.desc())
-            .offset(offset)
-            .limit(size)
+            .order_by(Recommendation.created_at.desc(), Recommendation.id.desc())
+            .limit(size + 1)
         )
-        recommendations = result.scalars().all()
-
-        # Build response
-        items = []
-        for rec in recommendations:
-            top_rec = None
-            if rec.result and rec.result.get("recommendations"):
-                first = rec.result["recommendations"][0]
-                top_rec = {
-                    "wine_name": first.get("wine_name", "Unknown"),
-                    "match_score": first.get("match_score", 0),
-                }
-
-            items.append(
-                RecommendationHistoryItem(
-                    id=rec.id,
-                    query=rec.query_text,
-                    query_type=rec.query_type,
-                    top_recommendation=top_rec,
-                    total_recommendations=len(rec.result.get("recommendations", [])) if rec.result else 0,
-                    created_at=rec.created_at,
-                )
+        cutoff = retention_cutoff()
+        if cutoff:
+            # Lower bound lets the planner skip retired partitions
+            query = query.where(Recommendation.created_at >= cutoff)
+        if cursor:
+            query = query.where(
+                tuple_(Recommendation.created_at, Recommendation.id) < tuple_(*cursor)
             )
+        elif page > 1:
+            query = query.offset((page - 1) * size)
+
+        result = await self.db.execute(query)
+        rows = result.all()
+        has_next = len(rows) > size
+        rows = rows[:size]
 
-        total_pages = (total + size - 1) // size
+        items = [
+            RecommendationHistoryItem(
+                id=row.id,
+                query=row.query_text,
+                query_type=row.query_type,
+                top_recommendation=(
+                    {"wine_name": row.top_wine_name, "match_score": row.top_match_score}
+                    if row.item_count
+                    else None
+                ),
+                total_recommendations=row.item_count,
+                created_at=row.created_at,
+            )
+            for row in rows
+        ]
 
         return PaginatedResponse(
             data=PaginatedData(
                 items=items,
                 pagination=PaginationMeta(
-                    total=total,
-                    page=page,
+                    page=page if not cursor else None,
                     size=size,
-                    total_pages=total_pages,
-                    has_next=page < total_pages,
-                    has_prev=page > 1,
+                    has_next=has_next,
+                    has_prev=cursor is not None or page > 1,
+                    next_cursor=(
+                        encode_cursor(rows[-1].created_at, rows[-1].id) if has_next else None
+                    ),
                 ),
             )
         )
@@ -8,7 +8,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.wine import Wine
-from app.models.user_wine import UserWine
+from app.models.user_wine import UserWine, owned_condition
 from app.models.scan_session import ScanSession
 from app.schemas.scan import (
     ScanResponse,
@@ -22,6 +22,7 @@ from app.schemas.scan import (
 )
 from app.services.ai_service import AIService
 from app.services.storage_service import StorageService
+from app.services.wine_identity import wine_identity_key
 
 
 class ScanService:
@@ -340,15 +341,11 @@ class ScanService:
         )
 
     async def _find_existing_wine(self, wine_info: dict) -> Wine | None:
-        """Find an existing wine matching the scanned info."""
+        """Find the wine master with the scanned producer, name and vintage."""
         if not wine_info.get("name"):
             return None
-        result = await self.db.execute(
-            select(Wine).where(
-                Wine.name.ilike(f"%{wine_info['name']}%"),
-                Wine.vintage == wine_info.get("vintage"),
-            ).limit(1)
-        )
+        key = wine_identity_key(wine_info["name"], wine_info.get("producer"), wine_info.get("vintage"))
+        result = await self.db.execute(select(Wine).where(Wine.identity_key == key))
         return result.scalars().first()
 
     async def _find_user_wine(self, user_id: UUID, wine_id: UUID) -> UserWine | None:
@@ -357,8 +354,7 @@ class ScanService:
             select(UserWine).where(
                 UserWine.user_id == user_id,
                 UserWine.wine_id == wine_id,
-                UserWine.deleted_at.is_(None),
-                UserWine.status == "owned",
+                owned_condition(),
             )
         )
         return result.scalar_one_or_none()
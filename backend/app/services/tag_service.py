@@ -7,6 +7,7 @@ from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.tag import Tag, TagType, UserWineTag
+from app.models.user import User
 from app.schemas.tag import TagCreate, TagUpdate, TagResponse, TagListResponse
 
 
@@ -16,6 +17,14 @@ class TagService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    async def _bump_collection_version(self, user_id: UUID) -> None:
+        """Invalidate per-collection caches that show tag names (wine facets)."""
+        await self.db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(collection_version=User.collection_version + 1)
+        )
+
     async def get_user_tags(
         self, user_id: UUID, tag_type: TagType | None = None
     ) -> TagListResponse:
@@ -127,8 +136,9 @@ class TagService:
             return None
 
         # Update fields
-        if data.name is not None:
+        if data.name is not None and data.name != tag.name:
             tag.name = data.name
+            await self._bump_collection_version(user_id)
         if data.color is not None:
             tag.color = data.color
 
@@ -177,6 +187,7 @@ class TagService:
 
         # Soft delete tag only (keep wine associations for historical data)
         tag.deleted_at = datetime.now(timezone.utc)
+        await self._bump_collection_version(user_id)
 
         await self.db.commit()
 
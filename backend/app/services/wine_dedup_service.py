@@ -0,0 +1,365 @@
+"""Deduplication of near-duplicate ``Wine`` masters.
+
+Masters created before wines were upserted on their identity key (see
+``app.services.wine_identity``) include near duplicates, e.g. scans of the
+same label with different casing or accents. This batch job merges them:
+
+1. Candidate pairs are found ``wine_dedup_chunk_size`` wines at a time
+   (keyset on id), blocked by vintage and type: a trigram match on
+   ``search_text`` (``ix_wines_search_text_trgm``) narrows the join, then
+   folded names must reach ``wine_dedup_name_similarity``, and so must
+   producers when both are known.
+2. Pairs are clustered with complete linkage (``cluster_pairs``); wines
+   without a producer never bridge two producers. Each cluster keeps one
+   survivor: the master most collections reference, then keyed, analysed,
+   oldest.
+3. Clusters are merged ``wine_dedup_chunk_size`` at a time, one transaction
+   each: ``user_wines.wine_id`` and ``scan_sessions.existing_wine_id`` are
+   remapped with one set-based UPDATE per table, the duplicates are
+   deleted, the survivor fills missing attributes and ``ai_analysis`` from
+   them and takes its identity key, and affected users'
+   ``collection_version`` is bumped.
+
+Dry-run (the default) only reports the clusters and what would move::
+
+    python -m app.services.wine_dedup_service
+    python -m app.services.wine_dedup_service --apply
+"""
+
+import argparse
+import asyncio
+import logging
+from dataclasses import dataclass
+from uuid import UUID
+
+from sqlalchemy import and_, column, delete, func, or_, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.config import settings
+from app.database import async_session_maker
+from app.models.scan_session import ScanSession
+from app.models.user import User
+from app.models.user_wine import UserWine
+from app.models.wine import Wine
+from app.services.wine_identity import FILLABLE_FIELDS, wine_identity_key
+
+logger = logging.getLogger(__name__)
+
+# Trigram similarity of search_text that makes a pair worth comparing
+CANDIDATE_SIMILARITY = 0.5
+
+# Taken from the most recently updated duplicate when the survivor lacks them
+MERGED_FIELDS = (*FILLABLE_FIELDS, "ai_analysis")
+
+
+def _fold(expression):
+    return func.lower(func.f_unaccent(expression))
+
+
+def _describe(wine: Wine) -> str:
+    return " ".join(str(part) for part in (wine.producer, wine.name, wine.vintage) if part)
+
+
+@dataclass(slots=True)
+class MergePlan:
+    survivor: Wine
+    duplicates: list[Wine]
+    user_wines: int  # user_wines pointing at the duplicates
+
+
+def cluster_pairs(
+    pairs: list[tuple[UUID, UUID, float]],
+    producerless: set[UUID] = frozenset(),
+) -> list[list[UUID]]:
+    """Clusters of duplicates from matched ``(wine, wine, similarity)`` pairs.
+
+    Complete linkage, best pairs first: two clusters join only when every
+    pair across them matched, so a chain A~B~C never merges A and C unless
+    they match too. Wines without a producer match any producer and must
+    not bridge two producers: they join as leaves of the one producer
+    cluster they match, stay alone when they match several, and cluster
+    among themselves when they match none.
+    """
+    matched = {frozenset((first, second)) for first, second, _ in pairs}
+    cluster_of: dict[UUID, set[UUID]] = {}
+
+    def link(candidates: list[tuple[UUID, UUID, float]]) -> None:
+        for first, second, _ in sorted(candidates, key=lambda pair: (-pair[2], pair[0], pair[1])):
+            left = cluster_of.setdefault(first, {first})
+            right = cluster_of.setdefault(second, {second})
+            if left is right:
+                continue
+            if all(frozenset((x, y)) in matched for x in left for y in right):
+                merged = left | right
+                for wine_id in merged:
+                    cluster_of[wine_id] = merged
+
+    link([pair for pair in pairs if pair[0] not in producerless and pair[1] not in producerless])
+
+    neighbours: dict[UUID, set[UUID]] = {}
+    for first, second, _ in pairs:
+        neighbours.setdefault(first, set()).add(second)
+        neighbours.setdefault(second, set()).add(first)
+    unattached = set()
+    for wine_id in sorted(producerless & neighbours.keys()):
+        targets = {
+            id(members): members
+            for members in (
+                cluster_of.setdefault(other, {other})
+                for other in neighbours[wine_id]
+                if other not in producerless
+            )
+        }
+        if len(targets) == 1:
+            (target,) = targets.values()
+            target.add(wine_id)
+            cluster_of[wine_id] = target
+        elif not targets:
+            unattached.add(wine_id)
+    link([pair for pair in pairs if pair[0] in unattached and pair[1] in unattached])
+
+    clusters = {id(members): members for members in cluster_of.values() if len(members) > 1}
+    return sorted(sorted(members) for members in clusters.values())
+
+
+class WineDedupService:
+    """Service for finding and merging duplicate wine masters."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def find_clusters(self, similarity: float, chunk_size: int) -> list[list[UUID]]:
+        """Clusters of likely duplicate wines (see module docstring, step 1-2)."""
+        await self.db.execute(
+            select(func.set_config("pg_trgm.similarity_threshold", str(CANDIDATE_SIMILARITY), True))
+        )
+        wine, other = aliased(Wine, name="wine"), aliased(Wine, name="other")
+        pairs: list[tuple[UUID, UUID, float]] = []
+        producerless: set[UUID] = set()
+        after = None
+        while True:
+            query = select(Wine.id).order_by(Wine.id).limit(chunk_size)
+            if after:
+                query = query.where(Wine.id > after)
+            chunk = (await self.db.execute(query)).scalars().all()
+            if not chunk:
+                break
+            after = chunk[-1]
+
+            name_similarity = func.similarity(_fold(wine.name), _fold(other.name))
+            result = await self.db.execute(
+                select(
+                    wine.id,
+                    other.id,
+                    name_similarity,
+                    wine.producer.is_(None),
+                    other.producer.is_(None),
+                )
+                .join(
+                    other,
+                    and_(
+                        other.search_text.op("%")(wine.search_text),
+                        other.vintage.is_not_distinct_from(wine.vintage),
+                        other.type == wine.type,
+                        # Each pair once, from the chunk holding its lower id
+                        other.id > wine.id,
+                    ),
+                )
+                .where(
+                    wine.id.in_(chunk),
+                    name_similarity >= similarity,
+                    or_(
+                        wine.producer.is_(None),
+                        other.producer.is_(None),
+                        func.similarity(_fold(wine.producer), _fold(other.producer)) >= similarity,
+                    ),
+                )
+            )
+            for wine_id, other_id, score, wine_producerless, other_producerless in result.all():
+                pairs.append((wine_id, other_id, score))
+                if wine_producerless:
+                    producerless.add(wine_id)
+                if other_producerless:
+                    producerless.add(other_id)
+        return cluster_pairs(pairs, producerless)
+
+    async def plan_merges(self, clusters: list[list[UUID]], lock: bool = False) -> list[MergePlan]:
+        """Load the clusters' wines and pick survivors; ``lock`` holds them for the merge."""
+        wine_ids = [wine_id for members in clusters for wine_id in members]
+        query = select(Wine).where(Wine.id.in_(wine_ids))
+        if lock:
+            # Blocks new user_wines on these wines until the merge commits
+            query = query.order_by(Wine.id).with_for_update()
+        wines = {wine.id: wine for wine in (await self.db.execute(query)).scalars()}
+
+        result = await self.db.execute(
+            select(UserWine.wine_id, func.count())
+            .where(UserWine.wine_id.in_(wine_ids))
+            .group_by(UserWine.wine_id)
+        )
+        references = dict(result.tuples().all())
+
+        plans = []
+        for members in clusters:
+            loaded = [wines[wine_id] for wine_id in members if wine_id in wines]
+            if len(loaded) < 2:
+                continue
+            loaded.sort(
+                key=lambda wine: (
+                    -references.get(wine.id, 0),
+                    wine.identity_key is None,
+                    wine.ai_analysis is None,
+                    wine.created_at,
+                    wine.id,
+                )
+            )
+            survivor, *duplicates = loaded
+            plans.append(
+                MergePlan(
+                    survivor=survivor,
+                    duplicates=duplicates,
+                    user_wines=sum(references.get(wine.id, 0) for wine in duplicates),
+                )
+            )
+        return plans
+
+    async def merge(self, plans: list[MergePlan]) -> int:
+        """Merge each plan's duplicates into its survivor; returns user wines remapped.
+
+        Does not commit.
+        """
+        merge_map = values(
+            column("duplicate_id", PG_UUID(as_uuid=True)),
+            column("survivor_id", PG_UUID(as_uuid=True)),
+            name="merge_map",
+        ).data([(duplicate.id, plan.survivor.id) for plan in plans for duplicate in plan.duplicates])
+
+        result = await self.db.execute(
+            update(UserWine)
+            .where(UserWine.wine_id == merge_map.c.duplicate_id)
+            .values(wine_id=merge_map.c.survivor_id)
+            .returning(UserWine.user_id)
+            .execution_options(synchronize_session=False)
+        )
+        user_ids = result.scalars().all()
+        await self.db.execute(
+            update(ScanSession)
+            .where(ScanSession.existing_wine_id == merge_map.c.duplicate_id)
+            .values(existing_wine_id=merge_map.c.survivor_id)
+            .execution_options(synchronize_session=False)
+        )
+        if user_ids:
+            # Cached facets, suggestions and recommendations follow the version
+            await self.db.execute(
+                update(User)
+                .where(User.id.in_(set(user_ids)))
+                .values(collection_version=User.collection_version + 1)
+            )
+        await self.db.execute(
+            delete(Wine)
+            .where(Wine.id.in_([duplicate.id for plan in plans for duplicate in plan.duplicates]))
+            .execution_options(synchronize_session=False)
+        )
+
+        # Duplicates' keys are free now; a survivor's key may still be held elsewhere
+        keys = {
+            plan.survivor.id: wine_identity_key(plan.survivor.name, plan.survivor.producer, plan.survivor.vintage)
+            for plan in plans
+            if plan.survivor.identity_key is None
+        }
+        taken = set()
+        if keys:
+            result = await self.db.execute(
+                select(Wine.identity_key).where(Wine.identity_key.in_(set(keys.values())))
+            )
+            taken = set(result.scalars())
+
+        for plan in plans:
+            survivor = plan.survivor
+            for duplicate in sorted(plan.duplicates, key=lambda wine: wine.updated_at, reverse=True):
+                for name in MERGED_FIELDS:
+                    if getattr(survivor, name) is None and getattr(duplicate, name) is not None:
+                        setattr(survivor, name, getattr(duplicate, name))
+            key = keys.get(survivor.id)
+            if key and key not in taken:
+                survivor.identity_key = key
+                taken.add(key)
+        await self.db.flush()
+        return len(user_ids)
+
+    async def run(
+        self,
+        apply: bool = False,
+        similarity: float | None = None,
+        chunk_size: int | None = None,
+    ) -> dict:
+        """Find duplicate clusters and, with ``apply``, merge them chunk by chunk."""
+        similarity = similarity if similarity is not None else settings.wine_dedup_name_similarity
+        chunk_size = chunk_size or settings.wine_dedup_chunk_size
+
+        clusters = await self.find_clusters(similarity, chunk_size)
+        await self.db.rollback()
+
+        stats = {"clusters": 0, "duplicates": 0, "user_wines": 0, "applied": apply, "report": []}
+        for start in range(0, len(clusters), chunk_size):
+            plans = await self.plan_merges(clusters[start:start + chunk_size], lock=apply)
+            for plan in plans:
+                stats["report"].append({
+                    "survivor": f"{_describe(plan.survivor)} ({plan.survivor.id})",
+                    "duplicates": [f"{_describe(wine)} ({wine.id})" for wine in plan.duplicates],
+                    "user_wines": plan.user_wines,
+                })
+            stats["clusters"] += len(plans)
+            stats["duplicates"] += sum(len(plan.duplicates) for plan in plans)
+            if apply and plans:
+                stats["user_wines"] += await self.merge(plans)
+                await self.db.commit()
+            else:
+                stats["user_wines"] += sum(plan.user_wines for plan in plans)
+                await self.db.rollback()
+            self.db.expunge_all()
+        return stats
+
+
+async def run_wine_dedup(apply: bool = False, **options) -> dict:
+    """Run one deduplication pass with its own database session."""
+    async with async_session_maker() as db:
+        stats = await WineDedupService(db).run(apply=apply, **options)
+    logger.info(
+        "Wine dedup (%s): clusters=%d duplicates=%d user_wines=%d",
+        "applied" if apply else "dry run",
+        stats["clusters"],
+        stats["duplicates"],
+        stats["user_wines"],
+    )
+    return stats
+
+
+if __name__ == "__main__":
+    from app.database import close_db
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--apply", action="store_true", help="merge (default: report only)")
+    parser.add_argument("--similarity", type=float, default=None)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+
+    async def _main() -> None:
+        try:
+            stats = await run_wine_dedup(
+                apply=args.apply, similarity=args.similarity, chunk_size=args.chunk_size
+            )
+        finally:
+            await close_db()
+        for cluster in stats["report"]:
+            print(f"{cluster['survivor']}  user_wines moved={cluster['user_wines']}")
+            for duplicate in cluster["duplicates"]:
+                print(f"    <- {duplicate}")
+        print(
+            f"{'merged' if args.apply else 'would merge'} {stats['duplicates']} duplicates "
+            f"into {stats['clusters']} wines, remapping {stats['user_wines']} user wines"
+        )
+
+    asyncio.run(_main())
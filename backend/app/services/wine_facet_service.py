@@ -0,0 +1,180 @@
+"""Facet counts for the wine list filter chips.
+
+``GET /wines/facets`` counts the wines matching the current list filters
+per type, country, grape and tag in one statement: the filtered list query
+becomes a ``filtered`` CTE, aggregated three ways and combined with
+``UNION ALL``:
+
+- type, country and the total via ``GROUPING SETS``
+- grapes via a lateral ``unnest`` of ``grape_variety``, grouped by the
+  folded value the ``grape`` filter matches and labelled with its most
+  common spelling
+- tags via ``user_wine_tags``, live tags only
+
+Results are cached in process per user, ``collection_version`` and filter
+set. Collection changes and tag renames or deletions bump the version, so
+stale counts and labels are not served and old entries simply age out of
+the LRU.
+"""
+
+from collections import OrderedDict
+from typing import Literal
+from uuid import UUID
+
+from sqlalchemy import String, and_, case, cast, distinct, func, literal, select, tuple_, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.tag import Tag, UserWineTag
+from app.models.user_wine import UserWine, WineStatus
+from app.models.wine import Wine, WineType
+from app.services.drinking_window import current_year
+from app.services.wine_service import WineService
+
+FACETS = ("type", "country", "grape", "tag")
+
+
+class FacetCache:
+    """Size-bounded LRU of facet results keyed by user, version and filters."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, dict] = OrderedDict()
+
+    def get(self, key: tuple) -> dict | None:
+        facets = self._entries.get(key)
+        if facets is not None:
+            self._entries.move_to_end(key)
+        return facets
+
+    def put(self, key: tuple, facets: dict) -> None:
+        self._entries[key] = facets
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+facet_cache = FacetCache(max_entries=settings.wine_facets_max_cached_entries)
+
+
+class WineFacetService:
+    """Service for wine list facet counts."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_facets(
+        self,
+        user_id: UUID,
+        collection_version: int,
+        status: WineStatus | None = None,
+        include_all_statuses: bool = False,
+        wine_type: WineType | None = None,
+        country: str | None = None,
+        grape: str | None = None,
+        food: str | None = None,
+        flavor: str | None = None,
+        tag_id: UUID | None = None,
+        tag_ids: list[UUID] | None = None,
+        tag_mode: Literal["any", "all"] = "any",
+        drinking_window: Literal["now", "aging", "urgent"] | None = None,
+        min_price: int | None = None,
+        max_price: int | None = None,
+        search: str | None = None,
+    ) -> dict:
+        """Facet counts for the wines matching the list filters (see module docstring)."""
+        filters = {
+            "status": status,
+            "include_all_statuses": include_all_statuses,
+            "wine_type": wine_type,
+            "country": country,
+            "grape": grape,
+            "food": food,
+            "flavor": flavor,
+            "tag_id": tag_id,
+            "tag_ids": tag_ids,
+            "tag_mode": tag_mode,
+            "drinking_window": drinking_window,
+            "min_price": min_price,
+            "max_price": max_price,
+            "search": search,
+        }
+        # Drinking-window filters depend on the year, so it is part of the key
+        key = (
+            user_id,
+            collection_version,
+            current_year(),
+            *(tuple(sorted(value)) if isinstance(value, list) else value for value in filters.values()),
+        )
+        facets = facet_cache.get(key)
+        if facets is None:
+            facets = await self._count_facets(user_id, filters)
+            facet_cache.put(key, facets)
+        return facets
+
+    async def _count_facets(self, user_id: UUID, filters: dict) -> dict:
+        filtered = (
+            WineService(self.db)
+            ._build_filtered_query(user_id=user_id, **filters)
+            .with_only_columns(UserWine.id, Wine.type, Wine.country, Wine.grape_variety)
+            .cte("filtered")
+        )
+
+        by_column = (
+            select(
+                case(
+                    (func.grouping(filtered.c.type) == 0, "type"),
+                    (func.grouping(filtered.c.country) == 0, "country"),
+                    else_="total",
+                ).label("facet"),
+                func.coalesce(filtered.c.type, filtered.c.country).label("value"),
+                func.coalesce(filtered.c.type, filtered.c.country).label("label"),
+                func.count().label("count"),
+            )
+            .group_by(
+                func.grouping_sets(tuple_(filtered.c.type), tuple_(filtered.c.country), tuple_())
+            )
+        )
+
+        grape = func.btrim(func.unnest(filtered.c.grape_variety).column_valued("grape"))
+        grape_key = func.lower(func.f_unaccent(grape))
+        by_grape = (
+            select(
+                literal("grape").label("facet"),
+                grape_key.label("value"),
+                func.mode().within_group(grape).label("label"),
+                # A wine listing the same grape twice still counts once
+                func.count(distinct(filtered.c.id)).label("count"),
+            )
+            .select_from(filtered)
+            .where(grape != "")
+            .group_by(grape_key)
+        )
+
+        by_tag = (
+            select(
+                literal("tag").label("facet"),
+                cast(Tag.id, String).label("value"),
+                Tag.name.label("label"),
+                func.count().label("count"),
+            )
+            .select_from(filtered)
+            .join(UserWineTag, UserWineTag.user_wine_id == filtered.c.id)
+            .join(Tag, and_(Tag.id == UserWineTag.tag_id, Tag.deleted_at.is_(None)))
+            .group_by(Tag.id, Tag.name)
+        )
+
+        result = await self.db.execute(union_all(by_column, by_grape, by_tag))
+
+        facets: dict = {"total": 0, **{facet: [] for facet in FACETS}}
+        for row in result.all():
+            if row.facet == "total":
+                facets["total"] = row.count
+            elif row.value is not None:
+                facets[row.facet].append({"value": row.value, "label": row.label, "count": row.count})
+        for facet in FACETS:
+            facets[facet].sort(key=lambda item: (-item["count"], item["label"]))
+        return facets
@@ -0,0 +1,68 @@
+"""Canonical identity of ``Wine`` masters.
+
+Wine masters are shared between users. A master is identified by its
+producer, name and vintage, folded by ``wine_identity_key`` (case, accents
+and whitespace ignored) and stored in ``wines.identity_key`` under a
+unique index. ``upsert_wines`` creates masters with
+``INSERT ... ON CONFLICT (identity_key)``, so adding a wine that already
+exists reuses its row and only fills in attributes the master lacks.
+
+Masters that duplicated an older one when the key was introduced keep a
+NULL key until the dedup job (``app.services.wine_dedup_service``) merges
+them into the keyed master.
+"""
+
+from uuid import uuid4
+
+from sqlalchemy import Row, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.wine import Wine
+from app.schemas.wine import WineBase
+from app.services.query_normalizer import fold_text
+
+# Filled in on an existing master when it lacks them, never overwritten
+FILLABLE_FIELDS = ("grape_variety", "region", "country", "appellation", "abv")
+
+
+def wine_identity_key(name: str, producer: str | None, vintage: int | None) -> str:
+    """Canonical ``producer|name|vintage`` key of a wine master."""
+    producer_key, name_key = (" ".join(fold_text(value or "").split()) for value in (producer, name))
+    return f"{producer_key}|{name_key}|{vintage or ''}"
+
+
+def wine_values(data: WineBase) -> dict:
+    """``upsert_wines`` row for a new master."""
+    return {
+        "id": uuid4(),
+        "name": data.name,
+        "producer": data.producer,
+        "vintage": data.vintage,
+        "grape_variety": data.grape_variety,
+        "region": data.region,
+        "country": data.country,
+        "appellation": data.appellation,
+        "abv": data.abv,
+        "type": data.type.value,
+        "identity_key": wine_identity_key(data.name, data.producer, data.vintage),
+    }
+
+
+async def upsert_wines(db: AsyncSession, rows: list[dict], *columns) -> dict[str, Row]:
+    """Insert masters, reusing existing ones with the same identity key.
+
+    ``rows`` (see ``wine_values``) must have distinct identity keys; one
+    multi-row statement. Returns ``{identity_key: (identity_key, id,
+    *columns)}`` for every row, whether inserted or reused.
+    """
+    statement = insert(Wine).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=[Wine.identity_key],
+        set_={
+            name: func.coalesce(getattr(Wine, name), statement.excluded[name])
+            for name in FILLABLE_FIELDS
+        },
+    ).returning(Wine.identity_key, Wine.id, *columns)
+    result = await db.execute(statement)
+    return {row.identity_key: row for row in result.all()}
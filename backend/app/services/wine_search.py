@@ -0,0 +1,48 @@
+"""Accent- and typo-tolerant wine search.
+
+Searches ``wines.search_text``, a stored generated column holding
+``name``, ``producer`` and ``region`` lower-cased and unaccented (so
+"chateau" finds "Château"), indexed with a ``pg_trgm`` GIN index. A wine
+matches when the term is a substring of it or a close enough word match
+(``<%``, ``pg_trgm.word_similarity_threshold``), which tolerates typos;
+both predicates can use the index. ``search_rank`` orders matches by
+trigram word similarity.
+
+``array_contains`` filters the folded ``*_keys`` copies of the grape,
+food pairing and flavor note arrays, which carry GIN indexes; a filter
+value matches an element exactly, ignoring case and accents.
+"""
+
+from sqlalchemy import Float, func, literal, or_
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.wine import Wine
+
+
+def _normalize(value) -> ColumnElement:
+    # Same normalization as the search_text column
+    return func.lower(func.f_unaccent(value))
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_condition(term: str) -> ColumnElement:
+    """Predicate matching wines for a search term."""
+    pattern = literal("%") + _normalize(literal(_escape_like(term))) + literal("%")
+    return or_(
+        Wine.search_text.like(pattern),
+        _normalize(literal(term)).op("<%", is_comparison=True)(Wine.search_text),
+    )
+
+
+def search_rank(term: str) -> ColumnElement:
+    """Relevance of a wine for a search term (0..1, higher is better)."""
+    return func.word_similarity(_normalize(literal(term)), Wine.search_text, type_=Float)
+
+
+def array_contains(column, value: str) -> ColumnElement:
+    """Predicate for a folded array column (e.g. ``Wine.grape_variety_keys``) holding ``value``."""
+    return column.contains(array([_normalize(literal(value.strip()))]))
@@ -1,26 +1,80 @@
 """Wine service."""
 
-from datetime import date, datetime, timezone
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, date, datetime
+from decimal import Decimal
 from typing import Literal
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from sqlalchemy import and_, func, or_, select
+from sqlalchemy import Select, and_, case, func, insert, literal, or_, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import InstrumentedAttribute, contains_eager, load_only, selectinload
+from sqlalchemy.sql.elements import ColumnElement
 
-from app.models.wine import Wine, WineType
-from app.models.user_wine import UserWine, WineStatus
-from app.models.user_wine_status_history import UserWineStatusHistory
 from app.models.tag import Tag, UserWineTag
 from app.models.user import User
+from app.models.user_wine import UserWine, WineStatus, owned_condition
+from app.models.user_wine_status_history import UserWineStatusHistory
+from app.models.wine import Wine, WineType
+from app.schemas.common import PaginatedData, PaginatedResponse, PaginationMeta
 from app.schemas.wine import (
-    UserWineCreate,
+    WINE_SUMMARY_FIELDS,
     UserWineBatchCreate,
+    UserWineCreate,
     UserWineUpdate,
-    WineStatusUpdate,
     WineQuantityUpdate,
+    WineStatusUpdate,
+)
+from app.services.cache_warming_service import cache_warmer
+from app.services.drinking_window import drinking_status, drinking_window_filter
+from app.services.wine_identity import upsert_wines, wine_values
+from app.services.wine_search import array_contains, search_condition, search_rank
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+@dataclass(frozen=True, slots=True)
+class SortKey:
+    """A sortable ``GET /wines`` column and how its cursor value round-trips."""
+
+    name: str
+    column: InstrumentedAttribute | None  # None: search relevance
+    parse: Callable[[object], object]
+    nullable: bool = True
+
+    def expression(self, search: str | None) -> ColumnElement:
+        """The ORDER BY expression; raises ``ValueError`` for relevance without a search."""
+        if self.column is not None:
+            return self.column
+        if not search:
+            raise ValueError("Relevance sort requires a search term")
+        return search_rank(search)
+
+
+# Sort columns on user_wines are covered by (user_id, column, id) indexes;
+# wines columns by their own index, joined through (wine_id, user_id).
+_SORT_KEYS = (
+    SortKey("created_at", UserWine.created_at, datetime.fromisoformat, nullable=False),
+    SortKey("updated_at", UserWine.updated_at, datetime.fromisoformat, nullable=False),
+    SortKey("purchase_date", UserWine.purchase_date, date.fromisoformat),
+    SortKey("purchase_price", UserWine.purchase_price, Decimal),
+    SortKey("quantity", UserWine.quantity, int, nullable=False),
+    SortKey("label_number", UserWine.label_number, str),
+    SortKey("name", Wine.name, str, nullable=False),
+    SortKey("vintage", Wine.vintage, int),
+    SortKey("country", Wine.country, str),
+    SortKey("drinking_window_end", Wine.drinking_window_end, int),
+    SortKey("relevance", None, float, nullable=False),
 )
-from app.schemas.common import PaginatedResponse, PaginationMeta, PaginatedData
+WINE_SORT_KEYS: dict[str, SortKey] = {key.name: key for key in _SORT_KEYS}
+# Documented aliases
+WINE_SORT_KEYS["price"] = WINE_SORT_KEYS["purchase_price"]
+WINE_SORT_KEYS["drinking_window"] = WINE_SORT_KEYS["drinking_window_end"]
+
+# Optional list fields that are not a single Wine column
+_WINE_FIELD_COLUMNS = {
+    "taste_profile": [Wine.body, Wine.tannin, Wine.acidity, Wine.sweetness],
+}
 
 
 class WineService:
@@ -29,73 +83,81 @@ class WineService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    def _get_drinking_status(self, wine: Wine) -> str | None:
-        """Calculate drinking status based on drinking window."""
-        if not wine.drinking_window_end:
-            return None
-
-        current_year = datetime.now().year
+    async def _bump_collection_version(self, user_id: UUID) -> int:
+        """Increment the user's collection version (call before committing)."""
+        result = await self.db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(collection_version=User.collection_version + 1)
+            .returning(User.collection_version)
+        )
+        return result.scalar_one()
+
+    async def _commit_collection_change(
+        self, user_id: UUID, collection_version: int | None = None
+    ) -> None:
+        """Commit a collection change and schedule recommendation cache warming.
+
+        Pass ``collection_version`` when the change already bumped it
+        (``_allocate_label_numbers``).
+        """
+        if collection_version is None:
+            collection_version = await self._bump_collection_version(user_id)
+        await self.db.commit()
+        cache_warmer.schedule(user_id, collection_version)
 
-        if wine.drinking_window_end < current_year:
-            return "urgent"
-        elif wine.drinking_window_end <= current_year + 1:
-            return "drink_soon"
-        elif wine.drinking_window_start and wine.drinking_window_start <= current_year:
-            return "optimal"
-        else:
-            return "aging"
+    @staticmethod
+    def _get_drinking_status(wine: Wine) -> str | None:
+        """Calculate drinking status based on drinking window."""
+        return drinking_status(wine.drinking_window_start, wine.drinking_window_end)
 
-    async def get_user_wines(
+    def _build_filtered_query(
         self,
         user_id: UUID,
-        page: int = 1,
-        size: int = 20,
         status: WineStatus | None = None,
         include_all_statuses: bool = False,
         wine_type: WineType | None = None,
         country: str | None = None,
         grape: str | None = None,
+        food: str | None = None,
+        flavor: str | None = None,
         tag_id: UUID | None = None,
         tag_ids: list[UUID] | None = None,
+        tag_mode: Literal["any", "all"] = "any",
         drinking_window: Literal["now", "aging", "urgent"] | None = None,
         min_price: int | None = None,
         max_price: int | None = None,
-        sort: str = "created_at",
-        order: Literal["asc", "desc"] = "desc",
         search: str | None = None,
-    ) -> PaginatedResponse:
-        """Get user's wine collection with filters."""
-        # Base query
+    ) -> Select:
+        """Build the filtered ``UserWine``/``Wine`` query shared by list and count."""
         query = (
             select(UserWine)
-            .options(
-                selectinload(UserWine.wine),
-                selectinload(UserWine.tags),
-                selectinload(UserWine.status_histories),
-            )
-            .where(
-                UserWine.user_id == user_id,
-                UserWine.deleted_at.is_(None),
-            )
+            .join(Wine)
+            .where(UserWine.user_id == user_id)
         )
 
         # Apply filters
-        if not include_all_statuses:
-            if status:
-                query = query.where(UserWine.status == status.value)
-            else:
-                query = query.where(UserWine.status == WineStatus.OWNED.value)
+        if include_all_statuses:
+            query = query.where(UserWine.deleted_at.is_(None))
+        elif status and status != WineStatus.OWNED:
+            query = query.where(UserWine.deleted_at.is_(None), UserWine.status == status.value)
+        else:
+            query = query.where(owned_condition())
 
         if wine_type:
-            query = query.join(Wine).where(Wine.type == wine_type.value)
-        else:
-            query = query.join(Wine)
+            query = query.where(Wine.type == wine_type.value)
 
         if country:
             query = query.where(Wine.country == country)
 
         if grape:
-            query = query.where(Wine.grape_variety.contains([grape]))
+            query = query.where(array_contains(Wine.grape_variety_keys, grape))
+
+        if food:
+            query = query.where(array_contains(Wine.food_pairing_keys, food))
+
+        if flavor:
+            query = query.where(array_contains(Wine.flavor_notes_keys, flavor))
 
         combined_tag_ids = set()
         if tag_ids:
@@ -104,7 +166,10 @@ class WineService:
             combined_tag_ids.add(tag_id)
 
         if combined_tag_ids:
-            query = query.join(UserWineTag).where(UserWineTag.tag_id.in_(combined_tag_ids))
+            query = query.where(self._tag_filter(combined_tag_ids, tag_mode))
+
+        if drinking_window:
+            query = query.where(drinking_window_filter(drinking_window))
 
         if min_price:
             query = query.where(UserWine.purchase_price >= min_price)
@@ -113,38 +178,219 @@ class WineService:
             query = query.where(UserWine.purchase_price <= max_price)
 
         if search:
-            search_term = f"%{search}%"
-            query = query.where(
-                or_(
-                    Wine.name.ilike(search_term),
-                    Wine.producer.ilike(search_term),
-                    Wine.region.ilike(search_term),
+            query = query.where(search_condition(search))
+
+        return query
+
+    @staticmethod
+    def _tag_filter(tag_ids: set[UUID], mode: Literal["any", "all"]) -> ColumnElement:
+        """Semi-join on user_wine_tags: wines carrying any / all of ``tag_ids``.
+
+        EXISTS never multiplies rows, so counts and pages stay exact; each
+        probe is a lookup on the (tag_id, user_wine_id) unique index.
+        """
+
+        def has_tags(ids) -> ColumnElement:
+            return (
+                select(UserWineTag.id)
+                .where(
+                    UserWineTag.user_wine_id == UserWine.id,
+                    UserWineTag.tag_id.in_(ids),
                 )
+                .exists()
             )
 
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar() or 0
+        if mode == "all":
+            return and_(*(has_tags([tag_id]) for tag_id in tag_ids))
+        return has_tags(tag_ids)
+
+    @staticmethod
+    def _get_sort_key(sort: str) -> SortKey:
+        """Resolve a sort name; raises ``ValueError`` for unknown names."""
+        try:
+            return WINE_SORT_KEYS[sort]
+        except KeyError as exc:
+            raise ValueError(f"Unknown sort: {sort}") from exc
+
+    @staticmethod
+    def default_sort(sort: str | None, search: str | None) -> str:
+        return sort or ("relevance" if search else "created_at")
+
+    @staticmethod
+    def parse_cursor(
+        cursor: str, sort: str, order: Literal["asc", "desc"]
+    ) -> tuple[object, UUID]:
+        """Decode a ``get_user_wines`` cursor into ``(sort value, user wine id)``.
+
+        Raises ``ValueError`` if the cursor is malformed or was issued for a
+        different sort or order.
+        """
+        sort_key = WineService._get_sort_key(sort)
+        cursor_sort, cursor_order, value, user_wine_id = decode_cursor(cursor, 4)
+        if cursor_sort != sort_key.name or cursor_order != order:
+            raise ValueError("Cursor does not match sort order")
+        try:
+            if value is not None:
+                value = sort_key.parse(value)
+            return value, UUID(user_wine_id)
+        except (TypeError, ArithmeticError) as exc:
+            raise ValueError("Malformed cursor value") from exc
+
+    @staticmethod
+    def _after_cursor(
+        column: ColumnElement, nullable: bool, order: str, cursor: tuple[object, UUID]
+    ) -> ColumnElement:
+        """Keyset predicate: rows strictly after ``cursor`` in list order.
+
+        Nulls sort last in both directions, so a null cursor value only
+        continues through the remaining null rows.
+        """
+        value, user_wine_id = cursor
+        if value is None:
+            id_after = UserWine.id < user_wine_id if order == "desc" else UserWine.id > user_wine_id
+            return and_(column.is_(None), id_after)
+
+        key, bound = tuple_(column, UserWine.id), tuple_(literal(value, column.type), user_wine_id)
+        after = key < bound if order == "desc" else key > bound
+        if nullable:
+            after = or_(after, column.is_(None))
+        return after
+
+    @staticmethod
+    def _list_load_options(fields: set[str] | None) -> list:
+        """Loader options limiting the list query to card columns."""
+        user_wine_columns = [
+            UserWine.quantity,
+            UserWine.status,
+            UserWine.purchase_date,
+            UserWine.purchase_price,
+            UserWine.label_number,
+            UserWine.created_at,
+        ]
+        wine_columns = [getattr(Wine, name) for name in WINE_SUMMARY_FIELDS]
+        # Needed for drinking_status
+        wine_columns += [Wine.drinking_window_start, Wine.drinking_window_end]
+        for name in fields or ():
+            if name in _WINE_FIELD_COLUMNS:
+                wine_columns += _WINE_FIELD_COLUMNS[name]
+            else:
+                wine_columns.append(getattr(Wine, name))
+
+        return [
+            load_only(*user_wine_columns),
+            contains_eager(UserWine.wine).load_only(*wine_columns),
+            selectinload(UserWine.tags).load_only(Tag.name, Tag.type, Tag.color),
+        ]
+
+    @staticmethod
+    def _build_wine_summary(wine: Wine, fields: set[str] | None) -> dict:
+        summary = {name: getattr(wine, name) for name in WINE_SUMMARY_FIELDS}
+        for name in fields or ():
+            if name == "taste_profile":
+                profile = {column.key: getattr(wine, column.key) for column in _WINE_FIELD_COLUMNS[name]}
+                summary[name] = profile if any(profile.values()) else None
+            else:
+                summary[name] = getattr(wine, name)
+        return summary
 
-        # Apply sorting
-        sort_column = getattr(UserWine, sort, UserWine.created_at)
-        if order == "desc":
-            query = query.order_by(sort_column.desc())
-        else:
-            query = query.order_by(sort_column.asc())
+    async def get_user_wines(
+        self,
+        user_id: UUID,
+        page: int = 1,
+        size: int = 20,
+        status: WineStatus | None = None,
+        include_all_statuses: bool = False,
+        wine_type: WineType | None = None,
+        country: str | None = None,
+        grape: str | None = None,
+        food: str | None = None,
+        flavor: str | None = None,
+        tag_id: UUID | None = None,
+        tag_ids: list[UUID] | None = None,
+        tag_mode: Literal["any", "all"] = "any",
+        drinking_window: Literal["now", "aging", "urgent"] | None = None,
+        min_price: int | None = None,
+        max_price: int | None = None,
+        sort: str | None = None,
+        order: Literal["asc", "desc"] = "desc",
+        search: str | None = None,
+        cursor: tuple[object, UUID] | None = None,
+        include_total: bool | None = None,
+        fields: set[str] | None = None,
+    ) -> PaginatedResponse:
+        """Get user's wine collection with filters.
+
+        Items are a card projection: only the columns the list view shows
+        are loaded (no status histories), plus any optional wine ``fields``
+        (see ``WINE_SUMMARY_OPTIONAL_FIELDS``) the caller asks for.
+
+        Keyset-paginated on ``(sort column, id)``: pass the previous page's
+        ``next_cursor`` (decoded with ``parse_cursor``) to continue, so deep
+        pages cost the same as the first. ``page`` without a cursor falls
+        back to offset paging. The exact total is only counted when
+        ``include_total`` is set (default: offset paging only).
+
+        ``sort`` defaults to ``relevance`` with a ``search`` term and to
+        ``created_at`` otherwise.
+        """
+        query = self._build_filtered_query(
+            user_id=user_id,
+            status=status,
+            include_all_statuses=include_all_statuses,
+            wine_type=wine_type,
+            country=country,
+            grape=grape,
+            food=food,
+            flavor=flavor,
+            tag_id=tag_id,
+            tag_ids=tag_ids,
+            tag_mode=tag_mode,
+            drinking_window=drinking_window,
+            min_price=min_price,
+            max_price=max_price,
+            search=search,
+        )
 
-        # Apply pagination
-        offset = (page - 1) * size
-        query = query.offset(offset).limit(size)
+        if include_total is None:
+            include_total = cursor is None
+        total = None
+        if include_total:
+            count_query = select(func.count()).select_from(
+                query.with_only_columns(UserWine.id).subquery()
+            )
+            total = (await self.db.execute(count_query)).scalar() or 0
+
+        # Apply sorting; id breaks ties so every row has a stable position
+        sort_key = self._get_sort_key(self.default_sort(sort, search))
+        column = sort_key.expression(search)
+        ordered = column.desc() if order == "desc" else column.asc()
+        if sort_key.nullable:
+            # Not-null columns keep the plain order so (user_id, column) indexes apply
+            ordered = ordered.nulls_last()
+        tiebreak = UserWine.id.desc() if order == "desc" else UserWine.id.asc()
+        query = query.order_by(ordered, tiebreak)
+
+        # Apply pagination (one extra row tells whether there is a next page)
+        if cursor:
+            query = query.where(self._after_cursor(column, sort_key.nullable, order, cursor))
+        elif page > 1:
+            query = query.offset((page - 1) * size)
+        query = (
+            query.add_columns(column.label("sort_value"))
+            .limit(size + 1)
+            .options(*self._list_load_options(fields))
+        )
 
         # Execute query
         result = await self.db.execute(query)
-        user_wines = result.scalars().all()
+        rows = result.all()
+        has_next = len(rows) > size
+        rows = rows[:size]
 
         # Build response
         items = []
-        for uw in user_wines:
+        for row in rows:
+            uw = row[0]
             item = {
                 "id": uw.id,
                 "quantity": uw.quantity,
@@ -153,24 +399,28 @@ class WineService:
                 "purchase_price": uw.purchase_price,
                 "label_number": uw.label_number,
                 "created_at": uw.created_at,
-                "wine": uw.wine,
+                "wine": self._build_wine_summary(uw.wine, fields),
                 "tags": uw.tags,
                 "drinking_status": self._get_drinking_status(uw.wine),
             }
             items.append(item)
 
-        total_pages = (total + size - 1) // size
+        next_cursor = None
+        if has_next:
+            last = rows[-1]
+            next_cursor = encode_cursor(sort_key.name, order, last.sort_value, last[0].id)
 
         return PaginatedResponse(
             data=PaginatedData(
                 items=items,
                 pagination=PaginationMeta(
                     total=total,
-                    page=page,
+                    page=page if not cursor else None,
                     size=size,
-                    total_pages=total_pages,
-                    has_next=page < total_pages,
-                    has_prev=page > 1,
+                    total_pages=(total + size - 1) // size if total is not None else None,
+                    has_next=has_next,
+                    has_prev=cursor is not None or page > 1,
+                    next_cursor=next_cursor,
                 ),
             )
         )
@@ -214,32 +464,31 @@ class WineService:
             "drinking_status": self._get_drinking_status(user_wine.wine),
         }
 
-    async def _generate_label_number(self, user_id: UUID) -> str:
-        """Generate label number in YY-N format (year suffix + user sequence)."""
-        # Get user to increment sequence
+    async def _allocate_label_numbers(self, user_id: UUID, count: int) -> tuple[list[str], int]:
+        """Allocate ``count`` consecutive ``YY-N`` labels and bump the collection version.
+
+        One ``UPDATE ... RETURNING`` on the user row: its row lock serializes
+        concurrent adds, so blocks never overlap, and the sequence restarts
+        at 1 in a new year. ``ux_user_wines_user_label_number`` backs this
+        up in the database.
+        """
+        year = datetime.now().year
         result = await self.db.execute(
-            select(User).where(User.id == user_id)
+            update(User)
+            .where(User.id == user_id)
+            .values(
+                next_label_sequence=case(
+                    (User.label_sequence_year == year, User.next_label_sequence),
+                    else_=1,
+                ) + count,
+                label_sequence_year=year,
+                collection_version=User.collection_version + 1,
+            )
+            .returning(User.next_label_sequence, User.collection_version)
         )
-        user = result.scalar_one()
-
-        # Get current year
-        current_year = datetime.now().year
-
-        # Reset sequence if year changed
-        if user.label_sequence_year != current_year:
-            user.next_label_sequence = 1
-            user.label_sequence_year = current_year
-
-        # Get year suffix (last 2 digits)
-        year_suffix = current_year % 100
-
-        # Generate label number: YY-N
-        label_number = f"{year_suffix}-{user.next_label_sequence}"
-
-        # Increment user's sequence
-        user.next_label_sequence += 1
-
-        return label_number
+        next_sequence, collection_version = result.one()
+        labels = [f"{year % 100}-{sequence}" for sequence in range(next_sequence - count, next_sequence)]
+        return labels, collection_version
 
     async def create_user_wine(self, user_id: UUID, data: UserWineCreate) -> dict:
         """Create a new user wine entry."""
@@ -247,21 +496,10 @@ class WineService:
         if data.wine_id:
             wine_id = data.wine_id
         elif data.wine_overrides:
-            # Create a new Wine record from the provided data
-            wine = Wine(
-                name=data.wine_overrides.name,
-                producer=data.wine_overrides.producer,
-                vintage=data.wine_overrides.vintage,
-                grape_variety=data.wine_overrides.grape_variety,
-                region=data.wine_overrides.region,
-                country=data.wine_overrides.country,
-                appellation=data.wine_overrides.appellation,
-                abv=data.wine_overrides.abv,
-                type=data.wine_overrides.type,
-            )
-            self.db.add(wine)
-            await self.db.flush()
-            wine_id = wine.id
+            # Reuse the shared master when the same wine already exists
+            row = wine_values(data.wine_overrides)
+            wines = await upsert_wines(self.db, [row])
+            wine_id = wines[row["identity_key"]].id
         elif data.scan_id:
             # Scan-based creation requires wine data to be passed via wine_overrides
             raise ValueError("scan_id requires wine_overrides to be provided")
@@ -269,7 +507,7 @@ class WineService:
             raise ValueError("Either wine_id or wine_overrides is required")
 
         # Generate label number automatically
-        label_number = await self._generate_label_number(user_id)
+        labels, collection_version = await self._allocate_label_numbers(user_id, 1)
 
         # Create user wine
         user_wine = UserWine(
@@ -280,27 +518,159 @@ class WineService:
             purchase_price=data.purchase_price,
             purchase_place=data.purchase_place,
             personal_note=data.personal_note,
-            label_number=label_number,
+            label_number=labels[0],
         )
         self.db.add(user_wine)
         await self.db.flush()
 
         # Add tags
         if data.tag_ids:
-            for tag_id in data.tag_ids:
+            for tag_id in dict.fromkeys(data.tag_ids):
                 tag_link = UserWineTag(user_wine_id=user_wine.id, tag_id=tag_id)
                 self.db.add(tag_link)
 
-        await self.db.commit()
+        await self._commit_collection_change(user_id, collection_version)
 
         return await self.get_user_wine(user_id, user_wine.id)
 
     async def create_user_wines_batch(
         self, user_id: UUID, data: UserWineBatchCreate
     ) -> dict:
-        """Create multiple user wine entries."""
-        # TODO: Implement batch creation from scan session
-        raise NotImplementedError("Batch creation not yet implemented")
+        """Create multiple user wine entries in one transaction.
+
+        One statement per table instead of one ``create_user_wine`` per
+        bottle: referenced wines and tags are read in one query each, new
+        wines, user wines and tag links are written with multi-row INSERTs,
+        and the label block comes from one UPDATE on the user row. Items
+        whose ``wine_overrides`` name the same wine share one master
+        (``app.services.wine_identity``). The result is built from the
+        inserted values rather than refetched.
+        """
+        for item in data.wines:
+            if item.wine_id is None and item.wine_overrides is None:
+                if item.scan_id:
+                    raise ValueError("scan_id requires wine_overrides to be provided")
+                raise ValueError("Either wine_id or wine_overrides is required")
+
+        # Wines: existing by id, new ones from overrides
+        wine_ids = {item.wine_id for item in data.wines if item.wine_id}
+        wines: dict[UUID, dict] = {}
+        if wine_ids:
+            result = await self.db.execute(select(Wine).where(Wine.id.in_(wine_ids)))
+            for wine in result.scalars():
+                wines[wine.id] = {
+                    **{name: getattr(wine, name) for name in WINE_SUMMARY_FIELDS},
+                    "drinking_window_start": wine.drinking_window_start,
+                    "drinking_window_end": wine.drinking_window_end,
+                }
+            if len(wines) != len(wine_ids):
+                raise ValueError("Unknown wine_id")
+
+        # New wines by identity key: a master is upserted once per batch
+        new_wines: dict[str, dict] = {}
+        item_wine_keys: list[str | None] = []
+        for item in data.wines:
+            if item.wine_id:
+                item_wine_keys.append(None)
+                continue
+            row = wine_values(item.wine_overrides)
+            new_wines.setdefault(row["identity_key"], row)
+            item_wine_keys.append(row["identity_key"])
+        upserted = {}
+        if new_wines:
+            summary_columns = [getattr(Wine, name) for name in WINE_SUMMARY_FIELDS - {"id"}]
+            upserted = await upsert_wines(
+                self.db,
+                list(new_wines.values()),
+                *summary_columns,
+                Wine.drinking_window_start,
+                Wine.drinking_window_end,
+            )
+            for row in upserted.values():
+                wines[row.id] = {
+                    **{name: getattr(row, name) for name in WINE_SUMMARY_FIELDS},
+                    "drinking_window_start": row.drinking_window_start,
+                    "drinking_window_end": row.drinking_window_end,
+                }
+        item_wine_ids = [
+            item.wine_id or upserted[key].id
+            for item, key in zip(data.wines, item_wine_keys, strict=True)
+        ]
+
+        # Tags: the user's own, live tags only
+        item_tag_ids = [
+            list(dict.fromkeys([*(item.tag_ids or []), *(data.common_tags or [])]))
+            for item in data.wines
+        ]
+        all_tag_ids = {tag_id for tag_ids in item_tag_ids for tag_id in tag_ids}
+        tags: dict[UUID, Tag] = {}
+        if all_tag_ids:
+            result = await self.db.execute(
+                select(Tag).where(
+                    Tag.id.in_(all_tag_ids),
+                    Tag.user_id == user_id,
+                    Tag.deleted_at.is_(None),
+                )
+            )
+            tags = {tag.id: tag for tag in result.scalars()}
+            if len(tags) != len(all_tag_ids):
+                raise ValueError("Unknown tag_ids")
+
+        labels, collection_version = await self._allocate_label_numbers(user_id, len(data.wines))
+
+        now = datetime.now(UTC)
+        user_wine_rows = [
+            {
+                "id": uuid4(),
+                "user_id": user_id,
+                "wine_id": wine_id,
+                "quantity": item.quantity,
+                "status": WineStatus.OWNED.value,
+                "purchase_date": item.purchase_date or data.common_purchase_date,
+                "purchase_price": item.purchase_price,
+                "purchase_place": item.purchase_place,
+                "personal_note": item.personal_note,
+                "label_number": label_number,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for item, wine_id, label_number in zip(data.wines, item_wine_ids, labels, strict=True)
+        ]
+        await self.db.execute(insert(UserWine).values(user_wine_rows))
+
+        tag_rows = [
+            {"id": uuid4(), "user_wine_id": row["id"], "tag_id": tag_id}
+            for row, tag_ids in zip(user_wine_rows, item_tag_ids, strict=True)
+            for tag_id in tag_ids
+        ]
+        if tag_rows:
+            await self.db.execute(insert(UserWineTag).values(tag_rows))
+
+        await self._commit_collection_change(user_id, collection_version)
+
+        user_wines = []
+        for row, tag_ids in zip(user_wine_rows, item_tag_ids, strict=True):
+            wine = wines[row["wine_id"]]
+            user_wines.append({
+                "id": row["id"],
+                "quantity": row["quantity"],
+                "status": row["status"],
+                "purchase_date": row["purchase_date"],
+                "purchase_price": row["purchase_price"],
+                "label_number": row["label_number"],
+                "created_at": row["created_at"],
+                "wine": {name: wine[name] for name in WINE_SUMMARY_FIELDS},
+                "tags": [tags[tag_id] for tag_id in tag_ids],
+                "drinking_status": drinking_status(
+                    wine["drinking_window_start"], wine["drinking_window_end"]
+                ),
+            })
+
+        return {
+            "created_count": len(user_wines),
+            "total_bottles": sum(row["quantity"] for row in user_wine_rows),
+            "user_wines": user_wines,
+        }
 
     async def update_user_wine(
         self, user_id: UUID, user_wine_id: UUID, data: UserWineUpdate
@@ -332,11 +702,11 @@ class WineService:
                 )
             )
             # Add new tags
-            for tag_id in data.tag_ids:
+            for tag_id in dict.fromkeys(data.tag_ids):
                 tag_link = UserWineTag(user_wine_id=user_wine_id, tag_id=tag_id)
                 self.db.add(tag_link)
 
-        await self.db.commit()
+        await self._commit_collection_change(user_id)
 
         return await self.get_user_wine(user_id, user_wine_id)
 
@@ -362,7 +732,7 @@ class WineService:
         if new_quantity <= 0:
             user_wine.quantity = 0
             user_wine.status = data.status
-            user_wine.consumed_at = datetime.now(timezone.utc)
+            user_wine.consumed_at = datetime.now(UTC)
         else:
             user_wine.quantity = new_quantity
 
@@ -387,7 +757,7 @@ class WineService:
         )
         self.db.add(history)
 
-        await self.db.commit()
+        await self._commit_collection_change(user_id)
 
         return {
             "id": user_wine.id,
@@ -423,7 +793,7 @@ class WineService:
         else:  # set
             user_wine.quantity = data.amount
 
-        await self.db.commit()
+        await self._commit_collection_change(user_id)
 
         return {
             "id": user_wine.id,
@@ -445,8 +815,8 @@ class WineService:
         if not user_wine:
             return False
 
-        user_wine.deleted_at = datetime.now(timezone.utc)
-        await self.db.commit()
+        user_wine.deleted_at = datetime.now(UTC)
+        await self._commit_collection_change(user_id)
 
         return True
 
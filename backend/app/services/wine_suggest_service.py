@@ -0,0 +1,241 @@
+"""In-memory autocomplete for wine names, producers, regions and grapes.
+
+``GET /wines/suggest`` answers from prefix indexes kept in process memory,
+so a keystroke costs a binary search instead of a database query:
+
+- one index per user over their collection, tagged with the user's
+  ``collection_version``; any collection change bumps the version, and the
+  index is rebuilt (one query) on the next request
+- one global index over ``Wine`` master names and producers, rebuilt in
+  the background every ``wine_suggest_global_refresh_minutes``
+
+Each index is a sorted array of ``(key, entry)`` pairs where ``key`` is a
+case- and accent-folded word suffix of the text ("Château Margaux" is
+reachable from "chat" and "marg"); lookups ``bisect`` to the range of keys
+starting with the prefix and rank every match in it by weight.
+"""
+
+import asyncio
+import heapq
+import logging
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session_maker
+from app.models.user_wine import UserWine
+from app.models.wine import Wine
+from app.services.query_normalizer import fold_text
+
+logger = logging.getLogger(__name__)
+
+# Field order is also the tie-break order between equally weighted matches
+SUGGEST_FIELDS = ("name", "producer", "region", "grape")
+
+
+@dataclass(frozen=True, slots=True)
+class Suggestion:
+    text: str
+    field: str
+    weight: int  # bottles (collection) or wine rows (global) carrying the text
+
+
+class PrefixIndex:
+    """Sorted array of folded word suffixes for prefix lookups.
+
+    A prefix matches one contiguous range of keys. Short prefixes match the
+    widest ranges, so their results are memoized: the index is immutable and
+    there are few distinct short prefixes.
+    """
+
+    MEMO_PREFIX_LENGTH = 2
+
+    def __init__(self, suggestions: list[Suggestion]) -> None:
+        pairs = []
+        for suggestion in suggestions:
+            words = fold_text(suggestion.text).split()
+            for start in range(len(words)):
+                pairs.append((" ".join(words[start:]), suggestion))
+        pairs.sort(key=lambda pair: pair[0])
+        self._keys = [key for key, _ in pairs]
+        self._entries = [entry for _, entry in pairs]
+        self._memo: dict[tuple[str, int], list[Suggestion]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def search(self, prefix: str, limit: int) -> list[Suggestion]:
+        """Best ``limit`` suggestions whose text has a word starting with ``prefix``."""
+        prefix = " ".join(fold_text(prefix).split())
+        if not prefix:
+            return []
+        memo_key = (prefix, limit)
+        if len(prefix) <= self.MEMO_PREFIX_LENGTH and memo_key in self._memo:
+            return self._memo[memo_key]
+
+        start = bisect_left(self._keys, prefix)
+        end = bisect_left(self._keys, prefix + "\U0010ffff", lo=start)
+        matches: dict[tuple[str, str], Suggestion] = {}
+        for entry in self._entries[start:end]:
+            matches.setdefault((entry.field, entry.text), entry)
+
+        ranked = heapq.nsmallest(
+            limit,
+            matches.values(),
+            key=lambda entry: (-entry.weight, SUGGEST_FIELDS.index(entry.field), entry.text),
+        )
+        if len(prefix) <= self.MEMO_PREFIX_LENGTH:
+            self._memo[memo_key] = ranked
+        return ranked
+
+
+def _collect(rows, fields: tuple[str, ...]) -> list[Suggestion]:
+    """Aggregate ``(weight, *field values)`` rows into weighted suggestions."""
+    weights: dict[tuple[str, str], int] = {}
+    for weight, *values in rows:
+        for field, value in zip(fields, values, strict=True):
+            texts = value if isinstance(value, list) else [value]
+            for text in texts:
+                if text and text.strip():
+                    key = (field, text.strip())
+                    weights[key] = weights.get(key, 0) + (weight or 1)
+    return [Suggestion(text=text, field=field, weight=weight) for (field, text), weight in weights.items()]
+
+
+class SuggestIndexCache:
+    """Per-user and global prefix indexes, versioned and size-bounded."""
+
+    def __init__(self, max_users: int, global_refresh_seconds: float, global_max_rows: int) -> None:
+        self.max_users = max_users
+        self.global_refresh_seconds = global_refresh_seconds
+        self.global_max_rows = global_max_rows
+        self._user_indexes: OrderedDict[UUID, tuple[int, PrefixIndex]] = OrderedDict()
+        self._locks: dict[UUID, asyncio.Lock] = {}
+        self._global_index: PrefixIndex | None = None
+        self._global_built_at = 0.0
+        self._global_task: asyncio.Task | None = None
+
+    async def get_user_index(
+        self, db: AsyncSession, user_id: UUID, collection_version: int
+    ) -> PrefixIndex:
+        """The user's index for ``collection_version``, built on first use."""
+        cached = self._user_indexes.get(user_id)
+        if cached and cached[0] == collection_version:
+            self._user_indexes.move_to_end(user_id)
+            return cached[1]
+
+        # One rebuild per user at a time; concurrent keystrokes wait for it
+        lock = self._locks.setdefault(user_id, asyncio.Lock())
+        async with lock:
+            cached = self._user_indexes.get(user_id)
+            if cached and cached[0] == collection_version:
+                return cached[1]
+            index = await self._build_user_index(db, user_id)
+            self._user_indexes[user_id] = (collection_version, index)
+            self._user_indexes.move_to_end(user_id)
+            while len(self._user_indexes) > self.max_users:
+                evicted, _ = self._user_indexes.popitem(last=False)
+                self._locks.pop(evicted, None)
+        return index
+
+    @staticmethod
+    async def _build_user_index(db: AsyncSession, user_id: UUID) -> PrefixIndex:
+        result = await db.execute(
+            select(
+                func.sum(UserWine.quantity),
+                Wine.name,
+                Wine.producer,
+                Wine.region,
+                Wine.grape_variety,
+            )
+            .join(Wine)
+            .where(
+                UserWine.user_id == user_id,
+                UserWine.deleted_at.is_(None),
+            )
+            .group_by(Wine.name, Wine.producer, Wine.region, Wine.grape_variety)
+        )
+        return PrefixIndex(_collect(result.all(), SUGGEST_FIELDS))
+
+    def get_global_index(self) -> PrefixIndex | None:
+        """The global index, refreshed in the background once stale.
+
+        Returns None until the first build finishes; callers fall back to
+        collection suggestions only.
+        """
+        stale = time.monotonic() - self._global_built_at > self.global_refresh_seconds
+        if stale and (self._global_task is None or self._global_task.done()):
+            self._global_task = asyncio.create_task(self._refresh_global_index())
+        return self._global_index
+
+    async def _refresh_global_index(self) -> None:
+        try:
+            async with async_session_maker() as db:
+                result = await db.execute(
+                    select(func.count(), Wine.name, Wine.producer)
+                    .group_by(Wine.name, Wine.producer)
+                    .order_by(func.count().desc())
+                    .limit(self.global_max_rows)
+                )
+                rows = result.all()
+            # Sorting is CPU-bound; keep it off the event loop
+            self._global_index = await asyncio.to_thread(
+                PrefixIndex, _collect(rows, ("name", "producer"))
+            )
+            self._global_built_at = time.monotonic()
+            logger.info("Wine suggest global index rebuilt: %d keys", len(self._global_index))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception("Wine suggest global index rebuild failed: %s", e)
+
+    def clear(self) -> None:
+        self._user_indexes.clear()
+        self._locks.clear()
+        self._global_index = None
+        self._global_built_at = 0.0
+
+
+suggest_indexes = SuggestIndexCache(
+    max_users=settings.wine_suggest_max_cached_users,
+    global_refresh_seconds=settings.wine_suggest_global_refresh_minutes * 60,
+    global_max_rows=settings.wine_suggest_global_max_rows,
+)
+
+
+class WineSuggestService:
+    """Service for wine autocomplete suggestions."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def suggest(
+        self,
+        user_id: UUID,
+        collection_version: int,
+        query: str,
+        limit: int = 10,
+        include_global: bool = True,
+    ) -> list[dict]:
+        """Suggestions for ``query``: the user's collection first, then global names."""
+        user_index = await suggest_indexes.get_user_index(self.db, user_id, collection_version)
+        suggestions = [
+            {"text": entry.text, "field": entry.field, "source": "collection"}
+            for entry in user_index.search(query, limit)
+        ]
+
+        global_index = suggest_indexes.get_global_index() if include_global else None
+        if global_index and len(suggestions) < limit:
+            seen = {(item["field"], item["text"]) for item in suggestions}
+            for entry in global_index.search(query, limit):
+                if len(suggestions) >= limit:
+                    break
+                if (entry.field, entry.text) not in seen:
+                    suggestions.append({"text": entry.text, "field": entry.field, "source": "global"})
+        return suggestions
@@ -0,0 +1,43 @@
+"""Opaque cursors for keyset pagination.
+
+A cursor encodes the sort key of the last row on a page (e.g.
+``(created_at, id)``); the next page continues strictly after it, so
+pages cost the same no matter how deep the client has scrolled.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    return value
+
+
+def encode_cursor(*values) -> str:
+    """Encode sort key values into an opaque, URL-safe cursor."""
+    payload = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """Decode a cursor produced by ``encode_cursor``.
+
+    Values come back as JSON scalars (datetimes and UUIDs as strings).
+    Raises ``ValueError`` if the cursor is malformed or does not hold
+    exactly ``size`` values.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Malformed cursor") from exc
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Malformed cursor")
+    return values
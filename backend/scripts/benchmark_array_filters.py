@@ -0,0 +1,111 @@
+"""Benchmark the grape / food / flavor list filters against the configured database.
+
+For each filter, runs ``EXPLAIN (ANALYZE, BUFFERS)`` on two equivalent
+case- and accent-insensitive predicates over ``wines``:
+
+- ``indexed``: containment on the folded ``*_keys`` column, as used by
+  ``GET /wines`` (GIN index ``ix_wines_*_keys``)
+- ``unnest``: folding the raw array column per row, as a filter without
+  the generated column would have to
+
+and reports matching rows, execution time and the scans the plan used.
+
+Run from ``backend/``::
+
+    python -m scripts.benchmark_array_filters
+    python -m scripts.benchmark_array_filters --filter grape --value "pinot noir"
+    python -m scripts.benchmark_array_filters --force-index
+
+Without ``--value`` the most common value of each column is used. On small
+development databases the planner prefers a sequential scan over any
+index; ``--force-index`` disables sequential scans for the session to show
+the index is usable.
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+
+from app.database import async_session_maker, close_db
+from app.models.wine import Wine
+from app.services.wine_search import array_contains
+
+# filter name -> (raw column, folded column)
+FILTERS = {
+    "grape": ("grape_variety", "grape_variety_keys"),
+    "food": ("food_pairing", "food_pairing_keys"),
+    "flavor": ("flavor_notes", "flavor_notes_keys"),
+}
+
+
+def _sql(query) -> str:
+    return str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def _scans(plan: dict):
+    """Scan nodes of a JSON plan, as "Node Type(index or relation)"."""
+    if "Scan" in plan["Node Type"]:
+        yield f"{plan['Node Type']}({plan.get('Index Name') or plan.get('Relation Name')})"
+    for child in plan.get("Plans", []):
+        yield from _scans(child)
+
+
+async def most_common_value(db, keys_column: str) -> str | None:
+    result = await db.execute(
+        text(
+            f"SELECT value FROM wines, unnest({keys_column}) AS value "
+            "GROUP BY value ORDER BY count(*) DESC LIMIT 1"
+        )
+    )
+    return result.scalar()
+
+
+async def explain(db, query) -> dict:
+    result = await db.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {_sql(query)}"))
+    return result.scalar()[0]
+
+
+async def benchmark(db, name: str, value: str | None) -> None:
+    raw_column, keys_column = FILTERS[name]
+    value = value or await most_common_value(db, keys_column)
+    if value is None:
+        print(f"{name:<7} no values")
+        return
+
+    variants = {
+        "indexed": select(Wine.id).where(array_contains(getattr(Wine, keys_column), value)),
+        "unnest": select(Wine.id).where(
+            text(
+                f"EXISTS (SELECT 1 FROM unnest(wines.{raw_column}) AS v "
+                "WHERE lower(f_unaccent(btrim(v))) = lower(f_unaccent(btrim(:value))))"
+            ).bindparams(value=value)
+        ),
+    }
+    for variant, query in variants.items():
+        plan = await explain(db, query)
+        print(
+            f"{name:<7} {variant:<8} value={value!r:<24} rows={plan['Plan']['Actual Rows']:<6} "
+            f"time={plan['Execution Time']:8.2f}ms scans={', '.join(_scans(plan['Plan']))}"
+        )
+
+
+async def main(filters: list[str], value: str | None, force_index: bool) -> None:
+    try:
+        async with async_session_maker() as db:
+            if force_index:
+                await db.execute(text("SET enable_seqscan = off"))
+            for name in filters:
+                await benchmark(db, name, value)
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filter", choices=list(FILTERS), action="append")
+    parser.add_argument("--value")
+    parser.add_argument("--force-index", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.filter or list(FILTERS), args.value, args.force_index))
@@ -0,0 +1,84 @@
+"""Concurrent wine adds: throughput of label allocation.
+
+Creates a throwaway user and wine, then runs ``--workers`` concurrent
+clients, each adding ``--adds`` wines through ``WineService``
+(``create_user_wine``, or ``create_user_wines_batch`` with
+``--batch-size``), each in its own session as separate requests would.
+Reports wines added per second. The throwaway user and wine are deleted
+afterwards. Label uniqueness is covered by ``tests/test_label_allocation.py``.
+
+Run from ``backend/`` against a migrated database::
+
+    python -m scripts.benchmark_label_allocation --workers 16 --adds 50
+    python -m scripts.benchmark_label_allocation --workers 8 --adds 10 --batch-size 12
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import delete
+
+from app.config import settings
+from app.database import async_session_maker, close_db
+from app.models.user import User
+from app.models.wine import Wine
+from app.schemas.wine import UserWineBatchCreate, UserWineCreate
+from app.services.wine_service import WineService
+
+
+async def worker(user_id: uuid.UUID, wine_id: uuid.UUID, adds: int, batch_size: int) -> None:
+    for _ in range(adds):
+        async with async_session_maker() as db:
+            service = WineService(db)
+            if batch_size > 1:
+                await service.create_user_wines_batch(
+                    user_id,
+                    UserWineBatchCreate(wines=[UserWineCreate(wine_id=wine_id)] * batch_size),
+                )
+            else:
+                await service.create_user_wine(user_id, UserWineCreate(wine_id=wine_id))
+
+
+async def main(workers: int, adds: int, batch_size: int) -> None:
+    # Adds would otherwise schedule recommendation cache warming (AI calls)
+    settings.recommendation_cache_warming_enabled = False
+
+    user_id, wine_id = uuid.uuid4(), uuid.uuid4()
+    try:
+        async with async_session_maker() as db:
+            db.add(User(
+                id=user_id,
+                email=f"label-check-{user_id}@example.invalid",
+                password_hash="-",
+                name="Label Check",
+            ))
+            db.add(Wine(id=wine_id, name="Label Check"))
+            await db.commit()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(user_id, wine_id, adds, batch_size) for _ in range(workers)))
+        elapsed = time.perf_counter() - started
+
+        wines = workers * adds * batch_size
+        print(
+            f"workers={workers} adds={adds} batch_size={batch_size} "
+            f"wines={wines} time={elapsed:.2f}s throughput={wines / elapsed:.1f} wines/s"
+        )
+    finally:
+        async with async_session_maker() as db:
+            # user_wines go with the user (ON DELETE CASCADE)
+            await db.execute(delete(User).where(User.id == user_id))
+            await db.execute(delete(Wine).where(Wine.id == wine_id))
+            await db.commit()
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--adds", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(main(args.workers, args.adds, args.batch_size))
@@ -0,0 +1,162 @@
+"""Benchmark the GET /wines list query against the configured database.
+
+Compares the old full-entity list load (Wine, tags and status histories
+eager-loaded, full ``WineResponse`` per item) with the current card
+projection from ``WineService.get_user_wines``. For each it reports SQL
+statements per page, response bytes, and query / serialization time.
+
+Run from ``backend/``::
+
+    python -m scripts.benchmark_queries --size 100 --iterations 20
+    python -m scripts.benchmark_queries --user-id <uuid>
+
+Without ``--user-id`` the user with the most wines is used.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from uuid import UUID
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import selectinload
+
+from app.database import async_session_maker, close_db, engine
+from app.models.user_wine import UserWine, WineStatus
+from app.models.wine import Wine
+from app.schemas.common import PaginatedData, PaginatedResponse, PaginationMeta
+from app.schemas.wine import UserWineListResponse, UserWineSummaryResponse
+from app.services.wine_service import WineService
+
+
+class StatementCounter:
+    """Counts SQL statements sent through the engine."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args) -> None:
+        self.count += 1
+
+
+async def legacy_page(db, user_id: UUID, size: int) -> PaginatedResponse:
+    """The list query as it was before the card projection."""
+    query = (
+        select(UserWine)
+        .options(
+            selectinload(UserWine.wine),
+            selectinload(UserWine.tags),
+            selectinload(UserWine.status_histories),
+        )
+        .join(Wine)
+        .where(
+            UserWine.user_id == user_id,
+            UserWine.deleted_at.is_(None),
+            UserWine.status == WineStatus.OWNED.value,
+        )
+        .order_by(UserWine.created_at.desc())
+        .limit(size)
+    )
+    user_wines = (await db.execute(query)).scalars().all()
+    service = WineService(db)
+    items = [
+        {
+            "id": uw.id,
+            "quantity": uw.quantity,
+            "status": uw.status,
+            "purchase_date": uw.purchase_date,
+            "purchase_price": uw.purchase_price,
+            "label_number": uw.label_number,
+            "created_at": uw.created_at,
+            "wine": uw.wine,
+            "tags": uw.tags,
+            "drinking_status": service._get_drinking_status(uw.wine),
+        }
+        for uw in user_wines
+    ]
+    return PaginatedResponse(
+        data=PaginatedData(
+            items=items,
+            pagination=PaginationMeta(size=size, has_next=False, has_prev=False),
+        )
+    )
+
+
+async def projection_page(db, user_id: UUID, size: int) -> PaginatedResponse:
+    return await WineService(db).get_user_wines(user_id=user_id, size=size, include_total=False)
+
+
+async def measure(name, load, response_model, user_id, size, iterations, counter) -> None:
+    query_times, serialize_times, statements, sizes = [], [], [], []
+    for _ in range(iterations):
+        # A fresh session per run so nothing is served from the identity map
+        async with async_session_maker() as db:
+            counter.count = 0
+            started = time.perf_counter()
+            page = await load(db, user_id, size)
+            query_times.append(time.perf_counter() - started)
+            statements.append(counter.count)
+
+            started = time.perf_counter()
+            body = response_model.model_validate(page.model_dump()).model_dump_json()
+            serialize_times.append(time.perf_counter() - started)
+            sizes.append(len(body.encode()))
+
+    print(
+        f"{name:<12} items={len(page.data.items):<4} statements={max(statements):<3} "
+        f"bytes={statistics.median(sizes):<8.0f} "
+        f"query={statistics.median(query_times) * 1000:7.2f}ms "
+        f"serialize={statistics.median(serialize_times) * 1000:7.2f}ms"
+    )
+
+
+async def main(user_id: UUID | None, size: int, iterations: int) -> None:
+    try:
+        if user_id is None:
+            async with async_session_maker() as db:
+                user_id = (
+                    await db.execute(
+                        select(UserWine.user_id)
+                        .where(UserWine.deleted_at.is_(None))
+                        .group_by(UserWine.user_id)
+                        .order_by(func.count().desc())
+                        .limit(1)
+                    )
+                ).scalar()
+            if user_id is None:
+                print("No wines to benchmark")
+                return
+
+        counter = StatementCounter()
+        print(f"user={user_id} size={size} iterations={iterations}")
+        await measure(
+            "legacy",
+            legacy_page,
+            PaginatedResponse[UserWineListResponse],
+            user_id,
+            size,
+            iterations,
+            counter,
+        )
+        await measure(
+            "projection",
+            projection_page,
+            PaginatedResponse[UserWineSummaryResponse],
+            user_id,
+            size,
+            iterations,
+            counter,
+        )
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--user-id", type=UUID)
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.user_id, args.size, args.iterations))
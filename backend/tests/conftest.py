@@ -0,0 +1,32 @@
+"""Shared test fixtures.
+
+Tests that take the ``database`` fixture run against the PostgreSQL
+database in ``DATABASE_URL`` (migrated with ``alembic upgrade head``) and
+are skipped when it is not set or not reachable. They leave no rows behind.
+"""
+
+import os
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+
+@pytest.fixture
+async def database():
+    """The application engine, connected to a reachable PostgreSQL database."""
+    if not os.environ.get("DATABASE_URL", "").startswith(("postgres://", "postgresql")):
+        pytest.skip("DATABASE_URL does not point at PostgreSQL")
+
+    from app.database import close_db, engine
+
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except (OSError, SQLAlchemyError) as e:
+        await close_db()
+        pytest.skip(f"PostgreSQL is not reachable: {e}")
+
+    yield engine
+    # Pooled connections belong to this test's event loop
+    await close_db()
@@ -0,0 +1,77 @@
+"""Tests for the write-behind recommendation history writer."""
+
+import uuid
+from collections import Counter
+
+import pytest
+
+from app.services import history_writer as history_writer_module
+from app.services.history_writer import HistoryWriter
+
+
+class FakeSession:
+    """Records committed history rows and cache hit updates.
+
+    Any INSERT containing a row marked ``bad`` fails, like a value overflow.
+    """
+
+    def __init__(self, written: list) -> None:
+        self.written = written
+        self.pending: list = []
+
+    async def __aenter__(self) -> "FakeSession":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        return None
+
+    async def execute(self, statement, rows=None) -> None:
+        if rows is None:
+            self.pending.append(statement)
+            return
+        if any(row.get("bad") for row in rows):
+            raise ValueError("numeric field overflow")
+        self.pending.extend(rows)
+
+    async def commit(self) -> None:
+        self.written.extend(self.pending)
+
+
+@pytest.fixture
+def written(monkeypatch) -> list[dict]:
+    rows: list[dict] = []
+    monkeypatch.setattr(history_writer_module, "async_session_maker", lambda: FakeSession(rows))
+    return rows
+
+
+def make_writer() -> HistoryWriter:
+    return HistoryWriter(max_queue_size=10, batch_size=10, flush_interval_seconds=1)
+
+
+async def test_batch_is_written_in_one_insert(written) -> None:
+    batch = [{"id": uuid.uuid4()} for _ in range(5)]
+    writer = make_writer()
+    await writer._write(batch)
+    assert written == batch
+    assert writer.dropped == 0
+
+
+async def test_failing_row_is_dropped_alone(written) -> None:
+    batch = [{"id": uuid.uuid4()} for _ in range(7)]
+    batch[4]["bad"] = True
+    writer = make_writer()
+    await writer._write(batch)
+    assert sorted(row["id"] for row in written) == sorted(
+        row["id"] for row in batch if not row.get("bad")
+    )
+    assert writer.dropped == 1
+
+
+async def test_cache_hits_survive_a_failing_batch(written) -> None:
+    writer = make_writer()
+    writer._cache_hits = Counter({uuid.uuid4(): 2})
+    await writer._write([{"id": uuid.uuid4(), "bad": True}])
+    # Only the cache hit UPDATE made it
+    assert len(written) == 1 and not isinstance(written[0], dict)
+    assert writer.dropped == 1
+    assert not writer._cache_hits
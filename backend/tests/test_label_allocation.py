@@ -0,0 +1,93 @@
+"""Concurrent wine adds keep label numbers unique and gapless.
+
+Creates a throwaway user and wine, then adds wines from concurrent
+clients through ``WineService`` (``create_user_wine`` and
+``create_user_wines_batch``), each add in its own session as separate
+requests would. Every label must be unique and the labels must form one
+gapless ``YY-1..N`` sequence. The throwaway rows are deleted afterwards.
+
+Needs PostgreSQL (see ``conftest.database``). For throughput numbers, see
+``scripts/benchmark_label_allocation.py``.
+"""
+
+import asyncio
+import uuid
+from collections import Counter
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete, select
+
+from app.config import settings
+from app.database import async_session_maker
+from app.models.user import User
+from app.models.user_wine import UserWine
+from app.models.wine import Wine
+from app.schemas.wine import UserWineBatchCreate, UserWineCreate
+from app.services.wine_service import WineService
+
+WORKERS = 8
+ADDS_PER_WORKER = 5
+BATCH_SIZE = 4
+
+
+@pytest.fixture
+async def collection(database, monkeypatch):
+    """A throwaway (user_id, wine_id), deleted after the test."""
+    # Adds would otherwise schedule recommendation cache warming (AI calls)
+    monkeypatch.setattr(settings, "recommendation_cache_warming_enabled", False)
+
+    user_id, wine_id = uuid.uuid4(), uuid.uuid4()
+    async with async_session_maker() as db:
+        db.add(User(
+            id=user_id,
+            email=f"label-test-{user_id}@example.invalid",
+            password_hash="-",
+            name="Label Test",
+        ))
+        db.add(Wine(id=wine_id, name="Label Test"))
+        await db.commit()
+    try:
+        yield user_id, wine_id
+    finally:
+        async with async_session_maker() as db:
+            # user_wines go with the user (ON DELETE CASCADE)
+            await db.execute(delete(User).where(User.id == user_id))
+            await db.execute(delete(Wine).where(Wine.id == wine_id))
+            await db.commit()
+
+
+async def add_wines(user_id: uuid.UUID, wine_id: uuid.UUID, batch_size: int) -> None:
+    for _ in range(ADDS_PER_WORKER):
+        async with async_session_maker() as db:
+            service = WineService(db)
+            if batch_size > 1:
+                await service.create_user_wines_batch(
+                    user_id,
+                    UserWineBatchCreate(wines=[UserWineCreate(wine_id=wine_id)] * batch_size),
+                )
+            else:
+                await service.create_user_wine(user_id, UserWineCreate(wine_id=wine_id))
+
+
+async def test_concurrent_adds_allocate_unique_gapless_labels(collection) -> None:
+    user_id, wine_id = collection
+    # Single adds and batches racing for the same label sequence; the
+    # timeout catches allocation serializing into lock waits or deadlocks
+    await asyncio.wait_for(
+        asyncio.gather(
+            *(add_wines(user_id, wine_id, 1) for _ in range(WORKERS // 2)),
+            *(add_wines(user_id, wine_id, BATCH_SIZE) for _ in range(WORKERS // 2)),
+        ),
+        timeout=60,
+    )
+
+    async with async_session_maker() as db:
+        result = await db.execute(select(UserWine.label_number).where(UserWine.user_id == user_id))
+        labels = result.scalars().all()
+
+    expected_count = (WORKERS // 2) * ADDS_PER_WORKER * (1 + BATCH_SIZE)
+    year_suffix = datetime.now().year % 100
+    assert len(labels) == expected_count
+    assert [label for label, count in Counter(labels).items() if count > 1] == []
+    assert set(labels) == {f"{year_suffix}-{n}" for n in range(1, expected_count + 1)}
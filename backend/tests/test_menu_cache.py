@@ -0,0 +1,29 @@
+"""Menu course results are cached apart from standalone queries."""
+
+import uuid
+
+import pytest
+
+from app.models.recommendation_cache import RecommendationCache
+from app.services.recommendation_service import RecommendationService
+
+USER_ID = uuid.UUID(int=1)
+
+
+@pytest.mark.parametrize("query_type", ["food", "occasion", "mood"])
+def test_menu_courses_use_their_own_cache_keys(query_type: str) -> None:
+    keys = {
+        RecommendationService._build_cache_key(USER_ID, cache_query_type, "steak", "hash")
+        for cache_query_type in (
+            query_type,
+            RecommendationService._menu_cache_query_type(query_type, unique_bottles=True),
+            RecommendationService._menu_cache_query_type(query_type, unique_bottles=False),
+        )
+    }
+    assert len(keys) == 3
+
+
+@pytest.mark.parametrize("unique_bottles", [True, False])
+def test_menu_cache_query_type_fits_the_column(unique_bottles: bool) -> None:
+    length = RecommendationCache.__table__.c.query_type.type.length
+    assert len(RecommendationService._menu_cache_query_type("occasion", unique_bottles)) <= length
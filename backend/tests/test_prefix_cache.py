@@ -0,0 +1,43 @@
+"""Prompt-prefix caching across requests, through the fake provider."""
+
+import uuid
+
+import pytest
+
+from app.config import settings
+from app.services.ai.providers import fake
+from app.services.ai_service import AIService
+
+WINES = [
+    {"id": str(uuid.UUID(int=n)), "name": f"Wine {n}", "type": "red"}
+    for n in range(1, 4)
+]
+
+
+@pytest.fixture
+def fake_provider(monkeypatch):
+    monkeypatch.setattr(settings, "recommendation_ai_provider", "fake")
+    monkeypatch.setattr(settings, "recommendation_ai_model", "")
+    fake.seen_prefixes.clear()
+    yield
+    fake.seen_prefixes.clear()
+
+
+async def test_second_request_hits_the_prefix_cache(fake_provider) -> None:
+    # A new AIService (and provider) per request, as RecommendationService builds them
+    first, second = AIService(), AIService()
+
+    await first.get_pairing_recommendations("steak", WINES)
+    await second.get_pairing_recommendations("salmon", WINES)
+
+    assert first.recommendation_provider.cache_misses == 1
+    assert second.recommendation_provider.cache_hits == 1
+
+
+async def test_changed_collection_misses_the_prefix_cache(fake_provider) -> None:
+    first, second = AIService(), AIService()
+
+    await first.get_pairing_recommendations("steak", WINES)
+    await second.get_pairing_recommendations("steak", WINES[:2])
+
+    assert second.recommendation_provider.cache_misses == 1
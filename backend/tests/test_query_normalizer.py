@@ -0,0 +1,75 @@
+"""Tests for recommendation query canonicalization."""
+
+import pytest
+
+from app.config import settings
+from app.services.query_normalizer import (
+    canonicalize_query,
+    find_similar_query,
+    fold_text,
+    query_similarity,
+    tokenize_query,
+)
+
+
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        ("Steak", "steak"),
+        ("steak dinner", "steak"),
+        ("grilled ribeye steak", "steak"),
+        ("Grilled ribeye steaks", "steak"),
+        ("What wine goes with salmon?", "salmon"),
+        ("스테이크와 와인", "steak"),
+        ("연어를", "salmon"),
+        ("삼겹살이랑 어울리는 와인", "pork"),
+        ("구운 삼겹살", "pork"),
+        ("crab cakes", "shellfish"),
+        ("Chocolate cake", "dessert"),
+        ("cheesecake", "dessert"),
+        ("salmon and crab cakes", "salmon shellfish"),
+    ],
+)
+def test_canonicalize_query(query: str, expected: str) -> None:
+    assert canonicalize_query(query) == expected
+
+
+def test_dictionary_words_keep_particle_like_endings() -> None:
+    # 이 ends 떡볶이 but is not a particle there
+    assert tokenize_query("떡볶이") == ["spicy"]
+    assert tokenize_query("떡볶이랑") == ["spicy"]
+
+
+def test_unknown_korean_words_lose_their_particle() -> None:
+    assert tokenize_query("감자탕이랑") == ["감자탕"]
+
+
+def test_canonical_form_is_sorted_and_deduplicated() -> None:
+    assert canonicalize_query("salmon steak salmon") == "salmon steak"
+    assert canonicalize_query("steak and salmon") == canonicalize_query("salmon with steak")
+
+
+def test_all_stop_words_fall_back_to_the_query() -> None:
+    assert canonicalize_query("  Wine   for TONIGHT ") == "wine for tonight"
+
+
+def test_fold_text_ignores_case_and_accents() -> None:
+    assert fold_text("Château Margaux") == fold_text("CHATEAU margaux")
+
+
+def test_bare_cake_is_not_dessert() -> None:
+    assert canonicalize_query("crab cakes") != canonicalize_query("dessert")
+    assert canonicalize_query("cake") == "cake"
+
+
+def test_query_similarity() -> None:
+    threshold = settings.recommendation_cache_similarity_threshold
+    assert query_similarity("steak", "steak") == 1.0
+    assert query_similarity("chiken", "chicken") >= threshold
+    assert query_similarity("salmon", "chocolate") < threshold
+
+
+def test_find_similar_query() -> None:
+    threshold = settings.recommendation_cache_similarity_threshold
+    assert find_similar_query("chiken", ["pasta", "chicken"], threshold) == "chicken"
+    assert find_similar_query("chiken", ["pasta"], threshold) is None
@@ -0,0 +1,220 @@
+"""Query-plan regression test: hot collection queries use the user_wines indexes.
+
+Seeds a synthetic dataset (wines, users and their collections) inside a
+transaction, runs ``ANALYZE``, then calls each hot service method while
+capturing the SQL it sends, and ``EXPLAIN``s every captured statement
+that reads ``user_wines``. A check fails when no plan uses one of its
+expected indexes or any plan sequentially scans ``user_wines``. The
+transaction is rolled back, so nothing is left behind.
+
+Plans are forced generic (``plan_cache_mode = force_generic_plan``), as
+asyncpg's prepared statements end up using them: partial indexes are only
+chosen there when the query states their predicate literally (see
+``app.models.user_wine.owned_condition``).
+
+Needs PostgreSQL (see ``conftest.database``)::
+
+    DATABASE_URL=postgresql+asyncpg://... pytest tests/test_query_plans.py
+"""
+
+import random
+import uuid
+from datetime import UTC, date, datetime, timedelta
+
+from sqlalchemy import event, insert, text
+
+from app.database import async_session_maker, engine
+from app.models.user import User
+from app.models.user_wine import UserWine, WineStatus
+from app.models.wine import Wine, WineType
+from app.services.dashboard_service import DashboardService
+from app.services.recommendation_service import RecommendationService
+from app.services.wine_facet_service import WineFacetService
+from app.services.wine_service import WineService
+
+OWNED_INDEXES = {
+    "ix_user_wines_owned_created",
+    "ix_user_wines_owned_price",
+    "ix_user_wines_owned_purchase_date",
+}
+
+COUNTRIES = ["France", "Italy", "Spain", "USA", "Chile", "Australia", "Germany", "Portugal"]
+GRAPES = ["Cabernet Sauvignon", "Merlot", "Pinot Noir", "Syrah", "Chardonnay", "Riesling"]
+
+
+class StatementCapture:
+    """Records the SQL statements sent through the engine while enabled."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.statements: list[tuple[str, object]] = []
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if self.enabled:
+            self.statements.append((statement, parameters))
+
+    def close(self) -> None:
+        event.remove(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+
+def _plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+async def seed(db, users: int, wines_per_user: int, wine_count: int) -> uuid.UUID:
+    """Insert the synthetic dataset; returns the user whose queries are checked."""
+    rng = random.Random(42)
+    year = date.today().year
+
+    wine_rows = []
+    for _ in range(wine_count):
+        start = year + rng.randint(-10, 8)
+        wine_rows.append({
+            "id": uuid.uuid4(),
+            "name": f"Plan Check {rng.randint(1, 10**6)}",
+            "producer": f"Producer {rng.randint(1, 500)}",
+            "vintage": rng.randint(1990, year),
+            "type": rng.choice([t.value for t in WineType]),
+            "country": rng.choice(COUNTRIES),
+            "grape_variety": rng.sample(GRAPES, rng.randint(1, 2)),
+            "drinking_window_start": start,
+            "drinking_window_end": start + rng.randint(2, 15),
+        })
+    await db.execute(insert(Wine), wine_rows)
+
+    user_ids = [uuid.uuid4() for _ in range(users)]
+    await db.execute(
+        insert(User),
+        [
+            {
+                "id": user_id,
+                "email": f"plan-check-{user_id}@example.invalid",
+                "password_hash": "-",
+                "name": "Plan Check",
+            }
+            for user_id in user_ids
+        ],
+    )
+
+    now = datetime.now(UTC)
+    statuses = [WineStatus.OWNED.value] * 16 + [WineStatus.CONSUMED.value] * 3 + [WineStatus.GIFTED.value]
+    user_wine_rows = []
+    for user_id in user_ids:
+        for _ in range(wines_per_user):
+            status = rng.choice(statuses)
+            created_at = now - timedelta(days=rng.randint(0, 2000))
+            user_wine_rows.append({
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "wine_id": rng.choice(wine_rows)["id"],
+                "quantity": rng.randint(1, 6),
+                "status": status,
+                "purchase_date": created_at.date() if rng.random() < 0.7 else None,
+                "purchase_price": rng.randint(10, 500) * 1000 if rng.random() < 0.8 else None,
+                "created_at": created_at,
+                "consumed_at": (
+                    created_at + timedelta(days=rng.randint(0, 300))
+                    if status == WineStatus.CONSUMED.value
+                    else None
+                ),
+                "deleted_at": now if rng.random() < 0.05 else None,
+            })
+    await db.execute(insert(UserWine), user_wine_rows)
+
+    for table in ("wines", "users", "user_wines"):
+        await db.execute(text(f"ANALYZE {table}"))
+    return user_ids[0]
+
+
+USERS = 200
+WINES_PER_USER = 50
+WINE_COUNT = 2000
+
+
+async def check(db, capture: StatementCapture, name: str, run, expected: list[set[str]]) -> str | None:
+    """Run ``run()`` and check the plans of its user_wines statements; returns a failure."""
+    capture.statements.clear()
+    capture.enabled = True
+    try:
+        await run()
+    finally:
+        capture.enabled = False
+
+    used: set[str] = set()
+    seq_scans = 0
+    conn = await db.connection()
+    for statement, parameters in list(capture.statements):
+        if "user_wines" not in statement or not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            continue
+        result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+        plan = result.scalar()[0]["Plan"]
+        for node in _plan_nodes(plan):
+            if node.get("Index Name"):
+                used.add(node["Index Name"])
+            if node["Node Type"] == "Seq Scan" and node.get("Relation Name") == "user_wines":
+                seq_scans += 1
+
+    if seq_scans == 0 and all(used & indexes for indexes in expected):
+        return None
+    return (
+        f"{name}: indexes={', '.join(sorted(used)) or '-'}"
+        f"{f' seq_scans(user_wines)={seq_scans}' if seq_scans else ''}"
+    )
+
+
+async def test_hot_queries_use_user_wine_indexes(database) -> None:
+    capture = StatementCapture()
+    async with async_session_maker() as db:
+        try:
+            user_id = await seed(db, USERS, WINES_PER_USER, WINE_COUNT)
+            await db.execute(text("SET LOCAL plan_cache_mode = force_generic_plan"))
+
+            wines = WineService(db)
+            checks = [
+                (
+                    "wine list (created_at)",
+                    lambda: wines.get_user_wines(user_id=user_id, include_total=False),
+                    [{"ix_user_wines_owned_created"}],
+                ),
+                (
+                    "wine list (price)",
+                    lambda: wines.get_user_wines(user_id=user_id, sort="price", include_total=False),
+                    [{"ix_user_wines_owned_price"}],
+                ),
+                (
+                    "wine list (purchase_date)",
+                    lambda: wines.get_user_wines(
+                        user_id=user_id, sort="purchase_date", include_total=False
+                    ),
+                    [{"ix_user_wines_owned_purchase_date"}],
+                ),
+                (
+                    "wine facets",
+                    lambda: WineFacetService(db).get_facets(user_id, collection_version=-1),
+                    [OWNED_INDEXES],
+                ),
+                (
+                    "cellar summary",
+                    lambda: DashboardService(db).get_cellar_summary(user_id),
+                    [OWNED_INDEXES, {"ix_user_wines_user_consumed"}],
+                ),
+                (
+                    "expiring wines",
+                    lambda: DashboardService(db).get_expiring_wines(user_id),
+                    [OWNED_INDEXES | {"ix_user_wines_wine_user"}],
+                ),
+                (
+                    "recommendation candidates",
+                    lambda: RecommendationService(db)._load_available_wines(user_id),
+                    [OWNED_INDEXES],
+                ),
+            ]
+            failures = [failure for spec in checks if (failure := await check(db, capture, *spec))]
+        finally:
+            await db.rollback()
+            capture.close()
+
+    assert not failures, "\n".join(failures)
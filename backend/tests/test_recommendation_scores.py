@@ -0,0 +1,27 @@
+"""Tests for AI match score normalization."""
+
+from decimal import Decimal
+
+import pytest
+
+from app.services.recommendation_service import normalize_match_score
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        (0.95, "0.950"),
+        ("0.8", "0.800"),
+        (1, "1.000"),
+        (0.12345, "0.123"),
+        (95, "0.950"),
+        (100, "1.000"),
+        (250, "1.000"),
+        (-0.2, "0.000"),
+        (None, "0.000"),
+        ("high", "0.000"),
+        (float("nan"), "0.000"),
+    ],
+)
+def test_normalize_match_score(value, expected: str) -> None:
+    assert normalize_match_score(value) == Decimal(expected)
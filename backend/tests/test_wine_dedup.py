@@ -0,0 +1,36 @@
+"""Tests for clustering duplicate wine masters."""
+
+from uuid import UUID
+
+from app.services.wine_dedup_service import cluster_pairs
+
+A, B, C, D, N, M = (UUID(int=n) for n in range(1, 7))
+
+
+def test_matched_pairs_form_one_cluster() -> None:
+    assert cluster_pairs([(A, B, 0.9), (B, C, 0.8), (A, C, 0.7)]) == [[A, B, C]]
+    assert cluster_pairs([(A, B, 0.9), (C, D, 0.9)]) == [[A, B], [C, D]]
+
+
+def test_chains_do_not_merge_unmatched_wines() -> None:
+    # A~B and B~C, but A and C do not match: B goes with its best match only
+    assert cluster_pairs([(A, B, 0.9), (B, C, 0.8)]) == [[A, B]]
+
+
+def test_producerless_wine_does_not_bridge_producers() -> None:
+    # "Cabernet Sauvignon 2019" from producers A and B both match the
+    # producer-less N, but not each other
+    pairs = [(A, N, 0.9), (B, N, 0.9)]
+    assert cluster_pairs(pairs, producerless={N}) == []
+
+
+def test_producerless_wine_joins_the_one_producer_it_matches() -> None:
+    pairs = [(A, B, 0.9), (A, N, 0.8)]
+    assert cluster_pairs(pairs, producerless={N}) == [[A, B, N]]
+
+
+def test_producerless_wines_cluster_among_themselves() -> None:
+    assert cluster_pairs([(N, M, 0.9)], producerless={N, M}) == [[N, M]]
+    # M matches producer A, and N then only follows it through M
+    pairs = [(N, M, 0.9), (A, M, 0.8)]
+    assert cluster_pairs(pairs, producerless={N, M}) == [[A, M]]
@@ -0,0 +1,42 @@
+"""Tests for the in-memory wine autocomplete indexes."""
+
+from app.services.wine_suggest_service import PrefixIndex, Suggestion, _collect
+
+
+def test_matches_any_word_ignoring_case_and_accents() -> None:
+    index = PrefixIndex([Suggestion("Château Margaux", "name", 1)])
+    assert [entry.text for entry in index.search("chat", 5)] == ["Château Margaux"]
+    assert [entry.text for entry in index.search("MARG", 5)] == ["Château Margaux"]
+    assert index.search("bordeaux", 5) == []
+    assert index.search("  ", 5) == []
+
+
+def test_ranks_the_whole_prefix_range_by_weight() -> None:
+    # The heaviest match sorts after hundreds of lighter ones alphabetically
+    suggestions = [Suggestion(f"Ca {n:04d}", "name", 1) for n in range(1000)]
+    suggestions.append(Suggestion("Cz Heavy", "name", 50))
+    index = PrefixIndex(suggestions)
+    for prefix in ("c", "c", "cz"):  # second "c" is served from the memo
+        assert index.search(prefix, 3)[0].text == "Cz Heavy"
+
+
+def test_ties_break_by_field_then_text_and_texts_are_unique() -> None:
+    index = PrefixIndex([
+        Suggestion("Merlot", "grape", 2),
+        Suggestion("Merlot Reserve", "name", 2),
+        Suggestion("Mer", "producer", 2),
+    ])
+    assert [(entry.field, entry.text) for entry in index.search("mer", 5)] == [
+        ("name", "Merlot Reserve"),
+        ("producer", "Mer"),
+        ("grape", "Merlot"),
+    ]
+
+
+def test_collect_weights_by_field_and_text() -> None:
+    rows = [(3, "Margaux", ["Merlot", " Cabernet "]), (None, "Margaux", ["Merlot"])]
+    weights = {
+        (entry.field, entry.text): entry.weight
+        for entry in _collect(rows, ("name", "grape"))
+    }
+    assert weights == {("name", "Margaux"): 4, ("grape", "Merlot"): 4, ("grape", "Cabernet"): 3}
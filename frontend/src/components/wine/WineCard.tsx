@@ -1,10 +1,10 @@
 import { Link } from 'react-router-dom';
 import { WineImage, Badge, TagChip } from '../common';
 import { formatVintage, formatPrice, getDrinkingStatusLabel, getDrinkingStatusColor } from '../../lib/utils';
-import type { UserWineListItem } from '../../types';
+import type { UserWineSummary } from '../../types';
 
 interface WineCardProps {
-  wine: UserWineListItem;
+  wine: UserWineSummary;
   showPrice?: boolean;
 }
 
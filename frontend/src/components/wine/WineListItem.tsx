@@ -2,10 +2,10 @@ import { Link } from 'react-router-dom';
 import { ChevronRightIcon } from '@heroicons/react/24/outline';
 import { WineImage, Badge } from '../common';
 import { formatVintage, getDrinkingStatusLabel, getDrinkingStatusColor } from '../../lib/utils';
-import type { UserWineListItem } from '../../types';
+import type { UserWineSummary } from '../../types';
 
 interface WineListItemProps {
-  wine: UserWineListItem;
+  wine: UserWineSummary;
   onClick?: () => void;
 }
 
@@ -59,16 +59,16 @@ export function CellarPage() {
     isFetchingNextPage,
   } = useInfiniteQuery({
     queryKey: ['user-wines', filters],
-    queryFn: ({ pageParam = 1 }) =>
+    queryFn: ({ pageParam }) =>
       wineService.getUserWines({
         ...filters,
         include_all_statuses: includeAllStatuses || undefined,
-        page: pageParam,
+        cursor: pageParam,
         size: 20,
       }),
     getNextPageParam: (lastPage) =>
-      lastPage.pagination.has_next ? lastPage.pagination.page + 1 : undefined,
-    initialPageParam: 1,
+      lastPage.pagination.has_next ? lastPage.pagination.next_cursor ?? undefined : undefined,
+    initialPageParam: undefined as string | undefined,
   });
 
   const wines = useMemo(
@@ -16,7 +16,7 @@ export const recommendationService = {
     return response.data.data;
   },
 
-  async getHistory(params: { page?: number; size?: number } = {}): Promise<PaginatedResponse<RecommendationHistoryItem>> {
+  async getHistory(params: { cursor?: string; page?: number; size?: number } = {}): Promise<PaginatedResponse<RecommendationHistoryItem>> {
     const response = await api.get('/recommendations/history', { params });
     return response.data.data;
   },
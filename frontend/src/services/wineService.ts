@@ -4,29 +4,43 @@ import type {
   PaginationParams,
   SortParams,
   UserWine,
-  UserWineListItem,
+  UserWineSummary,
   UserWineCreateRequest,
   UserWineUpdateRequest,
   WineStatusUpdateRequest,
   WineQuantityUpdateRequest,
   WineFilterParams,
   WineAIAnalysis,
+  WineFacets,
+  WineSuggestion,
 } from '@/types';
 
 export interface WineListParams extends PaginationParams, SortParams, WineFilterParams {
   include_all_statuses?: boolean;
+  include_total?: boolean;
+  fields?: string;
 }
 
 export const wineService = {
-  async getWines(params: WineListParams = {}): Promise<PaginatedData<UserWineListItem>> {
+  async getWines(params: WineListParams = {}): Promise<PaginatedData<UserWineSummary>> {
     const response = await api.get('/wines', { params });
     return response.data.data;
   },
 
-  async getUserWines(params: WineListParams = {}): Promise<PaginatedData<UserWineListItem>> {
+  async getUserWines(params: WineListParams = {}): Promise<PaginatedData<UserWineSummary>> {
     return this.getWines(params);
   },
 
+  async suggestWines(q: string, limit = 10): Promise<WineSuggestion[]> {
+    const response = await api.get('/wines/suggest', { params: { q, limit } });
+    return response.data.data;
+  },
+
+  async getWineFacets(params?: WineFilterParams & { include_all_statuses?: boolean }): Promise<WineFacets> {
+    const response = await api.get('/wines/facets', { params });
+    return response.data.data;
+  },
+
   async getWine(id: string): Promise<UserWine> {
     const response = await api.get(`/wines/${id}`);
     return response.data.data;
@@ -46,11 +60,11 @@ export const wineService = {
   },
 
   async createWinesBatch(data: {
-    scan_session_id: string;
-    wines: Array<{ scan_index: number; quantity?: number; tag_ids?: string[] }>;
+    scan_session_id?: string;
+    wines: UserWineCreateRequest[];
     common_tags?: string[];
     common_purchase_date?: string;
-  }): Promise<{ created_count: number; total_bottles: number; user_wines: UserWine[] }> {
+  }): Promise<{ created_count: number; total_bottles: number; user_wines: UserWineSummary[] }> {
     const response = await api.post('/wines/batch', data);
     return response.data.data;
   },
@@ -19,12 +19,13 @@ export interface ApiError {
 }
 
 export interface PaginationMeta {
-  total: number;
-  page: number;
+  total: number | null;
+  page: number | null;
   size: number;
-  total_pages: number;
+  total_pages: number | null;
   has_next: boolean;
   has_prev: boolean;
+  next_cursor?: string | null;
 }
 
 export interface PaginatedData<T> {
@@ -39,6 +40,7 @@ export interface PaginatedResponse<T> {
 
 // Query params
 export interface PaginationParams {
+  cursor?: string;
   page?: number;
   size?: number;
 }
@@ -90,6 +90,37 @@ export interface UserWineListItem {
   drinking_status: DrinkingStatus | null;
 }
 
+// GET /wines list card: summary fields plus any requested via `fields`
+export type WineSummary = Pick<
+  Wine,
+  'id' | 'name' | 'producer' | 'vintage' | 'type' | 'country' | 'region' | 'image_url'
+> &
+  Partial<Wine>;
+
+export interface UserWineSummary extends Omit<UserWineListItem, 'wine'> {
+  wine: WineSummary;
+}
+
+export interface WineSuggestion {
+  text: string;
+  field: 'name' | 'producer' | 'region' | 'grape';
+  source: 'collection' | 'global';
+}
+
+export interface WineFacetCount {
+  value: string;
+  label: string;
+  count: number;
+}
+
+export interface WineFacets {
+  total: number;
+  type: WineFacetCount[];
+  country: WineFacetCount[];
+  grape: WineFacetCount[];
+  tag: WineFacetCount[];
+}
+
 // Request types
 export interface UserWineCreateRequest {
   scan_id?: string;
@@ -133,8 +164,11 @@ export interface WineFilterParams {
   type?: WineType;
   country?: string;
   grape?: string;
+  food?: string;
+  flavor?: string;
   tag_id?: string;
   tag_ids?: string;
+  tag_mode?: 'any' | 'all';
   drinking_window?: 'now' | 'aging' | 'urgent';
   min_price?: number;
   max_price?: number;